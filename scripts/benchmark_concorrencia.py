@@ -0,0 +1,210 @@
+"""
+CanaOptimizer - Benchmark de Acesso Concorrente
+Mede leituras por segundo com 1, 2, 4... threads leitoras enquanto uma
+thread escritora inclui lotes de colheitas (ingestão de telemetria)
+
+Uso:
+    python scripts/benchmark_concorrencia.py --registros 200000 --leitores 1,2,4,8
+    python scripts/benchmark_concorrencia.py --exclusiva   # compara com trava única
+
+Com --exclusiva, leituras e escritas usam a mesma trava exclusiva (uma
+operação por vez), como referência para a trava de leitura/escrita.
+No CPython com GIL, o trabalho de CPU das leituras não roda em paralelo:
+o que a trava de leitura/escrita garante é que leitores não esperam uns
+pelos outros, então o total de leituras não cai com mais leitores e o
+escritor continua avançando.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from config import TIPOS_CANA, MARCAS_COLHEITADEIRAS, CONDICOES_CLIMATICAS
+from modules.concorrencia import ColheitaManagerConcorrente
+
+
+FAZENDAS = [f"Fazenda {i:03d}" for i in range(200)]
+CLASSIFICACOES = ('Ótima', 'Boa', 'Regular', 'Alta', 'Crítica')
+
+
+class TravaExclusiva:
+    """Referência: leitura e escrita com a mesma trava (RLock)"""
+
+    def __init__(self):
+        """Cria trava"""
+        self._trava = threading.RLock()
+
+    def leitura(self):
+        """Leitura também exclusiva"""
+        return self._trava
+
+    def escrita(self):
+        """Escrita exclusiva"""
+        return self._trava
+
+
+def gerar_dados(rng: random.Random) -> dict:
+    """
+    Dados sintéticos de uma colheita
+
+    Args:
+        rng (random.Random): Gerador aleatório
+
+    Returns:
+        dict: Dados para adicionar_colheita
+    """
+    return {
+        'fazenda': rng.choice(FAZENDAS),
+        'area_hectares': round(rng.uniform(5, 200), 2),
+        'tipo_cana': rng.choice(TIPOS_CANA),
+        'produtividade': round(rng.uniform(60, 130), 2),
+        'percentual_perda': round(rng.uniform(1, 20), 2),
+        'preco_tonelada': 120.0,
+        'colheitadeira': rng.choice(MARCAS_COLHEITADEIRAS),
+        'velocidade': round(rng.uniform(3, 9), 1),
+        'condicao_clima': rng.choice(CONDICOES_CLIMATICAS),
+        'data_colheita': f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+        'observacoes': ''
+    }
+
+
+def ler(manager, rng: random.Random):
+    """
+    Uma leitura típica de relatório/consulta (sorteada)
+
+    Args:
+        manager (ColheitaManagerConcorrente): Gerenciador
+        rng (random.Random): Gerador aleatório
+    """
+    escolha = rng.randrange(4)
+    if escolha == 0:
+        manager.buscar_por_id(rng.randint(1, manager.proximo_id))
+    elif escolha == 1:
+        manager.contar_combinacao({'classificacao': rng.choice(CLASSIFICACOES),
+                                   'condicao_clima': rng.choice(CONDICOES_CLIMATICAS)})
+    elif escolha == 2:
+        manager.listar_por_fazenda(rng.choice(FAZENDAS)).pagina(1, 20)
+    else:
+        manager.listar_maiores_perdas(10)
+
+
+def rodada(manager, leitores: int, duracao: float, lote: int) -> dict:
+    """
+    Executa leitores e um escritor ao mesmo tempo por `duracao` segundos
+
+    Args:
+        manager (ColheitaManagerConcorrente): Gerenciador preenchido
+        leitores (int): Threads leitoras
+        duracao (float): Segundos de medição
+        lote (int): Colheitas por lote do escritor
+
+    Returns:
+        dict: leituras, escritas, latência p99 da leitura e espera máxima do escritor
+    """
+    parar = threading.Event()
+    leituras = [0] * leitores
+    latencias = [[] for _ in range(leitores)]
+    escritas = [0]
+    esperas = []
+
+    def leitor(indice):
+        rng = random.Random(indice)
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            ler(manager, rng)
+            latencias[indice].append(time.perf_counter() - inicio)
+            leituras[indice] += 1
+
+    def escritor():
+        rng = random.Random(1000)
+        while not parar.is_set():
+            dados = [gerar_dados(rng) for _ in range(lote)]
+            inicio = time.perf_counter()
+            sucesso, quantidade, _ = manager.adicionar_em_lote(dados)
+            esperas.append(time.perf_counter() - inicio)
+            if sucesso:
+                escritas[0] += quantidade
+
+    threads = [threading.Thread(target=leitor, args=(i,)) for i in range(leitores)]
+    threads.append(threading.Thread(target=escritor))
+    for thread in threads:
+        thread.start()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+
+    todas = sorted(l for lista in latencias for l in lista)
+    return {
+        'leituras': sum(leituras),
+        'escritas': escritas[0],
+        'p99_leitura_ms': todas[int(0.99 * (len(todas) - 1))] * 1000 if todas else 0.0,
+        'lote_max_ms': max(esperas) * 1000 if esperas else 0.0,
+        'lote_mediana_ms': statistics.median(esperas) * 1000 if esperas else 0.0
+    }
+
+
+def verificar(manager) -> bool:
+    """
+    Confere consistência depois do estresse (IDs únicos e consecutivos,
+    índices com a mesma quantidade de registros)
+
+    Args:
+        manager (ColheitaManagerConcorrente): Gerenciador
+
+    Returns:
+        bool: True se consistente
+    """
+    with manager.leitura():
+        ids = [c.id for c in manager.colheitas]
+        return (ids == list(range(1, manager.proximo_id)) and
+                all(len(indice) == len(ids) for indice in manager._indices_ordenados.values()))
+
+
+def main():
+    """Executa o benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de acesso concorrente ao ColheitaManager")
+    parser.add_argument('--registros', type=int, default=200_000)
+    parser.add_argument('--leitores', default='1,2,4,8', help="Quantidades de leitores, separadas por vírgula")
+    parser.add_argument('--duracao', type=float, default=2.0, help="Segundos por rodada")
+    parser.add_argument('--lote', type=int, default=100, help="Colheitas por lote do escritor")
+    parser.add_argument('--exclusiva', action='store_true', help="Comparar com trava exclusiva")
+    args = parser.parse_args()
+
+    modos = [('leitura/escrita', None)]
+    if args.exclusiva:
+        modos.append(('exclusiva', TravaExclusiva))
+
+    rng = random.Random(42)
+    dados = [gerar_dados(rng) for _ in range(args.registros)]
+
+    for nome, classe_trava in modos:
+        print(f"\n🔒 Trava {nome}")
+        print(f"{'leitores':>8} {'leituras/s':>12} {'por leitor':>11} {'p99 (ms)':>9} "
+              f"{'colheitas/s':>12} {'lote med/máx (ms)':>18}")
+
+        for leitores in (int(n) for n in args.leitores.split(',')):
+            manager = ColheitaManagerConcorrente(classe_trava() if classe_trava else None)
+            manager.adicionar_em_lote(dados)
+
+            r = rodada(manager, leitores, args.duracao, args.lote)
+            por_segundo = r['leituras'] / args.duracao
+            print(f"{leitores:>8} {por_segundo:>12,.0f} {por_segundo / leitores:>11,.0f} "
+                  f"{r['p99_leitura_ms']:>9.2f} {r['escritas'] / args.duracao:>12,.0f} "
+                  f"{r['lote_mediana_ms']:>8.2f} / {r['lote_max_ms']:<8.2f}")
+
+            if not verificar(manager):
+                print("❌ Estado inconsistente após o estresse!")
+                sys.exit(1)
+
+    print("\n✅ Estado consistente em todas as rodadas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+CanaOptimizer - Benchmark de Shards
+Mede estatísticas, ranking e totalização com 1, 2, 4... shards
+(processos) contra um ColheitaManager único no mesmo processo
+
+Uso:
+    python scripts/benchmark_shards.py --registros 2000000 --shards 1,2,4,8
+
+O ganho depende de núcleos livres: com N núcleos, as passadas dos
+shards rodam ao mesmo tempo e o tempo cai perto de 1/N (o coordenador
+só junta somas, sketches e uma linha por grupo). Com um núcleo só, os
+shards disputam a mesma CPU e o resultado mede apenas o custo da
+comunicação entre processos.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from modules.colheita_manager import ColheitaManager
+from modules.shards import ColheitaManagerDistribuido
+from benchmark_concorrencia import gerar_dados
+
+
+CONSULTAS = ('obter_estatisticas', 'obter_ranking_fazendas', 'obter_totalizacao_por_tipo_cana')
+
+
+def medir(manager, repeticoes: int) -> dict:
+    """
+    Melhor tempo de cada consulta
+
+    Args:
+        manager: ColheitaManager ou ColheitaManagerDistribuido preenchido
+        repeticoes (int): Execuções por consulta
+
+    Returns:
+        dict: consulta -> (segundos, resultado)
+    """
+    tempos = {}
+    for nome in CONSULTAS:
+        melhor = float('inf')
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            resultado = getattr(manager, nome)()
+            melhor = min(melhor, time.perf_counter() - inicio)
+        tempos[nome] = (melhor, resultado)
+    return tempos
+
+
+def conferir(referencia, resultado) -> bool:
+    """
+    Compara resultado dos shards com o do manager único (somas e
+    contagens exatas a menos de arredondamento; quantis por sketch)
+
+    Args:
+        referencia (dict): Resultados de medir() no manager único
+        resultado (dict): Resultados de medir() nos shards
+
+    Returns:
+        bool: True se equivalentes
+    """
+    estat_ref = referencia['obter_estatisticas'][1]
+    estat = resultado['obter_estatisticas'][1]
+    if estat['total_colheitas'] != estat_ref['total_colheitas']:
+        return False
+    if not math.isclose(estat['perda_total_financeira'], estat_ref['perda_total_financeira']):
+        return False
+
+    ranking_ref = {r['fazenda']: r['colheitas'] for r in referencia['obter_ranking_fazendas'][1]}
+    ranking = {r['fazenda']: r['colheitas'] for r in resultado['obter_ranking_fazendas'][1]}
+    if ranking != ranking_ref:
+        return False
+
+    tipos_ref = referencia['obter_totalizacao_por_tipo_cana'][1]
+    tipos = resultado['obter_totalizacao_por_tipo_cana'][1]
+    return {t: v['quantidade'] for t, v in tipos.items()} == \
+        {t: v['quantidade'] for t, v in tipos_ref.items()}
+
+
+def main():
+    """Executa o benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de agregações em shards")
+    parser.add_argument('--registros', type=int, default=500_000)
+    parser.add_argument('--shards', default='1,2,4', help="Quantidades de shards, separadas por vírgula")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por consulta (vale a melhor)")
+    args = parser.parse_args()
+
+    print(f"🖥️  {os.cpu_count()} núcleo(s), {args.registros:,} colheitas")
+    rng = random.Random(42)
+    dados = [gerar_dados(rng) for _ in range(args.registros)]
+
+    unico = ColheitaManager()
+    unico.adicionar_em_lote(dados)
+    referencia = medir(unico, args.repeticoes)
+    del unico
+
+    print(f"\n{'shards':>8} " + ' '.join(f"{nome:>32}" for nome in CONSULTAS))
+    print(f"{'único':>8} " + ' '.join(f"{referencia[nome][0] * 1000:>29.1f} ms" for nome in CONSULTAS))
+
+    for shards in (int(n) for n in args.shards.split(',')):
+        with ColheitaManagerDistribuido(shards) as manager:
+            manager.adicionar_em_lote(dados)
+            resultado = medir(manager, args.repeticoes)
+
+        print(f"{shards:>8} " + ' '.join(
+            f"{resultado[nome][0] * 1000:>21.1f} ms ({referencia[nome][0] / resultado[nome][0]:4.1f}x)"
+            for nome in CONSULTAS))
+
+        if not conferir(referencia, resultado):
+            print("❌ Resultado dos shards difere do manager único!")
+            sys.exit(1)
+
+    print("\n✅ Resultados dos shards iguais aos do manager único")
+
+
+if __name__ == "__main__":
+    main()
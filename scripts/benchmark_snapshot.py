@@ -0,0 +1,107 @@
+"""
+CanaOptimizer - Benchmark de Inicialização (Snapshot)
+Mede o tempo para salvar e restaurar o estado do ColheitaManager
+
+Uso:
+    python scripts/benchmark_snapshot.py --registros 1000000
+    python scripts/benchmark_snapshot.py --historico data/bench_snapshot.csv
+
+Referência (1 núcleo, 1M colheitas): salvar ~4 s, restaurar ~6 s. Índices
+de categoria e bitmap voltam do arquivo como estão (~0,1 s); o restante é
+decodificar as colunas (~1 s), criar as colheitas e montar os pares
+(chave, id) dos três índices ordenados (~1 s cada, acesso aleatório às
+colheitas na ordem do índice).
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from config import TIPOS_CANA, MARCAS_COLHEITADEIRAS, CONDICOES_CLIMATICAS
+from modules.colheita_manager import ColheitaManager
+
+
+def gerar_manager(total: int, semente: int = 42) -> ColheitaManager:
+    """
+    Cria gerenciador com colheitas sintéticas
+
+    Args:
+        total (int): Quantidade de colheitas
+        semente (int): Semente do gerador aleatório
+
+    Returns:
+        ColheitaManager: Gerenciador preenchido
+    """
+    rng = random.Random(semente)
+    manager = ColheitaManager()
+    fazendas = [f"Fazenda {i:03d}" for i in range(200)]
+
+    for _ in range(total):
+        manager.adicionar_colheita({
+            'fazenda': rng.choice(fazendas),
+            'area_hectares': round(rng.uniform(5, 200), 2),
+            'tipo_cana': rng.choice(TIPOS_CANA),
+            'produtividade': round(rng.uniform(60, 130), 2),
+            'percentual_perda': round(rng.uniform(1, 20), 2),
+            'preco_tonelada': 120.0,
+            'colheitadeira': rng.choice(MARCAS_COLHEITADEIRAS),
+            'velocidade': round(rng.uniform(3, 9), 1),
+            'condicao_clima': rng.choice(CONDICOES_CLIMATICAS),
+            'data_colheita': f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/2024",
+            'observacoes': ''
+        })
+
+    return manager
+
+
+def main():
+    """Executa o benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark de snapshot do ColheitaManager")
+    parser.add_argument('--registros', type=int, default=1_000_000)
+    parser.add_argument('--sem-mmap', action='store_true', help="Ler sem mmap")
+    parser.add_argument('--historico', help="CSV onde acumular os resultados")
+    args = parser.parse_args()
+
+    print(f"🔄 Gerando {args.registros} colheitas...")
+    manager = gerar_manager(args.registros)
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'benchmark.snap')
+
+        inicio = time.perf_counter()
+        sucesso, _, mensagem = manager.salvar_snapshot(caminho)
+        tempo_salvar = time.perf_counter() - inicio
+        if not sucesso:
+            print(mensagem)
+            sys.exit(1)
+        tamanho = os.path.getsize(caminho)
+
+        restaurado = ColheitaManager()
+        inicio = time.perf_counter()
+        sucesso, total, mensagem = restaurado.carregar_snapshot(caminho, usar_mmap=not args.sem_mmap)
+        tempo_carregar = time.perf_counter() - inicio
+        if not sucesso or total != args.registros:
+            print(mensagem)
+            sys.exit(1)
+
+    print(f"💾 Arquivo: {tamanho / 1024 / 1024:.1f} MB ({tamanho / args.registros:.1f} bytes/registro)")
+    print(f"⏱️  Salvar: {tempo_salvar:.3f} s")
+    print(f"⏱️  Restaurar: {tempo_carregar:.3f} s")
+
+    if args.historico:
+        novo = not os.path.exists(args.historico)
+        with open(args.historico, 'a', encoding='utf-8') as arquivo:
+            if novo:
+                arquivo.write("data;registros;mmap;bytes;salvar_s;restaurar_s\n")
+            arquivo.write(f"{datetime.now().isoformat(timespec='seconds')};{args.registros};"
+                          f"{not args.sem_mmap};{tamanho};{tempo_salvar:.4f};{tempo_carregar:.4f}\n")
+
+
+if __name__ == "__main__":
+    main()
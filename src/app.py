@@ -11,16 +11,19 @@ Demonstra:
 
 import os
 from datetime import datetime
+from itertools import islice
 from config import (
     TIPOS_CANA, 
     MARCAS_COLHEITADEIRAS, 
     CONDICOES_CLIMATICAS,
-    PARAMETROS_COLHEITA
+    PARAMETROS_COLHEITA,
+    CONFIG_INTERFACE
 )
 from modules.validations import (
     validar_numero_positivo,
     validar_percentual,
     validar_texto_nao_vazio,
+    validar_data,
     validar_opcao_menu,
     validar_escolha_lista,
     confirmar_acao,
@@ -33,11 +36,22 @@ from modules.calculations import (
     projetar_economia_anual
 )
 from modules.colheita_manager import ColheitaManager
+from modules.monte_carlo import simular_economia_monte_carlo, ajustar_distribuicao
+from modules.modelo_perda import ModeloPerdaOnline
+from modules.recomendador_velocidade import RecomendadorVelocidade
+from modules.janelas import EstatisticasJanela, TODAS_FAZENDAS
+from modules.anomalias import DetectorAnomalias
+from modules.consulta import Consulta
+from utils.journal import JournalColheitas
 from utils.file_handler import (
     salvar_relatorio_texto,
     salvar_dados_json,
     exportar_colheitas_json,
+    exportar_colheitas_delta,
+    exportar_colheitas_csv,
+    importar_colheitas_csv,
     listar_arquivos_exportados,
+    contar_arquivos_exportados,
     gerar_cabecalho_relatorio,
     gerar_rodape_relatorio,
     formatar_tamanho_arquivo
@@ -113,6 +127,27 @@ def escolher_da_lista(titulo: str, opcoes: tuple, permitir_outro: bool = True) -
         print("❌ Opção inválida! Tente novamente.")
 
 
+def exibir_alerta_anomalia(alerta: dict):
+    """
+    Exibe alerta de perda anômala (assinante do DetectorAnomalias)
+    
+    Args:
+        alerta (dict): Alerta emitido pelo detector
+    """
+    print("\n" + "!" * 80)
+    print(f"🚨 ALERTA DE PERDA - Colheita {alerta['id']} | {alerta['fazenda']} | "
+          f"{alerta['colheitadeira']}")
+    print(f"   ⚠️  Perda: {alerta['percentual_perda']:.2f}%", end="")
+    if alerta['perda_esperada'] is not None:
+        print(f" (esperada: {alerta['perda_esperada']:.2f}%, z-score: {alerta['z_score']:.1f})", end="")
+    print()
+    if 'z_score' in alerta['motivos']:
+        print("   🔧 Perda muito acima do padrão desta colheitadeira: verificar calibração!")
+    if 'perda_alerta' in alerta['motivos']:
+        print(f"   📢 Acima do limite de alerta ({PARAMETROS_COLHEITA['perda_alerta']:.1f}%)")
+    print("!" * 80)
+
+
 def registrar_nova_colheita(manager: ColheitaManager):
     """
     Registra nova colheita no sistema
@@ -238,6 +273,30 @@ def registrar_nova_colheita(manager: ColheitaManager):
     pausar()
 
 
+def ler_periodo() -> tuple:
+    """
+    Lê período (datas inicial e final opcionais)
+    
+    Returns:
+        tuple: (data_inicio, data_fim) - None no lugar da data não informada;
+               None se alguma data for inválida
+    """
+    datas = []
+    
+    for titulo in ("Data inicial", "Data final"):
+        entrada = input(f"{titulo} (DD/MM/YYYY) [sem limite]: ").strip()
+        if not entrada:
+            datas.append(None)
+            continue
+        valido, data, msg_erro = validar_data(entrada, titulo)
+        if not valido:
+            print(msg_erro)
+            return None
+        datas.append(data)
+    
+    return tuple(datas)
+
+
 def consultar_colheitas(manager: ColheitaManager):
     """
     Consulta e exibe colheitas registradas
@@ -254,6 +313,10 @@ def consultar_colheitas(manager: ColheitaManager):
     print("2 - Buscar por fazenda")
     print("3 - Filtrar por classificação")
     print("4 - Buscar por ID")
+    print("5 - Filtrar por período")
+    print("6 - Filtrar por faixa de perda (%)")
+    print("7 - Maiores perdas (top N)")
+    print("8 - Consulta combinada (fazenda + classificação + período + perda)")
     print("0 - Voltar")
     
     opcao = input("\nEscolha: ").strip()
@@ -278,37 +341,166 @@ def consultar_colheitas(manager: ColheitaManager):
                 colheitas = [colheita]
             else:
                 print("\n❌ Colheita não encontrada!")
+    elif opcao == '5':
+        periodo = ler_periodo()
+        if periodo is not None:
+            colheitas = manager.listar_por_periodo(*periodo)
+    elif opcao == '6':
+        valido_min, minimo, msg_min = validar_percentual(input("\nPerda mínima (%): ").strip(),
+                                                         "Perda mínima")
+        valido_max, maximo, msg_max = validar_percentual(input("Perda máxima (%): ").strip(),
+                                                         "Perda máxima")
+        if valido_min and valido_max:
+            colheitas = manager.listar_por_faixa_perda(minimo, maximo)
+        else:
+            print(msg_min or msg_max)
+    elif opcao == '7':
+        valido, quantidade, msg_erro = validar_numero_positivo(
+            input("\nQuantidade de colheitas: ").strip(), "Quantidade")
+        if valido:
+            print("\n1 - Por percentual de perda")
+            print("2 - Por perda financeira (R$)")
+            campo = 'perda_financeira' if input("Escolha: ").strip() == '2' else 'percentual_perda'
+            colheitas = manager.listar_maiores_perdas(int(quantidade), campo)
+        else:
+            print(msg_erro)
+    elif opcao == '8':
+        print("\n(ENTER para não filtrar pelo campo)")
+        consulta = Consulta(manager)
+        
+        fazenda = input("Fazenda: ").strip()
+        if fazenda:
+            consulta.igual('fazenda', fazenda)
+        
+        classificacao = input("Classificação (Ótima, Boa, Regular, Alta, Crítica): ").strip().title()
+        if classificacao:
+            consulta.igual('classificacao', classificacao)
+        
+        periodo = ler_periodo()
+        if periodo is None:
+            pausar()
+            return
+        if periodo != (None, None):
+            consulta.entre('data_colheita', *periodo)
+        
+        entrada = input("Perda mínima (%): ").strip()
+        if entrada:
+            valido, minimo, msg_erro = validar_percentual(entrada, "Perda mínima")
+            if not valido:
+                print(msg_erro)
+                pausar()
+                return
+            consulta.entre('percentual_perda', minimo=minimo)
+        
+        print(f"\n{consulta.explicar()}")
+        colheitas = consulta.executar()
     elif opcao == '0':
         return
     
     if colheitas:
-        print(f"\n📋 {len(colheitas)} COLHEITA(S) ENCONTRADA(S)")
-        print("=" * 80)
-        
-        for c in colheitas:
-            print(f"\n🆔 ID: {c['id']} | 🌾 Fazenda: {c['fazenda']}")
-            print(f"📅 Data: {c['data_colheita']} | 📏 Área: {c['area_hectares']:.2f} ha")
-            print(f"🌱 Tipo: {c['tipo_cana']} | 📊 Produtividade: {c['produtividade']:.2f} t/ha")
-            print(f"⚠️  Perda: {c['percentual_perda']:.2f}% ({c['toneladas_perdidas']:.2f} t)")
-            print(f"💰 Perda financeira: R$ {c['perda_financeira']:,.2f}")
-            print(f"✅ Eficiência: {c['eficiencia']:.2f}% | 📊 Classificação: {c['classificacao']}")
-            print(f"🚜 Colheitadeira: {c['colheitadeira']} | ⚡ {c['velocidade']:.1f} km/h")
-            print(f"🌤️  Clima: {c['condicao_clima']}")
-            if c['observacoes']:
-                print(f"📝 Obs: {c['observacoes']}")
-            print("-" * 80)
+        exibir_paginado(colheitas)
     else:
         print("\n📭 Nenhuma colheita encontrada!")
     
     pausar()
 
 
-def gerar_relatorios(manager: ColheitaManager):
+def exibir_colheita(c):
+    """
+    Exibe os dados de uma colheita
+    
+    Args:
+        c (Colheita): Registro de colheita
+    """
+    print(f"\n🆔 ID: {c['id']} | 🌾 Fazenda: {c['fazenda']}")
+    print(f"📅 Data: {c['data_colheita']} | 📏 Área: {c['area_hectares']:.2f} ha")
+    print(f"🌱 Tipo: {c['tipo_cana']} | 📊 Produtividade: {c['produtividade']:.2f} t/ha")
+    print(f"⚠️  Perda: {c['percentual_perda']:.2f}% ({c['toneladas_perdidas']:.2f} t)")
+    print(f"💰 Perda financeira: R$ {c['perda_financeira']:,.2f}")
+    print(f"✅ Eficiência: {c['eficiencia']:.2f}% | 📊 Classificação: {c['classificacao']}")
+    print(f"🚜 Colheitadeira: {c['colheitadeira']} | ⚡ {c['velocidade']:.1f} km/h")
+    print(f"🌤️  Clima: {c['condicao_clima']}")
+    if c['observacoes']:
+        print(f"📝 Obs: {c['observacoes']}")
+    print("-" * 80)
+
+
+def exibir_paginado(colheitas):
+    """
+    Exibe colheitas página a página, lendo cada página só quando pedida
+    (visões do manager não são copiadas; o iterador avança uma vez)
+    
+    Args:
+        colheitas (VisaoColheitas/list): Colheitas a exibir
+    """
+    tamanho = CONFIG_INTERFACE['colheitas_por_pagina']
+    total = len(colheitas)
+    paginas = -(-total // tamanho)
+    iterador = iter(colheitas)
+    
+    print(f"\n📋 {total} COLHEITA(S) ENCONTRADA(S)")
+    print("=" * 80)
+    
+    for numero in range(1, paginas + 1):
+        for c in islice(iterador, tamanho):
+            exibir_colheita(c)
+        
+        print(f"\n📄 Página {numero} de {paginas}")
+        if numero < paginas and input("ENTER para a próxima página ou 0 para parar: ").strip() == '0':
+            break
+
+
+def montar_relatorio_completo(versao) -> str:
+    """
+    Seções do relatório completo (estatísticas, ranking, maiores perdas e
+    detalhamento), todas calculadas sobre a mesma versão das colheitas
+    
+    Args:
+        versao (VersaoColheitas): Versão fixada do gerenciador
+        
+    Returns:
+        str: Texto das seções
+    """
+    stats = versao.obter_estatisticas()
+    relatorio = f"\nVersão dos dados: alteração nº {versao.sequencia}\n"
+    
+    relatorio += "\n\n=== ESTATÍSTICAS GERAIS ===\n"
+    relatorio += f"Total de colheitas: {stats['total_colheitas']}\n"
+    relatorio += f"Área total: {stats['area_total']:.2f} ha\n"
+    relatorio += f"Perda média: {stats['perda_media']:.2f}%\n"
+    relatorio += (f"Perda mediana / P90 / P99: {stats['perda_mediana']:.2f}% / "
+                  f"{stats['perda_p90']:.2f}% / {stats['perda_p99']:.2f}%\n")
+    relatorio += f"Toneladas perdidas: {stats['toneladas_perdidas_total']:.2f} t\n"
+    relatorio += f"Perda financeira: R$ {stats['perda_total_financeira']:,.2f}\n"
+    relatorio += f"Eficiência média: {stats['eficiencia_media']:.2f}%\n"
+    
+    relatorio += "\n\n=== RANKING DE FAZENDAS ===\n"
+    ranking = versao.obter_ranking_fazendas()
+    for i, faz in enumerate(ranking, 1):
+        relatorio += f"{i}º - {faz['fazenda']} - Eficiência: {faz['eficiencia_media']:.2f}%\n"
+    
+    relatorio += "\n\n=== 10 MAIORES PERDAS FINANCEIRAS ===\n"
+    for c in versao.listar_maiores_perdas(10, 'perda_financeira'):
+        relatorio += (f"ID {c['id']} - {c['fazenda']} ({c['data_colheita']}): "
+                      f"R$ {c['perda_financeira']:,.2f} ({c['percentual_perda']:.2f}%)\n")
+    
+    relatorio += "\n\n=== DETALHAMENTO DE COLHEITAS ===\n"
+    for c in versao.listar_todas():
+        relatorio += f"\nID: {c['id']} | Fazenda: {c['fazenda']}\n"
+        relatorio += f"Data: {c['data_colheita']} | Área: {c['area_hectares']:.2f} ha\n"
+        relatorio += f"Perda: {c['percentual_perda']:.2f}% | Classificação: {c['classificacao']}\n"
+        relatorio += "-" * 80 + "\n"
+    
+    return relatorio
+
+
+def gerar_relatorios(manager: ColheitaManager, janelas: EstatisticasJanela):
     """
     Gera relatórios e estatísticas
     
     Args:
         manager (ColheitaManager): Gerenciador de colheitas
+        janelas (EstatisticasJanela): Acumuladores diários para janelas móveis
     """
     limpar_tela()
     exibir_logo()
@@ -319,17 +511,28 @@ def gerar_relatorios(manager: ColheitaManager):
     print("2 - Ranking de Fazendas")
     print("3 - Análise por Tipo de Cana")
     print("4 - Gerar Relatório Completo (TXT)")
+    print("5 - Perdas Móveis (7 e 30 dias) por Fazenda")
+    print("6 - Análise Personalizada (agrupamento)")
     print("0 - Voltar")
     
     opcao = input("\nEscolha: ").strip()
     
     if opcao == '1':
-        stats = manager.obter_estatisticas()
+        print("\n📅 Período (ENTER nas duas datas para todo o histórico)")
+        periodo = ler_periodo()
+        if periodo is None:
+            pausar()
+            return
+        stats = manager.obter_estatisticas(*periodo)
         print("\n📊 ESTATÍSTICAS GERAIS")
+        if periodo != (None, None):
+            print(f"📅 Período: {periodo[0] or 'início'} a {periodo[1] or 'última colheita'}")
         print("=" * 80)
         print(f"📋 Total de colheitas: {stats['total_colheitas']}")
         print(f"📏 Área total: {stats['area_total']:.2f} ha")
         print(f"⚠️  Perda média: {stats['perda_media']:.2f}%")
+        print(f"📈 Perda mediana / P90 / P99: {stats['perda_mediana']:.2f}% / "
+              f"{stats['perda_p90']:.2f}% / {stats['perda_p99']:.2f}%")
         print(f"📦 Toneladas perdidas: {stats['toneladas_perdidas_total']:.2f} t")
         print(f"💰 Perda financeira total: R$ {stats['perda_total_financeira']:,.2f}")
         print(f"✅ Eficiência média: {stats['eficiencia_media']:.2f}%")
@@ -342,6 +545,9 @@ def gerar_relatorios(manager: ColheitaManager):
             print(f"{i}º - {fazenda['fazenda']}")
             print(f"    ✅ Eficiência: {fazenda['eficiencia_media']:.2f}%")
             print(f"    ⚠️  Perda média: {fazenda['perda_media']:.2f}%")
+            quantis = manager.obter_quantis_perda('fazenda', fazenda['fazenda'])
+            print(f"    📈 Mediana / P90 / P99: {quantis['P50']:.2f}% / "
+                  f"{quantis['P90']:.2f}% / {quantis['P99']:.2f}%")
             print(f"    📋 Colheitas: {fazenda['colheitas']}")
             print("-" * 40)
     
@@ -354,32 +560,18 @@ def gerar_relatorios(manager: ColheitaManager):
             print(f"   📋 Quantidade: {dados['quantidade']}")
             print(f"   📏 Área total: {dados['area_total']:.2f} ha")
             print(f"   ⚠️  Perda média: {dados['perda_media']:.2f}%")
+            quantis = manager.obter_quantis_perda('tipo_cana', tipo)
+            print(f"   📈 Mediana / P90 / P99: {quantis['P50']:.2f}% / "
+                  f"{quantis['P90']:.2f}% / {quantis['P99']:.2f}%")
             print("-" * 40)
     
     elif opcao == '4':
         # Gerar relatório completo
         relatorio = gerar_cabecalho_relatorio("RELATÓRIO COMPLETO DE COLHEITAS")
         
-        stats = manager.obter_estatisticas()
-        relatorio += "\n\n=== ESTATÍSTICAS GERAIS ===\n"
-        relatorio += f"Total de colheitas: {stats['total_colheitas']}\n"
-        relatorio += f"Área total: {stats['area_total']:.2f} ha\n"
-        relatorio += f"Perda média: {stats['perda_media']:.2f}%\n"
-        relatorio += f"Toneladas perdidas: {stats['toneladas_perdidas_total']:.2f} t\n"
-        relatorio += f"Perda financeira: R$ {stats['perda_total_financeira']:,.2f}\n"
-        relatorio += f"Eficiência média: {stats['eficiencia_media']:.2f}%\n"
-        
-        relatorio += "\n\n=== RANKING DE FAZENDAS ===\n"
-        ranking = manager.obter_ranking_fazendas()
-        for i, faz in enumerate(ranking, 1):
-            relatorio += f"{i}º - {faz['fazenda']} - Eficiência: {faz['eficiencia_media']:.2f}%\n"
-        
-        relatorio += "\n\n=== DETALHAMENTO DE COLHEITAS ===\n"
-        for c in manager.listar_todas():
-            relatorio += f"\nID: {c['id']} | Fazenda: {c['fazenda']}\n"
-            relatorio += f"Data: {c['data_colheita']} | Área: {c['area_hectares']:.2f} ha\n"
-            relatorio += f"Perda: {c['percentual_perda']:.2f}% | Classificação: {c['classificacao']}\n"
-            relatorio += "-" * 80 + "\n"
+        # Todas as seções leem a mesma versão, mesmo com inclusões em andamento
+        with manager.fixar_versao() as versao:
+            relatorio += montar_relatorio_completo(versao)
         
         relatorio += gerar_rodape_relatorio()
         
@@ -388,41 +580,130 @@ def gerar_relatorios(manager: ColheitaManager):
         if sucesso:
             print(f"📁 Arquivo: {caminho}")
     
+    elif opcao == '5':
+        entrada = input("\nData de referência (DD/MM/YYYY) [hoje]: ").strip()
+        referencia = datetime.now().strftime('%d/%m/%Y')
+        if entrada:
+            valido, referencia, msg_erro = validar_data(entrada, "Data de referência")
+            if not valido:
+                print(msg_erro)
+                pausar()
+                return
+        
+        print(f"\n📅 PERDAS MÓVEIS ATÉ {referencia}")
+        print("=" * 80)
+        for dias in (7, 30):
+            total = janelas.estatisticas_janela(TODAS_FAZENDAS, dias, referencia)
+            print(f"\n🗓️  Últimos {dias} dias: {total['quantidade']} colheita(s) | "
+                  f"Perda média: {total['perda_media']:.2f}% | "
+                  f"Perda financeira: R$ {total['perda_financeira']:,.2f}")
+            for item in janelas.ranking_janela(dias, referencia):
+                print(f"   🌾 {item['fazenda']:<30} {item['perda_media']:>6.2f}% "
+                      f"({item['quantidade']} colheita(s), {item['toneladas_perdidas']:.2f} t)")
+    
+    elif opcao == '6':
+        dimensoes_disponiveis = ('fazenda', 'tipo_cana', 'colheitadeira',
+                                 'condicao_clima', 'classificacao', 'mes')
+        print("\n🧮 Agrupar por (números separados por vírgula):")
+        for i, dimensao in enumerate(dimensoes_disponiveis, 1):
+            print(f"{i} - {dimensao}")
+        
+        escolhas = [e.strip() for e in input("\nEscolha: ").split(',') if e.strip()]
+        if not escolhas or not all(e.isdigit() and 1 <= int(e) <= len(dimensoes_disponiveis)
+                                   for e in escolhas):
+            print("❌ Escolha inválida!")
+            pausar()
+            return
+        dimensoes = list(dict.fromkeys(dimensoes_disponiveis[int(e) - 1] for e in escolhas))
+        
+        linhas = manager.agregar(dimensoes, [('percentual_perda', 'media'),
+                                             ('perda_financeira', 'soma'),
+                                             ('percentual_perda', 'contagem')])
+        linhas.sort(key=lambda linha: linha['soma_perda_financeira'], reverse=True)
+        
+        print(f"\n🧮 PERDAS POR {' × '.join(d.upper() for d in dimensoes)}")
+        print("=" * 80)
+        for linha in linhas:
+            grupo = ' | '.join(str(linha[d]) for d in dimensoes)
+            print(f"📌 {grupo}")
+            print(f"    📋 {linha['contagem']} colheita(s) | "
+                  f"⚠️  Perda média: {linha['media_percentual_perda']:.2f}% | "
+                  f"💰 R$ {linha['soma_perda_financeira']:,.2f}")
+    
     pausar()
 
 
-def exportar_dados(manager: ColheitaManager):
+def exportar_dados(manager: ColheitaManager, detector: DetectorAnomalias):
     """
-    Exporta dados para JSON
+    Exporta dados para JSON/CSV e importa colheitas de CSV
     
     Args:
         manager (ColheitaManager): Gerenciador de colheitas
+        detector (DetectorAnomalias): Alertas da importação viram um resumo
     """
     limpar_tela()
     exibir_logo()
-    print("\n💾 EXPORTAR DADOS")
+    print("\n💾 EXPORTAR / IMPORTAR DADOS")
     print("=" * 80)
     
     colheitas = manager.listar_todas()
     
-    if not colheitas:
+    print(f"\n📋 {len(colheitas)} colheita(s) registrada(s)")
+    
+    print("\n1 - Exportação completa (JSON)")
+    print("2 - Exportação incremental (somente alterações desde a última)")
+    print("3 - Exportação CSV")
+    print("4 - Importar colheitas de CSV")
+    print("0 - Voltar")
+    
+    opcao = input("\nEscolha: ").strip()
+    
+    if opcao in ['1', '2', '3'] and not colheitas:
         print("\n📭 Nenhuma colheita para exportar!")
         pausar()
         return
     
-    print(f"\n📋 {len(colheitas)} colheita(s) registrada(s)")
-    
-    if confirmar_acao("Exportar para JSON?"):
-        sucesso, caminho, mensagem = exportar_colheitas_json(colheitas)
+    if opcao == '1':
+        sucesso, caminho, mensagem = exportar_colheitas_json([c.to_dict() for c in colheitas])
+    elif opcao == '2':
+        sucesso, caminho, mensagem = exportar_colheitas_delta(manager)
+    elif opcao == '3':
+        sucesso, caminho, mensagem = exportar_colheitas_csv(manager.iterar_linhas_exportacao())
+    elif opcao == '4':
+        caminho = input("\nCaminho do arquivo CSV: ").strip()
+        # Um bloco de alerta por linha inundaria a tela: só o resumo no fim
+        with detector.alertas_em_lote() as alertas:
+            sucesso, resumo, mensagem = importar_colheitas_csv(caminho, manager)
         print(f"\n{mensagem}")
-        if sucesso:
-            print(f"📁 Arquivo: {caminho}")
+        for numero_linha, erro in resumo['erros']:
+            print(f"   Linha {numero_linha}: {erro}")
+        if alertas['total']:
+            print(f"\n🚨 {alertas['total']} alerta(s) de perda nas colheitas importadas")
+            mais_alertas = sorted(alertas['por_fazenda'].items(), key=lambda x: x[1], reverse=True)
+            for fazenda, quantidade in mais_alertas[:5]:
+                print(f"   ⚠️  {fazenda}: {quantidade}")
+        pausar()
+        return
+    else:
+        return
+    
+    print(f"\n{mensagem}")
+    if sucesso:
+        print(f"📁 Arquivo: {caminho}")
     
     pausar()
 
 
-def calcular_simulacoes():
-    """Realiza cálculos e simulações"""
+def calcular_simulacoes(manager: ColheitaManager, modelo_perda: ModeloPerdaOnline,
+                        recomendador: RecomendadorVelocidade):
+    """
+    Realiza cálculos e simulações
+    
+    Args:
+        manager (ColheitaManager): Gerenciador (histórico para a simulação Monte Carlo)
+        modelo_perda (ModeloPerdaOnline): Modelo treinado com as colheitas registradas
+        recomendador (RecomendadorVelocidade): Melhores faixas de velocidade do histórico
+    """
     limpar_tela()
     exibir_logo()
     print("\n🧮 CALCULAR SIMULAÇÕES")
@@ -432,6 +713,8 @@ def calcular_simulacoes():
     print("2 - Simular perda financeira")
     print("3 - Calcular economia potencial")
     print("4 - Projetar economia anual")
+    print("5 - Simulação Monte Carlo (P10/P50/P90 da economia anual)")
+    print("6 - Planejar colheita (perda prevista e velocidade recomendada por clima)")
     print("0 - Voltar")
     
     opcao = input("\nEscolha: ").strip()
@@ -499,6 +782,14 @@ def calcular_simulacoes():
                 )
                 print(f"\n💰 Economia projetada anual: R$ {economia_anual:,.2f}")
                 print(f"📊 Com {int(safras_ano)} safra(s) por ano")
+        
+        elif opcao == '5':
+            simular_monte_carlo(manager)
+            return
+        
+        elif opcao == '6':
+            planejar_colheita(modelo_perda, recomendador)
+            return
     
     except Exception as e:
         print(f"\n❌ Erro: {str(e)}")
@@ -506,19 +797,130 @@ def calcular_simulacoes():
     pausar()
 
 
-def gerenciar_arquivos():
-    """Gerencia arquivos exportados"""
-    limpar_tela()
-    exibir_logo()
-    print("\n📁 GERENCIAR ARQUIVOS EXPORTADOS")
+def simular_monte_carlo(manager: ColheitaManager):
+    """
+    Simulação Monte Carlo com perda, produtividade e preço ajustados ao histórico
+    
+    Args:
+        manager (ColheitaManager): Gerenciador de colheitas
+    """
+    colheitas = manager.listar_todas()
+    
+    if len(colheitas) < 2:
+        print("\n📭 São necessárias ao menos 2 colheitas registradas para ajustar as distribuições!")
+        pausar()
+        return
+    
+    print("\n📊 DADOS PARA SIMULAÇÃO MONTE CARLO")
+    print(f"📋 Distribuições ajustadas a {len(colheitas)} colheita(s) do histórico")
+    area = obter_entrada_valida("Área (hectares): ", validar_numero_positivo)
+    safras_ano = obter_entrada_valida("Número de safras por ano: ", validar_numero_positivo)
+    n_simulacoes = obter_entrada_valida("Número de cenários (ex: 1000000): ", validar_numero_positivo)
+    
+    sucesso, resultado, mensagem = simular_economia_monte_carlo(
+        area,
+        produtividade=ajustar_distribuicao([c['produtividade'] for c in colheitas], 'normal'),
+        perda_atual=ajustar_distribuicao([c['percentual_perda'] for c in colheitas], 'normal'),
+        preco_tonelada=ajustar_distribuicao([c['preco_tonelada'] for c in colheitas], 'normal'),
+        safras_ano=int(safras_ano),
+        n_simulacoes=int(n_simulacoes),
+        processos=os.cpu_count() or 1
+    )
+    
+    print(f"\n{mensagem}")
+    
+    if sucesso:
+        print("\n" + "=" * 80)
+        print("📊 RESULTADOS")
+        print("=" * 80)
+        for titulo, chave in (("💰 Economia anual", 'economia_anual'),
+                              ("⚠️  Perda financeira por safra", 'perda_financeira')):
+            dados = resultado[chave]
+            print(f"\n{titulo}")
+            for nome, valor in dados['quantis'].items():
+                print(f"   {nome}: R$ {valor:,.2f}")
+            print(f"   Média: R$ {dados['media']:,.2f} | Desvio: R$ {dados['desvio']:,.2f}")
+        
+        # Histograma textual da economia anual
+        histograma = resultado['economia_anual']['histograma']
+        maior = max(histograma['contagens']) or 1
+        print("\n📈 Distribuição da economia anual")
+        for i, contagem in enumerate(histograma['contagens']):
+            barra = "█" * round(40 * contagem / maior)
+            print(f"   R$ {histograma['limites'][i]:>14,.2f} | {barra}")
+    
+    pausar()
+
+
+def planejar_colheita(modelo_perda: ModeloPerdaOnline, recomendador: RecomendadorVelocidade):
+    """
+    Prevê a perda de uma colheita planejada em cada condição climática
+    e mostra a faixa de velocidade com menor perda no histórico
+    
+    Args:
+        modelo_perda (ModeloPerdaOnline): Modelo treinado com as colheitas registradas
+        recomendador (RecomendadorVelocidade): Melhores faixas de velocidade do histórico
+    """
+    if modelo_perda.total < 2:
+        print("\n📭 São necessárias ao menos 2 colheitas registradas para o modelo!")
+        pausar()
+        return
+    
+    print("\n📊 COLHEITA PLANEJADA")
+    tipo_cana = escolher_da_lista("🌱 TIPO DE CANA", TIPOS_CANA)
+    colheitadeira = escolher_da_lista("🚜 COLHEITADEIRA", MARCAS_COLHEITADEIRAS)
+    velocidade = obter_entrada_valida("Velocidade planejada (km/h): ", validar_numero_positivo)
+    
+    planejadas = [{
+        'velocidade': velocidade,
+        'condicao_clima': clima,
+        'colheitadeira': colheitadeira,
+        'tipo_cana': tipo_cana
+    } for clima in CONDICOES_CLIMATICAS]
+    previsoes = modelo_perda.prever_lote(planejadas)
+    resumo = modelo_perda.obter_resumo()
+    
+    print("\n" + "=" * 80)
+    print("📊 PERDA PREVISTA E VELOCIDADE RECOMENDADA POR CLIMA")
     print("=" * 80)
+    for clima, perda in zip(CONDICOES_CLIMATICAS, previsoes):
+        alerta = " ⚠️" if perda >= PARAMETROS_COLHEITA['perda_alerta'] else "  "
+        recomendacao = recomendador.recomendar(colheitadeira, clima, tipo_cana)
+        if recomendacao is None:
+            faixa = "sem histórico suficiente"
+        else:
+            faixa = (f"{recomendacao['velocidade_min']:.1f}-{recomendacao['velocidade_max']:.1f} km/h "
+                     f"(perda média {recomendacao['perda_media']:.2f}%, "
+                     f"{recomendacao['registros']} colheita(s))")
+        print(f"   {clima:<22} {perda:>6.2f}%{alerta} | 🚜 {faixa}")
+    print(f"\n📋 Modelo com {resumo['total']} colheita(s) | R²: {resumo['r2']:.2f} | "
+          f"Erro padrão: {resumo['erro_padrao']:.2f} p.p.")
     
-    arquivos = listar_arquivos_exportados()
+    pausar()
+
+
+def gerenciar_arquivos():
+    """Gerencia arquivos exportados (listagem paginada)"""
+    tamanho_pagina = 20
+    pagina = 1
     
-    if not arquivos:
-        print("\n📭 Nenhum arquivo exportado encontrado!")
-    else:
-        print(f"\n📋 {len(arquivos)} arquivo(s) encontrado(s):")
+    while True:
+        limpar_tela()
+        exibir_logo()
+        print("\n📁 GERENCIAR ARQUIVOS EXPORTADOS")
+        print("=" * 80)
+        
+        total = contar_arquivos_exportados()
+        
+        if total == 0:
+            print("\n📭 Nenhum arquivo exportado encontrado!")
+            break
+        
+        total_paginas = (total + tamanho_pagina - 1) // tamanho_pagina
+        pagina = min(pagina, total_paginas)
+        arquivos = listar_arquivos_exportados(pagina=pagina, tamanho_pagina=tamanho_pagina)
+        
+        print(f"\n📋 {total} arquivo(s) encontrado(s) - Página {pagina}/{total_paginas}")
         print("-" * 80)
         for arq in arquivos:
             tamanho = formatar_tamanho_arquivo(arq['tamanho_bytes'])
@@ -527,6 +929,19 @@ def gerenciar_arquivos():
             print(f"   💾 Tamanho: {tamanho}")
             print(f"   📅 Modificado: {arq['data_modificacao']}")
             print(f"   📁 Caminho: {arq['caminho']}")
+        
+        if total_paginas == 1:
+            break
+        
+        print("\n[P] Próxima | [A] Anterior | [0] Voltar")
+        navegacao = input("Escolha: ").strip().upper()
+        
+        if navegacao == 'P' and pagina < total_paginas:
+            pagina += 1
+        elif navegacao == 'A' and pagina > 1:
+            pagina -= 1
+        elif navegacao == '0':
+            return
     
     pausar()
 
@@ -536,6 +951,25 @@ def main():
     # Criar gerenciador de colheitas
     manager = ColheitaManager()
     
+    # Restaurar estado (último snapshot + journal) e registrar alterações
+    journal = JournalColheitas()
+    _, _, mensagem = journal.recuperar(manager)
+    print(mensagem)
+    
+    # Modelo de perda treinado com o histórico e atualizado a cada alteração
+    modelo_perda = ModeloPerdaOnline()
+    manager.registrar_observador(modelo_perda, reproduzir=True)
+    recomendador = RecomendadorVelocidade()
+    manager.registrar_observador(recomendador, reproduzir=True)
+    janelas = EstatisticasJanela()
+    manager.registrar_observador(janelas, reproduzir=True)
+    
+    # Detector de anomalias: histórico só aquece o padrão; alertas a partir daqui
+    detector = DetectorAnomalias()
+    with detector.aquecer():
+        manager.registrar_observador(detector, reproduzir=True)
+    detector.assinar(exibir_alerta_anomalia)
+    
     # Adicionar dados de exemplo (opcional)
     if len(manager.listar_todas()) == 0:
         print("🔄 Adicionando dados de exemplo...")
@@ -577,6 +1011,9 @@ def main():
             exibir_logo()
             menu_principal()
             
+            if journal.ultimo_erro_compactacao:
+                print(f"\n⚠️  Compactação do journal adiada: {journal.ultimo_erro_compactacao}")
+            
             opcao = input("\n👉 Escolha uma opção: ").strip()
             
             if opcao == '1':
@@ -590,16 +1027,18 @@ def main():
                 print("\n🗑️  Remoção em desenvolvimento...")
                 pausar()
             elif opcao == '5':
-                gerar_relatorios(manager)
+                gerar_relatorios(manager, janelas)
             elif opcao == '6':
-                exportar_dados(manager)
+                exportar_dados(manager, detector)
             elif opcao == '7':
-                calcular_simulacoes()
+                calcular_simulacoes(manager, modelo_perda, recomendador)
             elif opcao == '8':
                 gerenciar_arquivos()
             elif opcao == '0':
+                _, mensagem = journal.fechar(manager)
                 limpar_tela()
                 exibir_logo()
+                print(f"\n{mensagem}")
                 print("\n👋 Obrigado por usar o CanaOptimizer!")
                 print("🌾 Até a próxima safra!\n")
                 break
@@ -611,6 +1050,8 @@ def main():
             limpar_tela()
             print("\n\n⚠️  Sistema interrompido pelo usuário!")
             if confirmar_acao("Deseja realmente sair?"):
+                _, mensagem = journal.fechar(manager)
+                print(f"\n{mensagem}")
                 print("\n👋 Até logo!\n")
                 break
         except Exception as e:
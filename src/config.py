@@ -48,6 +48,13 @@ MARCAS_COLHEITADEIRAS = (
     'Outra'
 )
 
+# === LARGURA DE CORTE PADRÃO (metros) ===
+# Colhedoras de cana cortam uma linha por passada: a largura útil é o
+# espaçamento entre linhas (1,5 m no plantio convencional), seja qual for
+# a marca. Usada no escalonamento da frota e na simulação de safra quando
+# a máquina não informa 'largura_corte_metros'.
+LARGURA_CORTE_PADRAO = 1.5
+
 # === CONDIÇÕES CLIMÁTICAS (TUPLA - IMUTÁVEL) ===
 CONDICOES_CLIMATICAS = (
     'Ensolarado',
@@ -65,6 +72,31 @@ CONFIG_ARQUIVOS = {
     'encoding': 'utf-8'
 }
 
+# === PERSISTÊNCIA LOCAL (SNAPSHOT + JOURNAL) ===
+CONFIG_PERSISTENCIA = {
+    'arquivo_snapshot': 'data/colheitas.snap',  # Snapshot binário do estado
+    'usar_mmap': True,                           # Ler snapshot via mmap
+    'arquivo_journal': 'data/colheitas.journal', # Log de operações (append-only)
+    'intervalo_fsync': 0.05,                     # Group commit: fsync a cada N segundos
+    'max_operacoes_pendentes': 256,              # ... ou ao acumular N operações
+    'limite_journal_bytes': 16 * 1024 * 1024,    # Compactar journal acima deste tamanho
+    'espera_compactacao_falha': 30.0,            # Segundos até retentar compactação que falhou (dobra a cada falha)
+    'arquivo_marca_exportacao': 'data/marca_exportacao.json'  # Última exportação incremental
+}
+
+# === DETECÇÃO DE ANOMALIAS DE PERDA (FAZENDA + COLHEITADEIRA) ===
+CONFIG_ANOMALIAS = {
+    'alfa_ewma': 0.1,           # Peso da colheita mais recente na média móvel exponencial
+    'z_score_limite': 3.0,      # Desvios acima da média esperada que geram alerta
+    'minimo_amostras': 10,      # Colheitas antes de usar o z-score
+    'max_alertas_recentes': 100  # Alertas mantidos em memória
+}
+
+# === INTERFACE ===
+CONFIG_INTERFACE = {
+    'colheitas_por_pagina': 10  # Colheitas exibidas por página nas consultas
+}
+
 # === MENSAGENS DO SISTEMA ===
 MENSAGENS = {
     'sucesso_cadastro': '✅ Cadastro realizado com sucesso!',
@@ -0,0 +1,528 @@
+"""
+CanaOptimizer - Motor de Agregação
+Agrupamentos genéricos (ex: colheitadeira × clima × mês) com medidas
+soma, média, contagem, mínimo e máximo sobre qualquer campo
+Demonstra: DICIONÁRIOS (chaves de grupo em tupla) em UMA PASSADA
+
+    agregar(colheitas, ['colheitadeira', 'condicao_clima', 'mes'],
+            [('percentual_perda', 'media'), ('perda_financeira', 'soma')])
+
+Cada grupo vira uma entrada de dicionário com os acumuladores das
+medidas, então a lista é percorrida uma única vez. Para combinações
+consultadas com frequência, CuboAgregado mantém as células prontas
+(observador do manager) e responde também a qualquer subconjunto das
+suas dimensões somando células, sem reler as colheitas.
+
+Resultados de partes separadas (ex: shards) se juntam com
+mesclar_agregacoes e combinar_estatisticas: cada parte devolve somas e
+contagens, e as médias são refeitas só no fim.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import date
+from operator import attrgetter
+from modules.sketches import QUANTIS_PADRAO, posicao_quantil
+
+
+MEDIDAS_SUPORTADAS = ('soma', 'media', 'contagem', 'minimo', 'maximo')
+
+# Medidas que podem ser desfeitas (subtraídas) e somadas entre células
+MEDIDAS_ADITIVAS = ('soma', 'media', 'contagem')
+
+# Cache ordinal do dia -> 'AAAA-MM' (uma conversão por dia distinto)
+_cache_meses = {}
+
+
+def _mes(colheita) -> str:
+    """Mês da colheita no formato 'AAAA-MM' (ordena corretamente)"""
+    ordinal = colheita.data_ordinal
+    mes = _cache_meses.get(ordinal)
+    if mes is None:
+        mes = _cache_meses[ordinal] = date.fromordinal(ordinal).strftime('%Y-%m')
+    return mes
+
+
+# Dimensões calculadas a partir da data da colheita
+DIMENSOES_DERIVADAS = {
+    'mes': _mes,
+    'ano': lambda c: int(_mes(c)[:4])
+}
+
+
+def _extrator(dimensao: str):
+    """
+    Função que lê o valor de uma dimensão da colheita
+
+    Args:
+        dimensao (str): Campo da colheita ou dimensão derivada ('mes', 'ano')
+
+    Returns:
+        function: colheita -> valor
+    """
+    if dimensao in DIMENSOES_DERIVADAS:
+        return DIMENSOES_DERIVADAS[dimensao]
+    return attrgetter(dimensao)
+
+
+def _validar_medidas(medidas: list) -> list:
+    """
+    Confere as medidas pedidas
+
+    Args:
+        medidas (list): Pares (campo, função)
+
+    Returns:
+        list: As mesmas medidas, como lista de tuplas
+
+    Raises:
+        ValueError: Função de medida desconhecida
+    """
+    medidas = [tuple(medida) for medida in medidas]
+    for _, funcao in medidas:
+        if funcao not in MEDIDAS_SUPORTADAS:
+            raise ValueError(f"Medida não suportada: {funcao}")
+    return medidas
+
+
+def nome_medida(campo: str, funcao: str) -> str:
+    """
+    Nome da coluna de uma medida no resultado
+
+    Args:
+        campo (str): Campo agregado
+        funcao (str): Função da medida
+
+    Returns:
+        str: Ex: 'media_percentual_perda' ou 'contagem'
+    """
+    return 'contagem' if funcao == 'contagem' else f"{funcao}_{campo}"
+
+
+def _finalizar(dimensoes: list, chave: tuple, quantidade: int, valores: list,
+               medidas: list) -> dict:
+    """
+    Monta a linha de resultado de um grupo
+
+    Args:
+        dimensoes (list): Nomes das dimensões
+        chave (tuple): Valores das dimensões do grupo
+        quantidade (int): Colheitas do grupo
+        valores (list): Acumulador de cada medida (soma, mínimo ou máximo)
+        medidas (list): Pares (campo, função)
+
+    Returns:
+        dict: Dimensões e medidas do grupo
+    """
+    linha = dict(zip(dimensoes, chave))
+
+    for (campo, funcao), valor in zip(medidas, valores):
+        if funcao == 'contagem':
+            valor = quantidade
+        elif funcao == 'media':
+            valor = valor / quantidade if quantidade else 0.0
+        linha[nome_medida(campo, funcao)] = valor
+
+    return linha
+
+
+def agregar(colheitas, dimensoes: list, medidas: list, filtro=None) -> list:
+    """
+    Agrupa colheitas pelas dimensões e calcula as medidas (uma passada)
+
+    Args:
+        colheitas (iterable): Colheitas (Colheita) a agregar
+        dimensoes (list): Campos (ou 'mes'/'ano') que formam o grupo
+        medidas (list): Pares (campo, função) com função em MEDIDAS_SUPORTADAS
+        filtro (function, optional): Só agrega colheitas com filtro(c) verdadeiro
+
+    Returns:
+        list: Uma linha (dict) por grupo, na ordem em que os grupos aparecem
+    """
+    dimensoes = list(dimensoes)
+    medidas = _validar_medidas(medidas)
+    extratores = [_extrator(d) for d in dimensoes]
+    leitores = [attrgetter(campo) for campo, _ in medidas]
+    funcoes = [funcao for _, funcao in medidas]
+
+    grupos = {}  # chave -> [quantidade, [acumulador por medida]]
+
+    for c in colheitas:
+        if filtro is not None and not filtro(c):
+            continue
+
+        chave = tuple(extrair(c) for extrair in extratores)
+        grupo = grupos.get(chave)
+
+        if grupo is None:
+            # Primeiro valor inicializa soma, mínimo e máximo
+            grupos[chave] = [1, [0 if funcao == 'contagem' else ler(c)
+                                 for ler, funcao in zip(leitores, funcoes)]]
+            continue
+
+        grupo[0] += 1
+        acumuladores = grupo[1]
+        for i, funcao in enumerate(funcoes):
+            if funcao == 'contagem':
+                continue
+            valor = leitores[i](c)
+            if funcao == 'minimo':
+                if valor < acumuladores[i]:
+                    acumuladores[i] = valor
+            elif funcao == 'maximo':
+                if valor > acumuladores[i]:
+                    acumuladores[i] = valor
+            else:
+                acumuladores[i] += valor
+
+    return [_finalizar(dimensoes, chave, quantidade, valores, medidas)
+            for chave, (quantidade, valores) in grupos.items()]
+
+
+def medidas_parciais(medidas: list) -> list:
+    """
+    Medidas que cada parte (ex: shard) calcula para que os resultados
+    possam ser juntados depois: média vira soma e a contagem vai sempre
+
+    Args:
+        medidas (list): Pares (campo, função) pedidos
+
+    Returns:
+        list: Pares (campo, função) a pedir para cada parte
+    """
+    parciais = [('id', 'contagem')]
+    for campo, funcao in _validar_medidas(medidas):
+        if funcao == 'contagem':
+            continue
+        medida = (campo, 'soma' if funcao == 'media' else funcao)
+        if medida not in parciais:
+            parciais.append(medida)
+    return parciais
+
+
+def mesclar_agregacoes(parciais, dimensoes: list, medidas: list) -> list:
+    """
+    Junta resultados de agregar() de várias partes, calculados com
+    medidas_parciais(medidas): somas e contagens somam, mínimos e
+    máximos comparam, médias são refeitas no fim
+
+    Args:
+        parciais (iterable): Lista de linhas de cada parte
+        dimensoes (list): Dimensões usadas nas partes
+        medidas (list): Pares (campo, função) pedidos originalmente
+
+    Returns:
+        list: Mesmo formato de agregar()
+    """
+    dimensoes = list(dimensoes)
+    medidas = _validar_medidas(medidas)
+    funcoes = [funcao for _, funcao in medidas]
+    colunas = [None if funcao == 'contagem'
+               else nome_medida(campo, 'soma' if funcao == 'media' else funcao)
+               for campo, funcao in medidas]
+
+    grupos = {}  # chave -> [quantidade, [acumulador por medida]]
+
+    for linhas in parciais:
+        for linha in linhas:
+            chave = tuple(linha[d] for d in dimensoes)
+            valores = [0 if coluna is None else linha[coluna] for coluna in colunas]
+            grupo = grupos.get(chave)
+
+            if grupo is None:
+                grupos[chave] = [linha['contagem'], valores]
+                continue
+
+            grupo[0] += linha['contagem']
+            acumuladores = grupo[1]
+            for i, funcao in enumerate(funcoes):
+                if funcao == 'minimo':
+                    acumuladores[i] = min(acumuladores[i], valores[i])
+                elif funcao == 'maximo':
+                    acumuladores[i] = max(acumuladores[i], valores[i])
+                elif funcao != 'contagem':
+                    acumuladores[i] += valores[i]
+
+    return [_finalizar(dimensoes, chave, quantidade, valores, medidas)
+            for chave, (quantidade, valores) in grupos.items()]
+
+
+def resumir_colheitas(colheitas: list, quantis: dict = None) -> dict:
+    """
+    Estatísticas gerais de uma lista de colheitas
+
+    Args:
+        colheitas (list): Colheitas (percorridas várias vezes)
+        quantis (dict, optional): {'P50', 'P90', 'P99'} já calculados (ex: sketch).
+                                  None calcula exatos ordenando as perdas.
+
+    Returns:
+        dict: total, área, perdas médias/totais, eficiência e quantis de perda
+    """
+    if not colheitas:
+        return {
+            'total_colheitas': 0,
+            'area_total': 0.0,
+            'perda_media': 0.0,
+            'perda_total_financeira': 0.0,
+            'toneladas_perdidas_total': 0.0,
+            'eficiencia_media': 0.0,
+            'perda_mediana': 0.0,
+            'perda_p90': 0.0,
+            'perda_p99': 0.0
+        }
+
+    total = len(colheitas)
+
+    if quantis is None:
+        perdas = sorted(c.percentual_perda for c in colheitas)
+        quantis = {f"P{q * 100:g}": perdas[posicao_quantil(q, total)]
+                   for q in QUANTIS_PADRAO}
+
+    return {
+        'total_colheitas': total,
+        'area_total': sum(c.area_hectares for c in colheitas),
+        'perda_media': sum(c.percentual_perda for c in colheitas) / total,
+        'perda_total_financeira': sum(c.perda_financeira for c in colheitas),
+        'toneladas_perdidas_total': sum(c.toneladas_perdidas for c in colheitas),
+        'eficiencia_media': sum(c.eficiencia for c in colheitas) / total,
+        'perda_mediana': quantis['P50'],
+        'perda_p90': quantis['P90'],
+        'perda_p99': quantis['P99']
+    }
+
+
+def somar_colheitas(colheitas) -> dict:
+    """
+    Somas parciais das estatísticas gerais (uma passada), para juntar
+    com as de outras partes em combinar_estatisticas
+
+    Args:
+        colheitas (iterable): Colheitas
+
+    Returns:
+        dict: Quantidade e somas dos campos de resumir_colheitas
+    """
+    total = 0
+    area = perda = financeira = toneladas = eficiencia = 0.0
+
+    for c in colheitas:
+        total += 1
+        area += c.area_hectares
+        perda += c.percentual_perda
+        financeira += c.perda_financeira
+        toneladas += c.toneladas_perdidas
+        eficiencia += c.eficiencia
+
+    return {'total_colheitas': total, 'area_total': area, 'soma_perda': perda,
+            'perda_total_financeira': financeira, 'toneladas_perdidas_total': toneladas,
+            'soma_eficiencia': eficiencia}
+
+
+def combinar_estatisticas(parciais, quantis: dict) -> dict:
+    """
+    Estatísticas gerais a partir das somas de várias partes
+
+    Args:
+        parciais (iterable): Resultados de somar_colheitas
+        quantis (dict): {'P50', 'P90', 'P99'} do conjunto (ex: sketches mesclados)
+
+    Returns:
+        dict: Mesmo formato de resumir_colheitas
+    """
+    total = {}
+    for parcial in parciais:
+        for campo, valor in parcial.items():
+            total[campo] = total.get(campo, 0) + valor
+
+    quantidade = total.get('total_colheitas', 0)
+    if not quantidade:
+        return resumir_colheitas([])
+
+    return {
+        'total_colheitas': quantidade,
+        'area_total': total['area_total'],
+        'perda_media': total['soma_perda'] / quantidade,
+        'perda_total_financeira': total['perda_total_financeira'],
+        'toneladas_perdidas_total': total['toneladas_perdidas_total'],
+        'eficiencia_media': total['soma_eficiencia'] / quantidade,
+        'perda_mediana': quantis['P50'],
+        'perda_p90': quantis['P90'],
+        'perda_p99': quantis['P99']
+    }
+
+
+class RelatoriosAgregados(ABC):
+    """Relatórios montados sobre agregar() (manager, versões fixadas e shards)"""
+
+    @abstractmethod
+    def agregar(self, dimensoes: list, medidas: list, filtro=None) -> list:
+        """
+        Agrupa as colheitas de quem herda (mesmo contrato de agregacoes.agregar)
+
+        Args:
+            dimensoes (list): Campos (ou 'mes'/'ano') que formam o grupo
+            medidas (list): Pares (campo, função)
+            filtro (function, optional): Só agrega colheitas com filtro(c) verdadeiro
+
+        Returns:
+            list: Uma linha (dict) por grupo
+        """
+
+    def obter_ranking_fazendas(self) -> list:
+        """
+        Retorna ranking de fazendas por eficiência
+
+        Returns:
+            list: Lista de dicionários com fazenda e eficiência média
+        """
+        grupos = self.agregar(['fazenda'], [('id', 'contagem'), ('eficiencia', 'media'),
+                                            ('percentual_perda', 'media')])
+
+        ranking = [{
+            'fazenda': g['fazenda'],
+            'colheitas': g['contagem'],
+            'eficiencia_media': g['media_eficiencia'],
+            'perda_media': g['media_percentual_perda']
+        } for g in grupos]
+
+        # Ordenar por eficiência (maior primeiro)
+        ranking.sort(key=lambda x: x['eficiencia_media'], reverse=True)
+
+        return ranking
+
+    def obter_totalizacao_por_tipo_cana(self) -> dict:
+        """
+        Totaliza dados por tipo de cana
+
+        Returns:
+            dict: Dicionário com tipo de cana como chave
+        """
+        grupos = self.agregar(['tipo_cana'], [('id', 'contagem'), ('area_hectares', 'soma'),
+                                              ('percentual_perda', 'soma')])
+
+        return {g['tipo_cana']: {
+            'quantidade': g['contagem'],
+            'area_total': g['soma_area_hectares'],
+            'perda_media': g['soma_percentual_perda'] / g['contagem'],
+            'soma_perda': g['soma_percentual_perda']
+        } for g in grupos}
+
+
+class CuboAgregado:
+    """Células pré-calculadas de um agrupamento, atualizadas a cada alteração"""
+
+    def __init__(self, dimensoes: list, medidas: list):
+        """
+        Cria cubo vazio (registrar no manager para preencher)
+
+        Args:
+            dimensoes (list): Dimensões do cubo
+            medidas (list): Pares (campo, função) aditivos (soma, media, contagem)
+
+        Raises:
+            ValueError: Medida não aditiva (mínimo/máximo não podem ser desfeitos)
+        """
+        self.dimensoes = list(dimensoes)
+        self.medidas = _validar_medidas(medidas)
+
+        for _, funcao in self.medidas:
+            if funcao not in MEDIDAS_ADITIVAS:
+                raise ValueError(f"Cubo aceita só medidas aditivas {MEDIDAS_ADITIVAS}: {funcao}")
+
+        self._extratores = [_extrator(d) for d in self.dimensoes]
+        self._campos = sorted({campo for campo, funcao in self.medidas if funcao != 'contagem'})
+        self._leitores = [attrgetter(campo) for campo in self._campos]
+        self._celulas = {}  # chave -> [quantidade, soma de cada campo]
+
+    # === OBSERVADOR DO MANAGER ===
+
+    def ao_adicionar(self, colheita):
+        """Soma colheita na sua célula"""
+        self._acumular(colheita, 1)
+
+    def ao_atualizar(self, colheita, anterior):
+        """Troca a versão anterior da colheita pela atual"""
+        self._acumular(anterior, -1)
+        self._acumular(colheita, 1)
+
+    def ao_remover(self, colheita):
+        """Retira colheita da sua célula"""
+        self._acumular(colheita, -1)
+
+    def ao_recarregar(self, colheitas):
+        """Refaz as células com as colheitas carregadas (ex: snapshot)"""
+        self._celulas = {}
+        for colheita in colheitas:
+            self._acumular(colheita, 1)
+
+    def _acumular(self, colheita, sinal: int):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1) a colheita na célula
+
+        Args:
+            colheita (Colheita): Registro de colheita
+            sinal (int): 1 para incluir, -1 para retirar
+        """
+        chave = tuple(extrair(colheita) for extrair in self._extratores)
+        celula = self._celulas.get(chave)
+
+        if celula is None:
+            celula = self._celulas[chave] = [0] + [0.0] * len(self._campos)
+
+        celula[0] += sinal
+        for i, ler in enumerate(self._leitores, 1):
+            celula[i] += sinal * ler(colheita)
+
+        if celula[0] <= 0:
+            del self._celulas[chave]
+
+    # === CONSULTA ===
+
+    def atende(self, dimensoes: list, medidas: list) -> bool:
+        """
+        Verifica se o cubo responde a consulta sem reler as colheitas
+
+        Args:
+            dimensoes (list): Dimensões pedidas
+            medidas (list): Medidas pedidas
+
+        Returns:
+            bool: True se as dimensões são subconjunto das do cubo e as
+                  medidas são aditivas sobre campos do cubo
+        """
+        return (set(dimensoes) <= set(self.dimensoes) and
+                all(funcao == 'contagem' or (funcao in MEDIDAS_ADITIVAS and campo in self._campos)
+                    for campo, funcao in medidas))
+
+    def consultar(self, dimensoes: list, medidas: list) -> list:
+        """
+        Agrupa as células do cubo pelas dimensões pedidas (roll-up)
+
+        Args:
+            dimensoes (list): Subconjunto das dimensões do cubo
+            medidas (list): Medidas aditivas sobre campos do cubo
+
+        Returns:
+            list: Mesmo formato de agregar()
+        """
+        dimensoes = list(dimensoes)
+        medidas = _validar_medidas(medidas)
+        posicoes = [self.dimensoes.index(d) for d in dimensoes]
+        grupos = {}
+
+        for chave, celula in self._celulas.items():
+            chave_grupo = tuple(chave[p] for p in posicoes)
+            grupo = grupos.get(chave_grupo)
+            if grupo is None:
+                grupos[chave_grupo] = list(celula)
+            else:
+                for i, valor in enumerate(celula):
+                    grupo[i] += valor
+
+        resultado = []
+        for chave, grupo in grupos.items():
+            somas = dict(zip(self._campos, grupo[1:]))
+            valores = [somas.get(campo, 0) for campo, _ in medidas]
+            resultado.append(_finalizar(dimensoes, chave, grupo[0], valores, medidas))
+
+        return resultado
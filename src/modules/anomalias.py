@@ -0,0 +1,212 @@
+"""
+CanaOptimizer - Detecção de Anomalias de Perda
+Alerta quando a perda de uma colheita foge do padrão da mesma
+fazenda e colheitadeira (ex: máquina descalibrada)
+Demonstra: MÉDIA MÓVEL EXPONENCIAL (EWMA) e OBSERVADOR do manager
+
+Para cada (fazenda, colheitadeira) guardamos média e variância
+exponenciais da perda (fazenda agrupada como no índice do manager,
+sem diferenciar maiúsculas). Cada colheita nova é comparada com o estado
+anterior (z-score) e ao limite perda_alerta, e só depois atualiza a
+média: custo O(1) por inclusão.
+"""
+
+import math
+from collections import deque
+from contextlib import contextmanager
+from config import CONFIG_ANOMALIAS, PARAMETROS_COLHEITA
+from modules.colheita_manager import normalizar_categoria
+
+
+class DetectorAnomalias:
+    """Detector de perdas anômalas por fazenda e colheitadeira"""
+
+    def __init__(self, alfa: float = None, z_score_limite: float = None,
+                 perda_alerta: float = None, minimo_amostras: int = None,
+                 max_alertas_recentes: int = None):
+        """
+        Inicializa detector
+
+        Args:
+            alfa (float, optional): Peso da colheita mais recente na EWMA
+            z_score_limite (float, optional): Desvios acima da média que geram alerta
+            perda_alerta (float, optional): Perda (%) que sempre gera alerta
+            minimo_amostras (int, optional): Colheitas do grupo antes de usar o z-score
+            max_alertas_recentes (int, optional): Alertas mantidos em memória
+        """
+        self.alfa = alfa if alfa is not None else CONFIG_ANOMALIAS['alfa_ewma']
+        self.z_score_limite = (z_score_limite if z_score_limite is not None
+                               else CONFIG_ANOMALIAS['z_score_limite'])
+        self.perda_alerta = (perda_alerta if perda_alerta is not None
+                             else PARAMETROS_COLHEITA['perda_alerta'])
+        self.minimo_amostras = (minimo_amostras if minimo_amostras is not None
+                                else CONFIG_ANOMALIAS['minimo_amostras'])
+
+        self._estado = {}  # (fazenda normalizada, colheitadeira) -> [amostras, media, variancia]
+        self._assinantes = []
+        self._aquecendo = False
+        self.alertas_recentes = deque(maxlen=max_alertas_recentes or
+                                      CONFIG_ANOMALIAS['max_alertas_recentes'])
+
+    # === ASSINATURAS ===
+
+    def assinar(self, funcao):
+        """
+        Registra função chamada a cada alerta: funcao(alerta: dict)
+
+        Args:
+            funcao: Função que recebe o dicionário do alerta
+        """
+        if funcao not in self._assinantes:
+            self._assinantes.append(funcao)
+
+    def cancelar_assinatura(self, funcao):
+        """
+        Remove função registrada em assinar()
+
+        Args:
+            funcao: Função a remover
+        """
+        if funcao in self._assinantes:
+            self._assinantes.remove(funcao)
+
+    @contextmanager
+    def alertas_em_lote(self):
+        """
+        Pausa os assinantes durante uma inclusão em massa (ex: importação
+        de CSV) e só conta os alertas, para exibir um resumo no fim
+
+            with detector.alertas_em_lote() as resumo:
+                importar_colheitas_csv(caminho, manager)
+            print(resumo['total'], resumo['por_fazenda'])
+
+        Os alertas continuam indo para alertas_recentes.
+
+        Yields:
+            dict: {'total': int, 'por_fazenda': {fazenda: alertas}} (preenchido no with)
+        """
+        resumo = {'total': 0, 'por_fazenda': {}}
+        nomes = {}  # fazenda normalizada -> primeiro nome visto
+
+        def contar(alerta):
+            resumo['total'] += 1
+            por_fazenda = resumo['por_fazenda']
+            nome = nomes.setdefault(normalizar_categoria('fazenda', alerta['fazenda']),
+                                    alerta['fazenda'])
+            por_fazenda[nome] = por_fazenda.get(nome, 0) + 1
+
+        assinantes, self._assinantes = self._assinantes, [contar]
+        try:
+            yield resumo
+        finally:
+            self._assinantes = assinantes
+
+    @contextmanager
+    def aquecer(self):
+        """
+        Colheitas incluídas no with só atualizam o padrão, sem alertas
+        (ex: reprodução do histórico ao registrar o detector)
+
+            with detector.aquecer():
+                manager.registrar_observador(detector, reproduzir=True)
+        """
+        self._aquecendo = True
+        try:
+            yield
+        finally:
+            self._aquecendo = False
+
+    # === OBSERVADOR DO MANAGER ===
+
+    def ao_adicionar(self, colheita: dict):
+        """
+        Avalia a colheita nova contra o padrão do grupo e atualiza o padrão
+
+        Atualizações e remoções não alteram a EWMA (ela não pode ser
+        desfeita); o padrão reflete a sequência de inclusões.
+
+        Args:
+            colheita (dict): Colheita incluída
+        """
+        chave = (normalizar_categoria('fazenda', colheita['fazenda']), colheita['colheitadeira'])
+        perda = colheita['percentual_perda']
+        estado = self._estado.get(chave)
+
+        if estado is None:
+            self._estado[chave] = [1, perda, 0.0]
+            if perda >= self.perda_alerta:
+                self._emitir(colheita, None, None, ['perda_alerta'])
+            return
+
+        amostras, media, variancia = estado
+        desvio = math.sqrt(variancia)
+        z_score = (perda - media) / desvio if desvio > 1e-9 else 0.0
+
+        motivos = []
+        if amostras >= self.minimo_amostras and z_score > self.z_score_limite:
+            motivos.append('z_score')
+        if perda >= self.perda_alerta:
+            motivos.append('perda_alerta')
+
+        if motivos:
+            self._emitir(colheita, media, z_score, motivos)
+
+        # Atualização incremental da média e variância exponenciais; nas
+        # primeiras amostras o peso 1/(n+1) dá a média/variância acumuladas,
+        # evitando variância subestimada logo após o início
+        peso = max(self.alfa, 1 / (amostras + 1))
+        diferenca = perda - media
+        incremento = peso * diferenca
+        estado[0] = amostras + 1
+        estado[1] = media + incremento
+        estado[2] = (1 - peso) * (variancia + diferenca * incremento)
+
+    def _emitir(self, colheita: dict, media: float, z_score: float, motivos: list):
+        """
+        Monta o alerta, guarda nos recentes e avisa os assinantes
+
+        Args:
+            colheita (dict): Colheita anômala
+            media (float): Perda esperada para o grupo (None sem histórico)
+            z_score (float): Desvios acima da média (None sem histórico)
+            motivos (list): 'z_score' e/ou 'perda_alerta'
+        """
+        if self._aquecendo:
+            return
+
+        alerta = {
+            'id': colheita['id'],
+            'fazenda': colheita['fazenda'],
+            'colheitadeira': colheita['colheitadeira'],
+            'data_colheita': colheita['data_colheita'],
+            'percentual_perda': colheita['percentual_perda'],
+            'perda_esperada': round(media, 2) if media is not None else None,
+            'z_score': round(z_score, 2) if z_score is not None else None,
+            'motivos': motivos
+        }
+
+        self.alertas_recentes.append(alerta)
+
+        for funcao in list(self._assinantes):
+            funcao(alerta)
+
+    # === CONSULTA ===
+
+    def obter_padrao(self, fazenda: str, colheitadeira: str) -> dict:
+        """
+        Padrão atual de perda de uma fazenda/colheitadeira
+
+        Args:
+            fazenda (str): Nome da fazenda
+            colheitadeira (str): Marca da colheitadeira
+
+        Returns:
+            dict: amostras, perda_media e desvio (None se não há colheitas)
+        """
+        estado = self._estado.get((normalizar_categoria('fazenda', fazenda), colheitadeira))
+        if estado is None:
+            return None
+
+        amostras, media, variancia = estado
+        return {'amostras': amostras, 'perda_media': round(media, 2),
+                'desvio': round(math.sqrt(variancia), 2)}
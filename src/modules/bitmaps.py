@@ -0,0 +1,413 @@
+"""
+CanaOptimizer - Bitmaps Compactados
+Conjuntos de IDs para campos com poucos valores (classificação, clima,
+colheitadeira, tipo de cana)
+Demonstra: BITMAPS (estilo Roaring) e OPERAÇÕES BIT A BIT
+
+Os IDs são divididos em blocos pelos 16 bits altos (id >> 16). Cada
+bloco guarda os 16 bits baixos em um de dois contêineres:
+
+    array('H') ordenado  - até LIMITE_ARRAY IDs (2 bytes por ID)
+    bytearray(8192)      - bloco denso: 1 bit por ID possível
+
+Interseção e união convertem os contêineres em inteiros do Python
+(int.from_bytes) e usam & e | em C; a contagem usa int.bit_count(), então
+"Crítica com Chuva Forte e Case IH" em milhões de registros custa
+poucos microssegundos por bloco.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import compress
+
+
+LIMITE_ARRAY = 4096          # Acima disso o bloco vira bitset (8 KB)
+BYTES_BITSET = 1 << 13       # 65536 bits por bloco
+_FAIXA_PALAVRAS = range(BYTES_BITSET // 8)
+
+
+def _para_int(conteiner) -> int:
+    """
+    Converte contêiner em inteiro com os bits dos IDs ligados
+
+    Args:
+        conteiner: array('H') ou bytearray
+
+    Returns:
+        int: Bitset do bloco
+    """
+    if isinstance(conteiner, bytearray):
+        return int.from_bytes(conteiner, 'little')
+
+    bits = bytearray(BYTES_BITSET)
+    for baixo in conteiner:
+        bits[baixo >> 3] |= 1 << (baixo & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def _posicoes(dados) -> list:
+    """
+    Posições dos bits ligados, lendo o bitset em palavras de 64 bits
+    (só as palavras não nulas são visitadas)
+
+    Args:
+        dados (bytes/bytearray): Bitset do bloco (little-endian)
+
+    Returns:
+        list: Posições em ordem crescente
+    """
+    palavras = array('Q', bytes(dados))
+    if sys.byteorder == 'big':
+        palavras.byteswap()
+
+    posicoes = []
+    for i in compress(_FAIXA_PALAVRAS, palavras):
+        palavra = palavras[i]
+        base = i << 6
+        while palavra:
+            menor = palavra & -palavra
+            posicoes.append(base + menor.bit_length() - 1)
+            palavra ^= menor
+    return posicoes
+
+
+def _de_int(valor: int):
+    """
+    Monta o contêiner adequado para um bitset
+
+    Args:
+        valor (int): Bitset do bloco
+
+    Returns:
+        tuple: (contêiner, cardinalidade); contêiner None se vazio
+    """
+    cardinalidade = valor.bit_count()
+    if cardinalidade == 0:
+        return (None, 0)
+
+    dados = valor.to_bytes(BYTES_BITSET, 'little')
+    if cardinalidade > LIMITE_ARRAY:
+        return (bytearray(dados), cardinalidade)
+    return (array('H', _posicoes(dados)), cardinalidade)
+
+
+class BitmapRoaring:
+    """Conjunto de IDs inteiros não negativos em blocos de 65536"""
+
+    def __init__(self, ids=()):
+        """
+        Cria bitmap, opcionalmente com IDs iniciais
+
+        Args:
+            ids (iterable): IDs iniciais
+        """
+        self._conteineres = {}     # bloco (id >> 16) -> array('H') ou bytearray
+        self._cardinalidades = {}  # bloco -> quantidade de IDs
+        self._total = 0
+
+        for id_registro in ids:
+            self.adicionar(id_registro)
+
+    def __len__(self) -> int:
+        """Quantidade de IDs"""
+        return self._total
+
+    def contar(self) -> int:
+        """
+        Quantidade de IDs (popcount mantido a cada alteração)
+
+        Returns:
+            int: Quantidade
+        """
+        return self._total
+
+    def __contains__(self, id_registro: int) -> bool:
+        """Verifica se o ID está no bitmap"""
+        conteiner = self._conteineres.get(id_registro >> 16)
+        if conteiner is None:
+            return False
+
+        baixo = id_registro & 0xFFFF
+        if isinstance(conteiner, bytearray):
+            return bool(conteiner[baixo >> 3] >> (baixo & 7) & 1)
+
+        posicao = bisect_left(conteiner, baixo)
+        return posicao < len(conteiner) and conteiner[posicao] == baixo
+
+    def __iter__(self):
+        """IDs em ordem crescente"""
+        return self.iterar()
+
+    def iterar(self, offset: int = 0):
+        """
+        IDs em ordem crescente a partir da posição `offset` (blocos
+        anteriores são pulados pela cardinalidade, sem percorrê-los)
+
+        Args:
+            offset (int): IDs a pular
+
+        Yields:
+            int: IDs
+        """
+        for alto in sorted(self._conteineres):
+            cardinalidade = self._cardinalidades[alto]
+            if offset >= cardinalidade:
+                offset -= cardinalidade
+                continue
+
+            conteiner = self._conteineres[alto]
+            baixos = _posicoes(conteiner) if isinstance(conteiner, bytearray) else conteiner
+            base = alto << 16
+            # Fatia = cópia do bloco: remoções durante a iteração não deslocam posições
+            for baixo in baixos[offset:]:
+                yield base | baixo
+            offset = 0
+
+    def adicionar(self, id_registro: int) -> bool:
+        """
+        Inclui ID
+
+        Args:
+            id_registro (int): ID a incluir
+
+        Returns:
+            bool: True se o ID não estava no bitmap
+        """
+        alto = id_registro >> 16
+        baixo = id_registro & 0xFFFF
+        conteiner = self._conteineres.get(alto)
+
+        if conteiner is None:
+            self._conteineres[alto] = array('H', (baixo,))
+            self._cardinalidades[alto] = 1
+            self._total += 1
+            return True
+
+        if isinstance(conteiner, bytearray):
+            mascara = 1 << (baixo & 7)
+            if conteiner[baixo >> 3] & mascara:
+                return False
+            conteiner[baixo >> 3] |= mascara
+        else:
+            # IDs crescentes (caso comum) entram no fim sem busca
+            if conteiner[-1] < baixo:
+                conteiner.append(baixo)
+            else:
+                posicao = bisect_left(conteiner, baixo)
+                if posicao < len(conteiner) and conteiner[posicao] == baixo:
+                    return False
+                conteiner.insert(posicao, baixo)
+
+            if len(conteiner) > LIMITE_ARRAY:
+                bits = bytearray(BYTES_BITSET)
+                for valor in conteiner:
+                    bits[valor >> 3] |= 1 << (valor & 7)
+                self._conteineres[alto] = bits
+
+        self._cardinalidades[alto] += 1
+        self._total += 1
+        return True
+
+    def remover(self, id_registro: int) -> bool:
+        """
+        Retira ID (blocos densos continuam bitset até ficarem vazios)
+
+        Args:
+            id_registro (int): ID a retirar
+
+        Returns:
+            bool: True se o ID estava no bitmap
+        """
+        alto = id_registro >> 16
+        baixo = id_registro & 0xFFFF
+        conteiner = self._conteineres.get(alto)
+
+        if conteiner is None:
+            return False
+
+        if isinstance(conteiner, bytearray):
+            mascara = 1 << (baixo & 7)
+            if not conteiner[baixo >> 3] & mascara:
+                return False
+            conteiner[baixo >> 3] &= ~mascara & 0xFF
+        else:
+            posicao = bisect_left(conteiner, baixo)
+            if posicao == len(conteiner) or conteiner[posicao] != baixo:
+                return False
+            del conteiner[posicao]
+
+        self._cardinalidades[alto] -= 1
+        self._total -= 1
+        if self._cardinalidades[alto] == 0:
+            del self._conteineres[alto]
+            del self._cardinalidades[alto]
+        return True
+
+    # === GRAVAÇÃO EM BLOCO (SNAPSHOT) ===
+
+    def serializar(self, esparsos: array, densos: array) -> list:
+        """
+        Copia os contêineres para o fim de arrays planos compartilhados
+        (vários bitmaps gravados em um só par de arrays)
+
+        Args:
+            esparsos (array): array('H') que recebe os blocos esparsos
+            densos (array): array('B') que recebe os blocos bitset
+
+        Returns:
+            list: [bloco, cardinalidade, denso, início] de cada contêiner
+        """
+        blocos = []
+        for alto in sorted(self._conteineres):
+            conteiner = self._conteineres[alto]
+            if isinstance(conteiner, bytearray):
+                blocos.append([alto, self._cardinalidades[alto], 1, len(densos)])
+                densos.frombytes(conteiner)
+            else:
+                blocos.append([alto, self._cardinalidades[alto], 0, len(esparsos)])
+                esparsos.extend(conteiner)
+        return blocos
+
+    @classmethod
+    def desserializar(cls, blocos: list, esparsos: array, densos: array) -> 'BitmapRoaring':
+        """
+        Remonta bitmap gravado com serializar() fatiando os arrays
+        (sem incluir ID por ID)
+
+        Args:
+            blocos (list): Retorno de serializar()
+            esparsos (array): array('H') com os blocos esparsos
+            densos (array): array('B') com os blocos bitset
+
+        Returns:
+            BitmapRoaring: Bitmap restaurado
+        """
+        resultado = cls()
+        for alto, cardinalidade, denso, inicio in blocos:
+            if denso:
+                conteiner = bytearray(densos[inicio:inicio + BYTES_BITSET])
+            else:
+                conteiner = esparsos[inicio:inicio + cardinalidade]
+            resultado._conteineres[alto] = conteiner
+            resultado._cardinalidades[alto] = cardinalidade
+            resultado._total += cardinalidade
+        return resultado
+
+    # === OPERAÇÕES ENTRE BITMAPS ===
+
+    @classmethod
+    def _de_blocos(cls, blocos: dict) -> 'BitmapRoaring':
+        """
+        Monta bitmap a partir de bitsets inteiros por bloco
+
+        Args:
+            blocos (dict): bloco -> int
+
+        Returns:
+            BitmapRoaring: Bitmap resultante
+        """
+        resultado = cls()
+        for alto, valor in blocos.items():
+            conteiner, cardinalidade = _de_int(valor)
+            if conteiner is not None:
+                resultado._conteineres[alto] = conteiner
+                resultado._cardinalidades[alto] = cardinalidade
+                resultado._total += cardinalidade
+        return resultado
+
+    @staticmethod
+    def _blocos_intersecao(bitmaps: tuple) -> dict:
+        """
+        AND bloco a bloco (só blocos presentes em todos os bitmaps)
+
+        Args:
+            bitmaps (tuple): Bitmaps a cruzar
+
+        Returns:
+            dict: bloco -> int com o AND
+        """
+        if not bitmaps:
+            return {}
+
+        # Começa pelo bitmap com menos blocos
+        ordenados = sorted(bitmaps, key=lambda b: len(b._conteineres))
+        blocos = {}
+
+        for alto, conteiner in ordenados[0]._conteineres.items():
+            valor = _para_int(conteiner)
+            for outro in ordenados[1:]:
+                conteiner_outro = outro._conteineres.get(alto)
+                if conteiner_outro is None:
+                    valor = 0
+                    break
+                valor &= _para_int(conteiner_outro)
+                if not valor:
+                    break
+            if valor:
+                blocos[alto] = valor
+
+        return blocos
+
+    @classmethod
+    def intersecao(cls, *bitmaps) -> 'BitmapRoaring':
+        """
+        IDs presentes em todos os bitmaps (AND)
+
+        Args:
+            *bitmaps (BitmapRoaring): Bitmaps a cruzar
+
+        Returns:
+            BitmapRoaring: Novo bitmap
+        """
+        return cls._de_blocos(cls._blocos_intersecao(bitmaps))
+
+    @classmethod
+    def uniao(cls, *bitmaps) -> 'BitmapRoaring':
+        """
+        IDs presentes em algum dos bitmaps (OR)
+
+        Args:
+            *bitmaps (BitmapRoaring): Bitmaps a unir
+
+        Returns:
+            BitmapRoaring: Novo bitmap
+        """
+        blocos = {}
+        for bitmap in bitmaps:
+            for alto, conteiner in bitmap._conteineres.items():
+                blocos[alto] = blocos.get(alto, 0) | _para_int(conteiner)
+        return cls._de_blocos(blocos)
+
+    @classmethod
+    def contar_intersecao(cls, *bitmaps) -> int:
+        """
+        Quantidade de IDs presentes em todos os bitmaps, sem montar o resultado
+
+        Args:
+            *bitmaps (BitmapRoaring): Bitmaps a cruzar
+
+        Returns:
+            int: Quantidade (popcount do AND)
+        """
+        if len(bitmaps) == 1:
+            return bitmaps[0]._total
+        return sum(valor.bit_count() for valor in cls._blocos_intersecao(bitmaps).values())
+
+    def __and__(self, outro: 'BitmapRoaring') -> 'BitmapRoaring':
+        """Interseção (AND)"""
+        return BitmapRoaring.intersecao(self, outro)
+
+    def __or__(self, outro: 'BitmapRoaring') -> 'BitmapRoaring':
+        """União (OR)"""
+        return BitmapRoaring.uniao(self, outro)
+
+    def tamanho_bytes(self) -> int:
+        """
+        Memória aproximada dos contêineres
+
+        Returns:
+            int: Bytes ocupados pelos IDs
+        """
+        return sum(len(c) if isinstance(c, bytearray) else 2 * len(c)
+                   for c in self._conteineres.values())
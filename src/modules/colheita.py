@@ -0,0 +1,181 @@
+"""
+CanaOptimizer - Registro de Colheita
+Tipo do registro guardado pelo ColheitaManager
+Demonstra: CLASSES com __slots__
+
+Com __slots__ cada colheita guarda só os valores, em posições fixas,
+sem o dicionário por objeto (nem as chaves repetidas em cada registro):
+ocupa cerca de um terço da memória de um dict com os mesmos campos, e
+a leitura c.campo é mais rápida que c['campo'] nos laços de agregação.
+
+Para o código que trata a colheita como dicionário, continuam valendo
+c['campo'], c.get(), c.copy(), c.update() e 'campo' in c; to_dict()
+devolve um dict comum (JSON, exportações).
+"""
+
+
+# Campos na ordem do registro (a mesma das colunas do snapshot)
+CAMPOS_COLHEITA = (
+    'id', 'fazenda', 'area_hectares', 'tipo_cana', 'produtividade',
+    'percentual_perda', 'preco_tonelada', 'colheitadeira', 'velocidade',
+    'condicao_clima', 'data_colheita', 'observacoes',
+    'toneladas_colhidas', 'toneladas_perdidas', 'perda_financeira',
+    'eficiencia', 'classificacao', 'seq', 'data_ordinal'
+)
+
+_CONJUNTO_CAMPOS = frozenset(CAMPOS_COLHEITA)
+
+
+class Colheita:
+    """Registro de colheita com dados informados e valores derivados"""
+
+    __slots__ = CAMPOS_COLHEITA
+
+    def __init__(self, id, fazenda, area_hectares, tipo_cana, produtividade,
+                 percentual_perda, preco_tonelada, colheitadeira, velocidade,
+                 condicao_clima, data_colheita, observacoes='',
+                 toneladas_colhidas=0.0, toneladas_perdidas=0.0, perda_financeira=0.0,
+                 eficiencia=0.0, classificacao='', seq=0, data_ordinal=None):
+        """
+        Cria registro (argumentos na ordem de CAMPOS_COLHEITA)
+
+        Args:
+            id (int): ID da colheita
+            fazenda (str): Nome da fazenda
+            area_hectares (float): Área colhida
+            tipo_cana (str): Variedade
+            produtividade (float): Toneladas por hectare
+            percentual_perda (float): Perda (%)
+            preco_tonelada (float): Preço da tonelada (R$)
+            colheitadeira (str): Marca da colheitadeira
+            velocidade (float): Velocidade de operação (km/h)
+            condicao_clima (str): Clima na colheita
+            data_colheita (str): Data 'DD/MM/YYYY'
+            observacoes (str): Texto livre
+            toneladas_colhidas (float): Derivado
+            toneladas_perdidas (float): Derivado
+            perda_financeira (float): Derivado
+            eficiencia (float): Derivado
+            classificacao (str): Derivado
+            seq (int): Sequência da última alteração
+            data_ordinal (int): Ordinal da data (None = calcular depois)
+        """
+        self.id = id
+        self.fazenda = fazenda
+        self.area_hectares = area_hectares
+        self.tipo_cana = tipo_cana
+        self.produtividade = produtividade
+        self.percentual_perda = percentual_perda
+        self.preco_tonelada = preco_tonelada
+        self.colheitadeira = colheitadeira
+        self.velocidade = velocidade
+        self.condicao_clima = condicao_clima
+        self.data_colheita = data_colheita
+        self.observacoes = observacoes
+        self.toneladas_colhidas = toneladas_colhidas
+        self.toneladas_perdidas = toneladas_perdidas
+        self.perda_financeira = perda_financeira
+        self.eficiencia = eficiencia
+        self.classificacao = classificacao
+        self.seq = seq
+        self.data_ordinal = data_ordinal
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> 'Colheita':
+        """
+        Cria registro a partir de dicionário (journal, JSON); chaves fora de
+        CAMPOS_COLHEITA são ignoradas
+
+        Args:
+            dados (dict): Campos da colheita
+
+        Returns:
+            Colheita: Registro
+        """
+        return cls(**{campo: valor for campo, valor in dados.items() if campo in _CONJUNTO_CAMPOS})
+
+    def to_dict(self) -> dict:
+        """
+        Converte em dicionário comum
+
+        Returns:
+            dict: Campos na ordem de CAMPOS_COLHEITA
+        """
+        return {campo: getattr(self, campo) for campo in CAMPOS_COLHEITA}
+
+    def copy(self) -> 'Colheita':
+        """
+        Cópia rasa do registro
+
+        Returns:
+            Colheita: Novo registro com os mesmos valores
+        """
+        return Colheita(*[getattr(self, campo) for campo in CAMPOS_COLHEITA])
+
+    def update(self, dados):
+        """
+        Atualiza campos a partir de dicionário ou outra colheita
+
+        Args:
+            dados (dict/Colheita): Campos novos
+        """
+        if isinstance(dados, Colheita):
+            dados = dados.to_dict()
+        for campo, valor in dados.items():
+            self[campo] = valor
+
+    # === ACESSO COMO DICIONÁRIO ===
+
+    def __getitem__(self, campo: str):
+        """c['campo']"""
+        if campo not in _CONJUNTO_CAMPOS:
+            raise KeyError(campo)
+        return getattr(self, campo)
+
+    def __setitem__(self, campo: str, valor):
+        """c['campo'] = valor"""
+        if campo not in _CONJUNTO_CAMPOS:
+            raise KeyError(campo)
+        setattr(self, campo, valor)
+
+    def __contains__(self, campo: str) -> bool:
+        """'campo' in c"""
+        return campo in _CONJUNTO_CAMPOS
+
+    def get(self, campo: str, padrao=None):
+        """
+        Valor do campo ou padrão (como dict.get)
+
+        Args:
+            campo (str): Nome do campo
+            padrao (optional): Valor se o campo não existe
+
+        Returns:
+            Valor do campo
+        """
+        if campo not in _CONJUNTO_CAMPOS:
+            return padrao
+        return getattr(self, campo)
+
+    def keys(self) -> tuple:
+        """Nomes dos campos"""
+        return CAMPOS_COLHEITA
+
+    def items(self) -> list:
+        """Pares (campo, valor)"""
+        return [(campo, getattr(self, campo)) for campo in CAMPOS_COLHEITA]
+
+    def __eq__(self, outro) -> bool:
+        """Igual a outra colheita (ou dict) com os mesmos valores"""
+        if isinstance(outro, Colheita):
+            return all(getattr(self, campo) == getattr(outro, campo) for campo in CAMPOS_COLHEITA)
+        if isinstance(outro, dict):
+            return self.to_dict() == outro
+        return NotImplemented
+
+    __hash__ = None  # Mutável, como dict
+
+    def __repr__(self) -> str:
+        """Representação para depuração"""
+        return (f"Colheita(id={self.id}, fazenda={self.fazenda!r}, "
+                f"data={self.data_colheita!r}, perda={self.percentual_perda}%)")
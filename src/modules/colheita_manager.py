@@ -4,7 +4,12 @@ Gerencia registros de colheita usando listas e dicionários
 Demonstra: USO DE LISTAS e DICIONÁRIOS
 """
 
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+import gc
+from operator import attrgetter
 from modules.calculations import (
     calcular_perda_toneladas,
     calcular_perda_financeira_completa,
@@ -13,15 +18,343 @@ from modules.calculations import (
     classificar_nivel_perda
 )
 from modules.validations import validar_numero_positivo, validar_percentual
+from modules.sketches import SketchKLL, QUANTIS_PADRAO
+from modules.indices import IndiceOrdenado
+from modules.bitmaps import BitmapRoaring
+from modules.colheita import Colheita, CAMPOS_COLHEITA
+from modules.agregacoes import agregar, resumir_colheitas, CuboAgregado, RelatoriosAgregados
+from modules.versoes import ArmazemPaginado, VersaoColheitas
+from modules.visoes import VisaoColheitas, fatiar
+from utils.snapshot import gravar_arquivo_snapshot, ler_arquivo_snapshot
+from config import CONFIG_PERSISTENCIA
 
 
-class ColheitaManager:
+# Cabeçalho das exportações tabulares (lista simples / CSV)
+CABECALHO_EXPORTACAO = (
+    'ID', 'Fazenda', 'Área (ha)', 'Tipo Cana', 'Produtividade',
+    'Perda (%)', 'Perda (t)', 'Perda (R$)', 'Eficiência (%)',
+    'Classificação', 'Data', 'Colheitadeira', 'Velocidade (km/h)', 'Clima'
+)
+
+# Colunas gravadas no snapshot binário: (campo, tipo)
+COLUNAS_SNAPSHOT = (
+    ('id', 'int'),
+    ('fazenda', 'categoria'),
+    ('area_hectares', 'float'),
+    ('tipo_cana', 'categoria'),
+    ('produtividade', 'float'),
+    ('percentual_perda', 'float'),
+    ('preco_tonelada', 'float'),
+    ('colheitadeira', 'categoria'),
+    ('velocidade', 'float'),
+    ('condicao_clima', 'categoria'),
+    ('data_colheita', 'categoria'),
+    ('observacoes', 'texto'),
+    ('toneladas_colhidas', 'float'),
+    ('toneladas_perdidas', 'float'),
+    ('perda_financeira', 'float'),
+    ('eficiencia', 'float'),
+    ('classificacao', 'categoria'),
+    ('seq', 'int'),
+    ('data_ordinal', 'int')
+)
+
+# Campos com ÍNDICE ORDENADO (consultas por intervalo e top-K)
+CAMPOS_INDICE_ORDENADO = ('data_ordinal', 'percentual_perda', 'perda_financeira')
+
+# Campos com ÍNDICE DE CATEGORIA (valor -> conjunto de IDs)
+CAMPOS_INDICE_CATEGORIA = ('fazenda',)
+
+# Campos com poucos valores distintos: ÍNDICE BITMAP (valor -> BitmapRoaring)
+CAMPOS_INDICE_BITMAP = ('classificacao', 'condicao_clima', 'colheitadeira', 'tipo_cana')
+
+# Remoção marca a posição na lista como vazia (None); a lista é compactada
+# quando as posições vazias passam desta fração (e deste mínimo)
+FRACAO_COMPACTACAO = 0.25
+MINIMO_COMPACTACAO = 64
+
+# Cache 'DD/MM/YYYY' -> ordinal: cada data distinta é convertida uma única vez
+_cache_ordinais = {}
+
+
+def converter_data_ordinal(data) -> int:
+    """
+    Converte data para ordinal (dias desde 01/01/0001), que ordena corretamente
+    
+    Args:
+        data: 'DD/MM/YYYY', date/datetime ou ordinal (int)
+        
+    Returns:
+        int: Ordinal do dia
+    """
+    if isinstance(data, int):
+        return data
+    if isinstance(data, datetime):
+        return data.toordinal()
+    if hasattr(data, 'toordinal'):
+        return data.toordinal()
+    
+    ordinal = _cache_ordinais.get(data)
+    if ordinal is None:
+        ordinal = datetime.strptime(data, '%d/%m/%Y').toordinal()
+        _cache_ordinais[data] = ordinal
+    return ordinal
+
+
+def normalizar_categoria(campo: str, valor):
+    """
+    Chave usada no índice de categoria (fazenda sem diferenciar maiúsculas)
+    
+    Args:
+        campo (str): Campo indexado
+        valor: Valor do campo
+        
+    Returns:
+        Valor normalizado
+    """
+    return valor.lower() if campo == 'fazenda' else valor
+
+
+@contextmanager
+def _coleta_pausada():
+    """
+    Pausa a coleta automática de lixo (restaurada ao sair, se estava ativa)
+    """
+    ativa = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativa:
+            gc.enable()
+
+
+class ColheitaManager(RelatoriosAgregados):
     """Gerenciador de registros de colheita usando lista"""
     
     def __init__(self):
         """Inicializa lista de colheitas"""
-        self.colheitas = []  # LISTA para armazenar colheitas
+        # LISTA das colheitas em páginas (None = removida, aguardando compactação);
+        # páginas são copiadas na escrita enquanto uma versão fixada as usa
+        self._registros = ArmazemPaginado()
+        self._posicoes = {}   # id -> posição em _registros
+        self._lacunas = 0     # Posições None em _registros
         self.proximo_id = 1
+        self._indice_id = {}  # DICIONÁRIO id -> colheita (busca O(1))
+        self._observadores = []  # Objetos notificados a cada alteração
+        
+        # Controle de alterações para exportação incremental
+        self.sequencia = 0  # Número de sequência da última alteração
+        self._alteracoes = OrderedDict()  # id -> seq, da alteração mais antiga à mais recente
+        self._remocoes = OrderedDict()    # id -> seq das colheitas removidas (tombstones)
+        
+        # Sketches de quantis do percentual de perda: (grupo, valor) -> SketchKLL
+        # Grupos: ('geral', ''), ('fazenda', nome), ('tipo_cana', tipo)
+        self._sketches = {}
+        self._sketches_desatualizados = set()  # Grupos com remoção/alteração pendente
+        
+        # ÍNDICES ORDENADOS campo -> (valor, id): período, faixa de perda e top-K
+        self._indices_ordenados = {campo: IndiceOrdenado() for campo in CAMPOS_INDICE_ORDENADO}
+        
+        # ÍNDICES DE CATEGORIA campo -> {valor: set(ids)}: fazenda
+        self._indices_categoria = {campo: {} for campo in CAMPOS_INDICE_CATEGORIA}
+        
+        # ÍNDICES BITMAP campo -> {valor: BitmapRoaring}: classificação, clima, máquina, tipo
+        self._indices_bitmap = {campo: {} for campo in CAMPOS_INDICE_BITMAP}
+        
+        self._cubos = []  # Agrupamentos pré-calculados (CuboAgregado)
+    
+    @property
+    def colheitas(self) -> list:
+        """
+        Lista das colheitas válidas, em ordem de inclusão (nova a cada
+        acesso; para percorrer sem copiar use listar_todas())
+        
+        Returns:
+            list: Colheitas
+        """
+        return list(self._ativas())
+    
+    def __len__(self) -> int:
+        """Quantidade de colheitas válidas"""
+        return len(self._indice_id)
+    
+    def _ativas(self):
+        """
+        Percorre as colheitas válidas sem copiar a lista
+        
+        Returns:
+            iterable: Colheitas (pula posições removidas)
+        """
+        if not self._lacunas:
+            return iter(self._registros)
+        return filter(None, self._registros)
+    
+    def _definir_registros(self, colheitas: list):
+        """
+        Substitui a lista de colheitas (sem lacunas) e o mapa de posições
+        (páginas novas: versões fixadas continuam com as antigas)
+        
+        Args:
+            colheitas (list): Colheitas válidas
+        """
+        self._registros = ArmazemPaginado(colheitas)
+        self._posicoes = {c.id: posicao for posicao, c in enumerate(colheitas)}
+        self._lacunas = 0
+    
+    def _compactar_se_necessario(self):
+        """
+        Remove as lacunas da lista quando passam de FRACAO_COMPACTACAO
+        (custo O(n) a cada ~n/4 remoções: O(1) amortizado por remoção)
+        """
+        if self._lacunas >= max(MINIMO_COMPACTACAO, FRACAO_COMPACTACAO * len(self._registros)):
+            self._definir_registros(list(filter(None, self._registros)))
+    
+    def leitura(self):
+        """
+        Contexto para várias leituras seguidas (ex: Consulta). Sem efeito
+        aqui; ColheitaManagerConcorrente devolve a trava de leitura.
+        
+        Returns:
+            Gerenciador de contexto
+        """
+        return nullcontext()
+    
+    def escrita(self):
+        """
+        Contexto para várias alterações seguidas sob uma só trava. Sem
+        efeito aqui; ColheitaManagerConcorrente devolve a trava de escrita.
+        
+        Returns:
+            Gerenciador de contexto
+        """
+        return nullcontext()
+    
+    def registrar_observador(self, observador, reproduzir: bool = False):
+        """
+        Registra objeto notificado a cada alteração das colheitas
+        
+        O observador pode implementar qualquer um dos métodos:
+        ao_adicionar(colheita), ao_atualizar(colheita, anterior: Colheita)
+        e ao_remover(colheita). carregar_snapshot troca todas as colheitas
+        de uma vez e chama ao_recarregar(colheitas); enquanto houver
+        observador sem esse método, o carregamento é recusado.
+        
+        Args:
+            observador: Objeto a notificar
+            reproduzir (bool): Enviar ao_adicionar das colheitas já existentes
+        """
+        if reproduzir and hasattr(observador, 'ao_adicionar'):
+            for colheita in self._ativas():
+                observador.ao_adicionar(colheita)
+        
+        self._observadores.append(observador)
+    
+    def remover_observador(self, observador):
+        """
+        Remove observador registrado
+        
+        Args:
+            observador: Objeto a remover
+        """
+        if observador in self._observadores:
+            self._observadores.remove(observador)
+    
+    def _notificar(self, evento: str, *args):
+        """
+        Chama o método do evento em cada observador que o implementa
+        
+        Args:
+            evento (str): 'ao_adicionar', 'ao_atualizar' ou 'ao_remover'
+            *args: Argumentos do evento
+        """
+        for observador in self._observadores:
+            metodo = getattr(observador, evento, None)
+            if metodo is not None:
+                metodo(*args)
+    
+    def _criar_registro(self, id_colheita: int, dados_colheita: dict) -> Colheita:
+        """
+        Monta o registro da colheita com os valores derivados
+        
+        Args:
+            id_colheita (int): ID a atribuir
+            dados_colheita (dict): Dicionário com dados da colheita
+            
+        Returns:
+            Colheita: Colheita completa (seq ainda não atribuída)
+        """
+        data_colheita = (dados_colheita.get('data_colheita') or
+                         datetime.now().strftime('%d/%m/%Y'))
+        
+        return Colheita(
+            id=id_colheita,
+            fazenda=dados_colheita['fazenda'],
+            area_hectares=dados_colheita['area_hectares'],
+            tipo_cana=dados_colheita['tipo_cana'],
+            produtividade=dados_colheita['produtividade'],
+            percentual_perda=dados_colheita['percentual_perda'],
+            preco_tonelada=dados_colheita['preco_tonelada'],
+            colheitadeira=dados_colheita['colheitadeira'],
+            velocidade=dados_colheita['velocidade'],
+            condicao_clima=dados_colheita['condicao_clima'],
+            data_colheita=data_colheita,
+            observacoes=dados_colheita.get('observacoes', ''),
+            # Calcular valores derivados
+            toneladas_colhidas=calcular_toneladas_colhidas(
+                dados_colheita['area_hectares'],
+                dados_colheita['produtividade'],
+                dados_colheita['percentual_perda']
+            ),
+            toneladas_perdidas=calcular_perda_toneladas(
+                dados_colheita['area_hectares'],
+                dados_colheita['produtividade'],
+                dados_colheita['percentual_perda']
+            ),
+            perda_financeira=calcular_perda_financeira_completa(
+                dados_colheita['area_hectares'],
+                dados_colheita['produtividade'],
+                dados_colheita['percentual_perda'],
+                dados_colheita['preco_tonelada']
+            ),
+            eficiencia=calcular_eficiencia_colheita(dados_colheita['percentual_perda']),
+            classificacao=classificar_nivel_perda(dados_colheita['percentual_perda']),
+            seq=0,
+            # Data convertida uma vez na inclusão (ordena e filtra sem reparsear)
+            data_ordinal=converter_data_ordinal(data_colheita)
+        )
+    
+    def _armazenar(self, colheita: Colheita):
+        """
+        Guarda colheita nova na lista e nos índices
+        
+        Args:
+            colheita (Colheita): Colheita completa
+        """
+        self._marcar_alteracao(colheita)
+        
+        # Adicionar à LISTA
+        self._posicoes[colheita.id] = self._registros.anexar(colheita)
+        self._indice_id[colheita.id] = colheita
+        self._indexar(colheita)
+        self._incluir_nos_sketches(colheita)
+        
+        self._notificar('ao_adicionar', colheita)
+    
+    def _inserir_novas(self, registros: list):
+        """
+        Numera colheitas novas com IDs consecutivos e as armazena
+        (único ponto que avança proximo_id para inclusões)
+        
+        Args:
+            registros (list): Colheitas já montadas por _criar_registro
+        """
+        primeiro_id = self.proximo_id
+        self.proximo_id = primeiro_id + len(registros)
+        
+        for deslocamento, colheita in enumerate(registros):
+            colheita.id = primeiro_id + deslocamento
+            self._armazenar(colheita)
     
     def adicionar_colheita(self, dados_colheita: dict) -> tuple:
         """
@@ -34,98 +367,404 @@ class ColheitaManager:
             tuple: (sucesso: bool, id: int, mensagem: str)
         """
         try:
-            # Criar DICIONÁRIO da colheita
-            colheita = {
-                'id': self.proximo_id,
-                'fazenda': dados_colheita['fazenda'],
-                'area_hectares': dados_colheita['area_hectares'],
-                'tipo_cana': dados_colheita['tipo_cana'],
-                'produtividade': dados_colheita['produtividade'],
-                'percentual_perda': dados_colheita['percentual_perda'],
-                'preco_tonelada': dados_colheita['preco_tonelada'],
-                'colheitadeira': dados_colheita['colheitadeira'],
-                'velocidade': dados_colheita['velocidade'],
-                'condicao_clima': dados_colheita['condicao_clima'],
-                'data_colheita': dados_colheita.get('data_colheita', 
-                                                    datetime.now().strftime('%d/%m/%Y')),
-                'observacoes': dados_colheita.get('observacoes', ''),
-                # Calcular valores derivados
-                'toneladas_colhidas': calcular_toneladas_colhidas(
-                    dados_colheita['area_hectares'],
-                    dados_colheita['produtividade'],
-                    dados_colheita['percentual_perda']
-                ),
-                'toneladas_perdidas': calcular_perda_toneladas(
-                    dados_colheita['area_hectares'],
-                    dados_colheita['produtividade'],
-                    dados_colheita['percentual_perda']
-                ),
-                'perda_financeira': calcular_perda_financeira_completa(
-                    dados_colheita['area_hectares'],
-                    dados_colheita['produtividade'],
-                    dados_colheita['percentual_perda'],
-                    dados_colheita['preco_tonelada']
-                ),
-                'eficiencia': calcular_eficiencia_colheita(dados_colheita['percentual_perda']),
-                'classificacao': classificar_nivel_perda(dados_colheita['percentual_perda'])
-            }
-            
-            # Adicionar à LISTA
-            self.colheitas.append(colheita)
-            self.proximo_id += 1
-            
-            return (True, colheita['id'], "✅ Colheita registrada com sucesso!")
+            # Criar registro da colheita (ID atribuído ao armazenar)
+            colheita = self._criar_registro(0, dados_colheita)
+            
+            self._inserir_novas([colheita])
+            
+            return (True, colheita.id, "✅ Colheita registrada com sucesso!")
         
         except Exception as e:
             return (False, 0, f"❌ Erro ao adicionar colheita: {str(e)}")
     
+    def adicionar_em_lote(self, lista_dados: list) -> tuple:
+        """
+        Adiciona várias colheitas de uma vez (todas ou nenhuma)
+        
+        Os registros são montados antes de qualquer inclusão: se um deles
+        falhar, nada é armazenado.
+        
+        Args:
+            lista_dados (list): Lista de dicionários com dados das colheitas
+            
+        Returns:
+            tuple: (sucesso: bool, quantidade: int, mensagem: str)
+        """
+        try:
+            registros = [self._criar_registro(0, dados) for dados in lista_dados]
+        except Exception as e:
+            return (False, 0, f"❌ Erro ao adicionar lote: {str(e)}")
+        
+        self._inserir_novas(registros)
+        
+        return (True, len(registros), f"✅ {len(registros)} colheita(s) registrada(s)!")
+    
     def buscar_por_id(self, id_colheita: int) -> dict:
         """
-        Busca colheita por ID na lista
+        Busca colheita por ID usando o índice
         
         Args:
             id_colheita (int): ID da colheita
             
         Returns:
-            dict: Dicionário da colheita ou None
+            Colheita: Registro da colheita ou None
+        """
+        return self._indice_id.get(id_colheita)
+    
+    def listar_todas(self) -> VisaoColheitas:
+        """
+        Todas as colheitas, em ordem de inclusão, sem copiar a lista
+        
+        Visão preguiçosa: lê o índice atual a cada iteração e pula colheitas
+        removidas durante o for (pode remover no corpo do laço); para uma
+        cópia estável use list(...).
+        
+        Returns:
+            VisaoColheitas: Visão somente leitura (paginável)
+        """
+        return self._criar_visao(self._fatia_registros, self.__len__, 'todas')
+    
+    def _criar_visao(self, gerar, contar, descricao: str) -> VisaoColheitas:
+        """
+        Monta a visão devolvida pelos métodos listar_*
+        
+        Args:
+            gerar (function): (offset, limite) -> iterador de colheitas
+            contar (function): () -> quantidade
+            descricao (str): Texto para depuração
+            
+        Returns:
+            VisaoColheitas: Visão preguiçosa
+        """
+        return VisaoColheitas(gerar, contar, descricao)
+    
+    def _fatia_registros(self, offset: int, limite: int = None):
+        """
+        Colheitas válidas a partir da posição `offset` (salta direto para a
+        página quando não há remoções pendentes)
+        
+        Args:
+            offset (int): Colheitas a pular
+            limite (int, optional): Máximo de colheitas. None = até o fim.
+            
+        Returns:
+            iterator: Colheitas
         """
-        for colheita in self.colheitas:
-            if colheita['id'] == id_colheita:
-                return colheita
-        return None
+        if not self._lacunas:
+            posicoes = self._registros.iterar(offset, limite)
+        else:
+            posicoes = fatiar(filter(None, self._registros), offset, limite)
+        
+        # Relidas pelo ID: remoção ou compactação durante a iteração não
+        # devolvem colheita já removida (nem a versão anterior de uma atualizada)
+        return self._resolver_ids(map(attrgetter('id'), filter(None, posicoes)))
     
-    def listar_todas(self) -> list:
+    def _resolver_ids(self, ids):
         """
-        Retorna lista de todas as colheitas
+        Colheitas dos IDs, pulando as removidas depois que a iteração
+        começou (ex: remover dentro do for sobre a visão)
         
+        Args:
+            ids (iterable): IDs lidos do índice
+            
         Returns:
-            list: Lista de dicionários de colheitas
+            iterator: Colheitas ainda válidas
         """
-        return self.colheitas.copy()
+        return filter(None, map(self._indice_id.get, ids))
     
-    def listar_por_fazenda(self, nome_fazenda: str) -> list:
+    def listar_por_fazenda(self, nome_fazenda: str) -> VisaoColheitas:
         """
         Filtra colheitas por fazenda
         
+        Visão preguiçosa: lê o índice atual a cada iteração e pula colheitas
+        removidas durante o for (pode remover no corpo do laço); para uma
+        cópia estável use list(...).
+        
         Args:
             nome_fazenda (str): Nome da fazenda
             
         Returns:
-            list: Lista filtrada de colheitas
+            VisaoColheitas: Colheitas da fazenda, em ordem de ID
         """
-        return [c for c in self.colheitas if c['fazenda'].lower() == nome_fazenda.lower()]
+        return self._listar_categoria('fazenda', nome_fazenda)
     
-    def listar_por_classificacao(self, classificacao: str) -> list:
+    def listar_por_classificacao(self, classificacao: str) -> VisaoColheitas:
         """
         Filtra colheitas por classificação de perda
         
+        Visão preguiçosa: lê o índice atual a cada iteração e pula colheitas
+        removidas durante o for (pode remover no corpo do laço); para uma
+        cópia estável use list(...).
+        
         Args:
             classificacao (str): 'Ótima', 'Boa', 'Regular', 'Alta' ou 'Crítica'
             
         Returns:
-            list: Lista filtrada de colheitas
+            VisaoColheitas: Colheitas da classificação, em ordem de ID
+        """
+        return self._listar_categoria('classificacao', classificacao)
+    
+    def _listar_categoria(self, campo: str, valor) -> VisaoColheitas:
+        """
+        Colheitas com o valor no índice de categoria ou bitmap, em ordem de ID
+        
+        Args:
+            campo (str): Campo em CAMPOS_INDICE_CATEGORIA ou CAMPOS_INDICE_BITMAP
+            valor: Valor procurado
+            
+        Returns:
+            VisaoColheitas: Colheitas
+        """
+        # Índices lidos a cada uso: carregar_snapshot troca os objetos
+        if campo in self._indices_bitmap:
+            def gerar(offset, limite):
+                # Bitmap já percorre os IDs em ordem crescente (e pula blocos)
+                bitmap = self._indices_bitmap[campo].get(valor)
+                if bitmap is None:
+                    return iter(())
+                return self._resolver_ids(fatiar(bitmap.iterar(offset), 0, limite))
+            
+            return self._criar_visao(gerar, lambda: len(self._indices_bitmap[campo].get(valor, ())),
+                                     f"{campo} = {valor}")
+        
+        chave = normalizar_categoria(campo, valor)
+        
+        def gerar(offset, limite):
+            ids = sorted(self._indices_categoria[campo].get(chave, ()))
+            return self._resolver_ids(fatiar(ids, offset, limite))
+        
+        return self._criar_visao(gerar, lambda: len(self._indices_categoria[campo].get(chave, ())),
+                                 f"{campo} = {valor}")
+    
+    def contar_combinacao(self, filtros: dict) -> int:
+        """
+        Conta colheitas com todos os valores pedidos nos campos de bitmap
+        (AND dos bitmaps + popcount, sem montar lista)
+        
+        Ex: contar_combinacao({'classificacao': 'Crítica',
+                               'condicao_clima': 'Chuva Forte',
+                               'colheitadeira': 'Case IH'})
+        
+        Args:
+            filtros (dict): Campo de CAMPOS_INDICE_BITMAP -> valor
+            
+        Returns:
+            int: Quantidade de colheitas
+        """
+        if not filtros:
+            return len(self)
+        
+        bitmaps = []
+        for campo, valor in filtros.items():
+            bitmap = self._indices_bitmap[campo].get(valor)
+            if bitmap is None:
+                return 0
+            bitmaps.append(bitmap)
+        
+        return BitmapRoaring.contar_intersecao(*bitmaps)
+    
+    def listar_por_periodo(self, data_inicio=None, data_fim=None) -> VisaoColheitas:
+        """
+        Colheitas entre duas datas (inclusive), em ordem de data - O(log n + k)
+        
+        Visão preguiçosa: lê o índice atual a cada iteração e pula colheitas
+        removidas durante o for (pode remover no corpo do laço); para uma
+        cópia estável use list(...).
+        
+        Args:
+            data_inicio (optional): 'DD/MM/YYYY', date ou ordinal. None = sem limite.
+            data_fim (optional): 'DD/MM/YYYY', date ou ordinal. None = sem limite.
+            
+        Returns:
+            VisaoColheitas: Colheitas do período
+        """
+        inicio = converter_data_ordinal(data_inicio) if data_inicio is not None else None
+        fim = converter_data_ordinal(data_fim) if data_fim is not None else None
+        
+        return self._visao_intervalo('data_ordinal', inicio, fim)
+    
+    def _visao_intervalo(self, campo: str, minimo, maximo) -> VisaoColheitas:
+        """
+        Visão das colheitas de uma faixa de índice ordenado (a paginação pula
+        direto para o offset pelos blocos do índice)
+        
+        Args:
+            campo (str): Campo em CAMPOS_INDICE_ORDENADO
+            minimo: Menor chave (None = sem limite)
+            maximo: Maior chave (None = sem limite)
+            
+        Returns:
+            VisaoColheitas: Colheitas em ordem da chave
+        """
+        def gerar(offset, limite):
+            ids = self._indices_ordenados[campo].iterar(minimo, maximo, offset, limite)
+            return self._resolver_ids(ids)
+        
+        return self._criar_visao(gerar, lambda: self._indices_ordenados[campo].contar(minimo, maximo),
+                                 f"{campo} entre {minimo} e {maximo}")
+    
+    def listar_por_faixa_perda(self, minimo: float = None, maximo: float = None,
+                               campo: str = 'percentual_perda') -> VisaoColheitas:
+        """
+        Colheitas com perda entre minimo e maximo (inclusive), da menor
+        para a maior - O(log n + k)
+        
+        Visão preguiçosa: lê o índice atual a cada iteração e pula colheitas
+        removidas durante o for (pode remover no corpo do laço); para uma
+        cópia estável use list(...).
+        
+        Args:
+            minimo (float, optional): Menor perda. None = sem limite.
+            maximo (float, optional): Maior perda. None = sem limite.
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+            
+        Returns:
+            VisaoColheitas: Colheitas da faixa
+        """
+        return self._visao_intervalo(campo, minimo, maximo)
+    
+    def listar_maiores_perdas(self, quantidade: int = 50, campo: str = 'percentual_perda') -> list:
+        """
+        As `quantidade` colheitas com maior perda, da maior para a menor
+        
+        Args:
+            quantidade (int): Quantidade de colheitas
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+            
+        Returns:
+            list: Colheitas
+        """
+        return [self._indice_id[i] for i in self._indices_ordenados[campo].maiores(quantidade)]
+    
+    def listar_menores_perdas(self, quantidade: int = 50, campo: str = 'percentual_perda') -> list:
+        """
+        As `quantidade` colheitas com menor perda, da menor para a maior
+        
+        Args:
+            quantidade (int): Quantidade de colheitas
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+            
+        Returns:
+            list: Colheitas
+        """
+        return [self._indice_id[i] for i in self._indices_ordenados[campo].menores(quantidade)]
+    
+    def _indexar(self, colheita: Colheita):
+        """
+        Inclui colheita nos índices ordenados, de categoria e bitmap
+        
+        Args:
+            colheita (Colheita): Colheita incluída
+        """
+        for campo, indice in self._indices_ordenados.items():
+            indice.inserir(getattr(colheita, campo), colheita.id)
+        
+        self._indexar_categorias(colheita)
+    
+    def _indexar_categorias(self, colheita: Colheita):
+        """
+        Inclui colheita nos índices de categoria e bitmap
+        
+        Args:
+            colheita (Colheita): Colheita incluída
+        """
+        for campo, indice in self._indices_categoria.items():
+            chave = normalizar_categoria(campo, getattr(colheita, campo))
+            ids = indice.get(chave)
+            if ids is None:
+                ids = indice[chave] = set()
+            ids.add(colheita.id)
+        
+        for campo, indice in self._indices_bitmap.items():
+            valor = getattr(colheita, campo)
+            bitmap = indice.get(valor)
+            if bitmap is None:
+                bitmap = indice[valor] = BitmapRoaring()
+            bitmap.adicionar(colheita.id)
+    
+    def _desindexar(self, colheita: Colheita):
+        """
+        Retira colheita dos índices ordenados, de categoria e bitmap
+        
+        Args:
+            colheita (Colheita): Colheita (com os valores usados na inclusão)
+        """
+        for campo, indice in self._indices_ordenados.items():
+            indice.remover(getattr(colheita, campo), colheita.id)
+        
+        for campo, indice in self._indices_categoria.items():
+            self._desindexar_categoria(campo, getattr(colheita, campo), colheita.id)
+        
+        for campo in self._indices_bitmap:
+            self._desindexar_bitmap(campo, getattr(colheita, campo), colheita.id)
+    
+    def _desindexar_categoria(self, campo: str, valor, id_colheita: int):
+        """
+        Retira ID do conjunto de um valor (o valor some quando fica vazio)
+        
+        Args:
+            campo (str): Campo em CAMPOS_INDICE_CATEGORIA
+            valor: Valor do campo usado na inclusão
+            id_colheita (int): ID da colheita
+        """
+        indice = self._indices_categoria[campo]
+        chave = normalizar_categoria(campo, valor)
+        ids = indice.get(chave)
+        if ids is not None:
+            ids.discard(id_colheita)
+            if not ids:
+                del indice[chave]
+    
+    def _desindexar_bitmap(self, campo: str, valor, id_colheita: int):
+        """
+        Retira ID do bitmap de um valor (o valor some quando fica vazio)
+        
+        Args:
+            campo (str): Campo em CAMPOS_INDICE_BITMAP
+            valor: Valor do campo usado na inclusão
+            id_colheita (int): ID da colheita
         """
-        return [c for c in self.colheitas if c['classificacao'] == classificacao]
+        indice = self._indices_bitmap[campo]
+        bitmap = indice.get(valor)
+        if bitmap is not None:
+            bitmap.remover(id_colheita)
+            if not bitmap:
+                del indice[valor]
+    
+    def _reindexar(self, colheita: Colheita, anterior: Colheita):
+        """
+        Atualiza nos índices só os campos que mudaram
+        
+        Args:
+            colheita (Colheita): Colheita atualizada
+            anterior (Colheita): Cópia da colheita antes da alteração
+        """
+        for campo, indice in self._indices_ordenados.items():
+            if getattr(colheita, campo) != getattr(anterior, campo):
+                indice.remover(getattr(anterior, campo), colheita.id)
+                indice.inserir(getattr(colheita, campo), colheita.id)
+        
+        for campo, indice in self._indices_categoria.items():
+            if getattr(colheita, campo) != getattr(anterior, campo):
+                self._desindexar_categoria(campo, getattr(anterior, campo), colheita.id)
+                indice.setdefault(normalizar_categoria(campo, getattr(colheita, campo)),
+                                  set()).add(colheita.id)
+        
+        for campo, indice in self._indices_bitmap.items():
+            if getattr(colheita, campo) != getattr(anterior, campo):
+                self._desindexar_bitmap(campo, getattr(anterior, campo), colheita.id)
+                indice.setdefault(getattr(colheita, campo), BitmapRoaring()).adicionar(colheita.id)
+    
+    def _substituir(self, colheita: Colheita):
+        """
+        Põe a nova versão da colheita no lugar da armazenada (registros não
+        mudam no lugar: versões fixadas continuam vendo o objeto anterior)
+        
+        Args:
+            colheita (Colheita): Colheita com o mesmo ID de uma armazenada
+        """
+        self._registros.trocar(self._posicoes[colheita.id], colheita)
+        self._indice_id[colheita.id] = colheita
     
     def atualizar_colheita(self, id_colheita: int, dados_atualizados: dict) -> tuple:
         """
@@ -138,39 +777,51 @@ class ColheitaManager:
         Returns:
             tuple: (sucesso: bool, mensagem: str)
         """
-        colheita = self.buscar_por_id(id_colheita)
+        anterior = self.buscar_por_id(id_colheita)
         
-        if colheita is None:
+        if anterior is None:
             return (False, "❌ Colheita não encontrada!")
         
         try:
+            # Alteração em cópia: o registro armazenado não muda no lugar
+            colheita = anterior.copy()
+            
             # Atualizar campos permitidos
             campos_editaveis = ['observacoes', 'percentual_perda', 'velocidade']
             
             for campo, valor in dados_atualizados.items():
                 if campo in campos_editaveis:
-                    colheita[campo] = valor
+                    setattr(colheita, campo, valor)
             
             # Recalcular valores derivados se perda foi alterada
             if 'percentual_perda' in dados_atualizados:
-                colheita['toneladas_perdidas'] = calcular_perda_toneladas(
-                    colheita['area_hectares'],
-                    colheita['produtividade'],
-                    colheita['percentual_perda']
+                colheita.toneladas_perdidas = calcular_perda_toneladas(
+                    colheita.area_hectares,
+                    colheita.produtividade,
+                    colheita.percentual_perda
                 )
-                colheita['perda_financeira'] = calcular_perda_financeira_completa(
-                    colheita['area_hectares'],
-                    colheita['produtividade'],
-                    colheita['percentual_perda'],
-                    colheita['preco_tonelada']
+                colheita.perda_financeira = calcular_perda_financeira_completa(
+                    colheita.area_hectares,
+                    colheita.produtividade,
+                    colheita.percentual_perda,
+                    colheita.preco_tonelada
                 )
-                colheita['toneladas_colhidas'] = calcular_toneladas_colhidas(
-                    colheita['area_hectares'],
-                    colheita['produtividade'],
-                    colheita['percentual_perda']
+                colheita.toneladas_colhidas = calcular_toneladas_colhidas(
+                    colheita.area_hectares,
+                    colheita.produtividade,
+                    colheita.percentual_perda
                 )
-                colheita['eficiencia'] = calcular_eficiencia_colheita(colheita['percentual_perda'])
-                colheita['classificacao'] = classificar_nivel_perda(colheita['percentual_perda'])
+                colheita.eficiencia = calcular_eficiencia_colheita(colheita.percentual_perda)
+                colheita.classificacao = classificar_nivel_perda(colheita.percentual_perda)
+            
+            if colheita.percentual_perda != anterior.percentual_perda:
+                self._sketches_desatualizados.update(self._grupos_sketch(colheita))
+            
+            self._substituir(colheita)
+            self._reindexar(colheita, anterior)
+            
+            self._marcar_alteracao(colheita)
+            self._notificar('ao_atualizar', colheita, anterior)
             
             return (True, "✅ Colheita atualizada!")
         
@@ -179,7 +830,8 @@ class ColheitaManager:
     
     def remover_colheita(self, id_colheita: int) -> tuple:
         """
-        Remove colheita da lista
+        Remove colheita da lista - O(1) amortizado: a posição fica vazia
+        até a próxima compactação
         
         Args:
             id_colheita (int): ID da colheita
@@ -192,113 +844,348 @@ class ColheitaManager:
         if colheita is None:
             return (False, "❌ Colheita não encontrada!")
         
-        self.colheitas.remove(colheita)
+        self._registros.trocar(self._posicoes[id_colheita], None)
+        self._lacunas += 1
+        self._descartar(colheita)
+        self._compactar_se_necessario()
+        
         return (True, "✅ Colheita removida!")
     
-    def obter_estatisticas(self) -> dict:
+    def remover_em_lote(self, predicado) -> tuple:
         """
-        Calcula estatísticas gerais das colheitas
+        Remove todas as colheitas que atendem o predicado (ex: uma safra
+        inteira) em uma passada, com uma única compactação no final
         
+        Args:
+            predicado (function): colheita -> bool
+            
         Returns:
-            dict: Dicionário com estatísticas
+            tuple: (sucesso: bool, quantidade: int, mensagem: str)
         """
-        if not self.colheitas:
-            return {
-                'total_colheitas': 0,
-                'area_total': 0.0,
-                'perda_media': 0.0,
-                'perda_total_financeira': 0.0,
-                'toneladas_perdidas_total': 0.0,
-                'eficiencia_media': 0.0
-            }
-        
-        total = len(self.colheitas)
-        area_total = sum(c['area_hectares'] for c in self.colheitas)
-        perda_media = sum(c['percentual_perda'] for c in self.colheitas) / total
-        perda_financeira_total = sum(c['perda_financeira'] for c in self.colheitas)
-        toneladas_perdidas = sum(c['toneladas_perdidas'] for c in self.colheitas)
-        eficiencia_media = sum(c['eficiencia'] for c in self.colheitas) / total
-        
-        return {
-            'total_colheitas': total,
-            'area_total': area_total,
-            'perda_media': perda_media,
-            'perda_total_financeira': perda_financeira_total,
-            'toneladas_perdidas_total': toneladas_perdidas,
-            'eficiencia_media': eficiencia_media
-        }
+        removidas = 0
+        
+        try:
+            for posicao, colheita in enumerate(self._registros):
+                if colheita is None or not predicado(colheita):
+                    continue
+                self._registros.trocar(posicao, None)
+                self._lacunas += 1
+                self._descartar(colheita)
+                removidas += 1
+        except Exception as e:
+            return (False, removidas, f"❌ Erro ao remover lote: {str(e)}")
+        finally:
+            self._compactar_se_necessario()
+        
+        return (True, removidas, f"✅ {removidas} colheita(s) removida(s)!")
     
-    def obter_ranking_fazendas(self) -> list:
+    def _descartar(self, colheita: Colheita):
         """
-        Retorna ranking de fazendas por eficiência
+        Retira colheita já tirada da lista dos índices e avisa os observadores
         
+        Args:
+            colheita (Colheita): Colheita removida
+        """
+        id_colheita = colheita.id
+        del self._indice_id[id_colheita]
+        del self._posicoes[id_colheita]
+        self._desindexar(colheita)
+        # Sketches não removem valores: o grupo é refeito na próxima consulta
+        self._sketches_desatualizados.update(self._grupos_sketch(colheita))
+        
+        # Tombstone para a exportação incremental
+        self.sequencia += 1
+        self._alteracoes.pop(id_colheita, None)
+        self._remocoes[id_colheita] = self.sequencia
+        
+        self._notificar('ao_remover', colheita)
+    
+    def restaurar_registro(self, colheita) -> Colheita:
+        """
+        Insere ou substitui colheita já calculada (usado na reprodução do journal)
+        
+        Args:
+            colheita (dict/Colheita): Colheita completa, com 'id'
+            
         Returns:
-            list: Lista de dicionários com fazenda e eficiência média
+            Colheita: Colheita armazenada
+        """
+        if not isinstance(colheita, Colheita):
+            colheita = Colheita.de_dict(colheita)
+        
+        existente = self._indice_id.get(colheita.id)
+        seq = colheita.seq
+        
+        # Registros gravados antes da coluna data_ordinal
+        if colheita.data_ordinal is None:
+            colheita.data_ordinal = converter_data_ordinal(colheita.data_colheita)
+        
+        if existente is not None:
+            self._sketches_desatualizados.update(self._grupos_sketch(existente))
+            self._sketches_desatualizados.update(self._grupos_sketch(colheita))
+            self._substituir(colheita)
+            self._reindexar(colheita, existente)
+            self._marcar_alteracao(colheita, seq)
+            self._notificar('ao_atualizar', colheita, existente)
+            return colheita
+        
+        self._posicoes[colheita.id] = self._registros.anexar(colheita)
+        self._indice_id[colheita.id] = colheita
+        self._indexar(colheita)
+        self._incluir_nos_sketches(colheita)
+        self.proximo_id = max(self.proximo_id, colheita.id + 1)
+        self._marcar_alteracao(colheita, seq)
+        
+        self._notificar('ao_adicionar', colheita)
+        
+        return colheita
+    
+    def _marcar_alteracao(self, colheita: Colheita, seq: int = 0):
+        """
+        Atribui número de sequência à colheita alterada
+        
+        Args:
+            colheita (Colheita): Colheita incluída ou atualizada
+            seq (int): Sequência já conhecida (reprodução); 0 gera a próxima
         """
-        # Dicionário para agrupar por fazenda
-        fazendas_dict = {}
+        if seq:
+            self.sequencia = max(self.sequencia, seq)
+        else:
+            self.sequencia += 1
+            seq = self.sequencia
         
-        for colheita in self.colheitas:
-            fazenda = colheita['fazenda']
+        colheita.seq = seq
+        self._alteracoes[colheita.id] = seq
+        self._alteracoes.move_to_end(colheita.id)
+    
+    def obter_alteracoes_desde(self, marca: int) -> tuple:
+        """
+        Retorna colheitas incluídas/atualizadas e removidas após uma marca
+        (percorre só as alterações novas, da mais recente para trás)
+        
+        Args:
+            marca (int): Número de sequência da última exportação
+            
+        Returns:
+            tuple: (alteradas: list, removidas: list, sequencia_atual: int)
+        """
+        alteradas = []
+        for id_colheita, seq in reversed(self._alteracoes.items()):
+            if seq <= marca:
+                break
+            alteradas.append(self._indice_id[id_colheita])
+        
+        removidas = []
+        for id_colheita, seq in reversed(self._remocoes.items()):
+            if seq <= marca:
+                break
+            removidas.append({'id': id_colheita, 'seq': seq})
+        
+        alteradas.reverse()
+        removidas.reverse()
+        
+        return (alteradas, removidas, self.sequencia)
+    
+    def descartar_remocoes_ate(self, marca: int) -> int:
+        """
+        Descarta tombstones já entregues na exportação incremental
+        
+        Args:
+            marca (int): Número de sequência já exportado
             
-            if fazenda not in fazendas_dict:
-                fazendas_dict[fazenda] = {
-                    'fazenda': fazenda,
-                    'total_colheitas': 0,
-                    'soma_eficiencia': 0.0,
-                    'soma_perda': 0.0
-                }
+        Returns:
+            int: Quantidade de tombstones descartados
+        """
+        descartados = 0
+        while self._remocoes:
+            id_colheita, seq = next(iter(self._remocoes.items()))
+            if seq > marca:
+                break
+            del self._remocoes[id_colheita]
+            descartados += 1
+        return descartados
+    
+    def _grupos_sketch(self, colheita: Colheita) -> tuple:
+        """
+        Grupos de sketch que a colheita alimenta
+        
+        Args:
+            colheita (Colheita): Colheita
             
-            fazendas_dict[fazenda]['total_colheitas'] += 1
-            fazendas_dict[fazenda]['soma_eficiencia'] += colheita['eficiencia']
-            fazendas_dict[fazenda]['soma_perda'] += colheita['percentual_perda']
+        Returns:
+            tuple: Chaves (grupo, valor)
+        """
+        return (('geral', ''), ('fazenda', colheita.fazenda), ('tipo_cana', colheita.tipo_cana))
+    
+    def _incluir_nos_sketches(self, colheita: Colheita):
+        """
+        Inclui a perda da colheita nos sketches dos seus grupos
         
-        # Calcular médias e criar lista
-        ranking = []
-        for dados in fazendas_dict.values():
-            ranking.append({
-                'fazenda': dados['fazenda'],
-                'colheitas': dados['total_colheitas'],
-                'eficiencia_media': dados['soma_eficiencia'] / dados['total_colheitas'],
-                'perda_media': dados['soma_perda'] / dados['total_colheitas']
-            })
+        Args:
+            colheita (Colheita): Colheita incluída
+        """
+        for chave in self._grupos_sketch(colheita):
+            sketch = self._sketches.get(chave)
+            if sketch is None:
+                sketch = self._sketches[chave] = SketchKLL()
+            sketch.adicionar(colheita.percentual_perda)
+    
+    def _reconstruir_sketches(self, grupos: set = None):
+        """
+        Refaz sketches a partir das colheitas (uma passada na lista)
+        
+        Args:
+            grupos (set, optional): Chaves a refazer. None refaz todos.
+        """
+        if grupos is None:
+            self._sketches = {}
+        else:
+            for chave in grupos:
+                self._sketches.pop(chave, None)
         
-        # Ordenar por eficiência (maior primeiro)
-        ranking.sort(key=lambda x: x['eficiencia_media'], reverse=True)
+        for colheita in self._ativas():
+            for chave in self._grupos_sketch(colheita):
+                if grupos is not None and chave not in grupos:
+                    continue
+                sketch = self._sketches.get(chave)
+                if sketch is None:
+                    sketch = self._sketches[chave] = SketchKLL()
+                sketch.adicionar(colheita.percentual_perda)
         
-        return ranking
+        self._sketches_desatualizados.clear()
     
-    def obter_totalizacao_por_tipo_cana(self) -> dict:
+    def obter_sketch_perdas(self, grupo: str = 'geral', valor: str = '') -> SketchKLL:
         """
-        Totaliza dados por tipo de cana
+        Sketch de quantis do percentual de perda de um grupo
+        (mesclável com sketches de outros gerenciadores/shards)
+        
+        Args:
+            grupo (str): 'geral', 'fazenda' ou 'tipo_cana'
+            valor (str): Nome da fazenda ou tipo de cana ('' para geral)
+            
+        Returns:
+            SketchKLL: Sketch do grupo (vazio se não há colheitas)
+        """
+        if self._sketches_desatualizados:
+            self._reconstruir_sketches(set(self._sketches_desatualizados))
+        
+        return self._sketches.get((grupo, valor)) or SketchKLL()
+    
+    def obter_quantis_perda(self, grupo: str = 'geral', valor: str = '',
+                            quantis: tuple = QUANTIS_PADRAO) -> dict:
+        """
+        Quantis aproximados do percentual de perda de um grupo
+        
+        Args:
+            grupo (str): 'geral', 'fazenda' ou 'tipo_cana'
+            valor (str): Nome da fazenda ou tipo de cana ('' para geral)
+            quantis (tuple): Quantis entre 0 e 1
+            
+        Returns:
+            dict: {'P50': valor, 'P90': valor, 'P99': valor} (None sem colheitas)
+        """
+        return self.obter_sketch_perdas(grupo, valor).quantis(quantis)
+    
+    def obter_estatisticas(self, data_inicio=None, data_fim=None) -> dict:
+        """
+        Calcula estatísticas gerais das colheitas
+        
+        Com período informado, só as colheitas do período são lidas (índice
+        de data) e os quantis são exatos; sem período, os quantis vêm do sketch.
+        
+        Args:
+            data_inicio (optional): Início do período ('DD/MM/YYYY', date ou ordinal)
+            data_fim (optional): Fim do período ('DD/MM/YYYY', date ou ordinal)
         
         Returns:
-            dict: Dicionário com tipo de cana como chave
+            dict: Dicionário com estatísticas
         """
-        totalizacao = {}
+        if data_inicio is not None or data_fim is not None:
+            return resumir_colheitas(list(self.listar_por_periodo(data_inicio, data_fim)))
         
-        for colheita in self.colheitas:
-            tipo = colheita['tipo_cana']
+        colheitas = self.colheitas
+        return resumir_colheitas(colheitas, self.obter_quantis_perda() if colheitas else None)
+    
+    def registrar_cubo(self, dimensoes: list, medidas: list) -> CuboAgregado:
+        """
+        Pré-calcula um agrupamento usado com frequência; agregar() passa a
+        respondê-lo (e a qualquer subconjunto das dimensões) sem reler as colheitas
+        
+        Args:
+            dimensoes (list): Dimensões do cubo (ex: ['colheitadeira', 'condicao_clima', 'mes'])
+            medidas (list): Pares (campo, função) aditivos (soma, media, contagem)
             
-            if tipo not in totalizacao:
-                totalizacao[tipo] = {
-                    'quantidade': 0,
-                    'area_total': 0.0,
-                    'perda_media': 0.0,
-                    'soma_perda': 0.0
-                }
+        Returns:
+            CuboAgregado: Cubo registrado
+        """
+        cubo = CuboAgregado(dimensoes, medidas)
+        self.registrar_observador(cubo, reproduzir=True)
+        self._cubos.append(cubo)
+        return cubo
+    
+    def agregar(self, dimensoes: list, medidas: list, filtro=None) -> list:
+        """
+        Agrupa colheitas por dimensões com medidas soma/media/contagem/minimo/maximo
+        
+        Sem filtro, usa um cubo registrado que atenda a consulta; senão,
+        percorre as colheitas uma vez.
+        
+        Args:
+            dimensoes (list): Campos (ou 'mes'/'ano') que formam o grupo
+            medidas (list): Pares (campo, função), ex: [('percentual_perda', 'media')]
+            filtro (function, optional): Só agrega colheitas com filtro(c) verdadeiro
             
-            totalizacao[tipo]['quantidade'] += 1
-            totalizacao[tipo]['area_total'] += colheita['area_hectares']
-            totalizacao[tipo]['soma_perda'] += colheita['percentual_perda']
+        Returns:
+            list: Uma linha (dict) por grupo
+        """
+        if filtro is None:
+            for cubo in self._cubos:
+                if cubo.atende(dimensoes, medidas):
+                    return cubo.consultar(dimensoes, medidas)
+        
+        return agregar(self._ativas(), dimensoes, medidas, filtro)
+    
+    def fixar_versao(self) -> VersaoColheitas:
+        """
+        Congela o estado atual para leituras longas (ex: relatório completo)
+        sem copiar as colheitas e sem impedir alterações; libere ao terminar
+        
+            with manager.fixar_versao() as versao:
+                versao.obter_estatisticas()
+                versao.obter_ranking_fazendas()
         
-        # Calcular médias
-        for tipo in totalizacao:
-            totalizacao[tipo]['perda_media'] = (
-                totalizacao[tipo]['soma_perda'] / totalizacao[tipo]['quantidade']
-            )
+        Returns:
+            VersaoColheitas: Versão fixada (somente leitura)
+        """
+        return VersaoColheitas(self._registros, len(self), self.sequencia)
+    
+    def iterar_linhas_exportacao(self):
+        """
+        Gera as linhas de exportação uma a uma (cabeçalho primeiro),
+        sem montar a lista inteira em memória
+        
+        Yields:
+            list: Cabeçalho e depois uma lista de valores por colheita
+        """
+        yield list(CABECALHO_EXPORTACAO)
         
-        return totalizacao
+        for c in self._ativas():
+            yield [
+                c.id,
+                c.fazenda,
+                c.area_hectares,
+                c.tipo_cana,
+                c.produtividade,
+                c.percentual_perda,
+                c.toneladas_perdidas,
+                c.perda_financeira,
+                c.eficiencia,
+                c.classificacao,
+                c.data_colheita,
+                c.colheitadeira,
+                c.velocidade,
+                c.condicao_clima
+            ]
     
     def exportar_para_lista_simples(self) -> list:
         """
@@ -307,29 +1194,191 @@ class ColheitaManager:
         Returns:
             list: Lista de listas com dados
         """
-        dados = []
-        
-        # Cabeçalho
-        dados.append([
-            'ID', 'Fazenda', 'Área (ha)', 'Tipo Cana', 'Produtividade',
-            'Perda (%)', 'Perda (t)', 'Perda (R$)', 'Eficiência (%)',
-            'Classificação', 'Data'
-        ])
-        
-        # Dados
-        for c in self.colheitas:
-            dados.append([
-                c['id'],
-                c['fazenda'],
-                c['area_hectares'],
-                c['tipo_cana'],
-                c['produtividade'],
-                c['percentual_perda'],
-                c['toneladas_perdidas'],
-                c['perda_financeira'],
-                c['eficiencia'],
-                c['classificacao'],
-                c['data_colheita']
-            ])
-        
-        return dados
+        return list(self.iterar_linhas_exportacao())
+    
+    def salvar_snapshot(self, caminho: str = None) -> tuple:
+        """
+        Salva o estado completo do gerenciador em arquivo binário
+        
+        Args:
+            caminho (str, optional): Caminho do arquivo. Usa o padrão se None.
+            
+        Returns:
+            tuple: (sucesso: bool, caminho: str, mensagem: str)
+        """
+        if caminho is None:
+            caminho = CONFIG_PERSISTENCIA['arquivo_snapshot']
+        
+        if self._sketches_desatualizados:
+            self._reconstruir_sketches(set(self._sketches_desatualizados))
+        
+        metadados = {
+            'proximo_id': self.proximo_id,
+            'sequencia': self.sequencia,
+            'sketches': [[grupo, valor, sketch.para_dict()]
+                         for (grupo, valor), sketch in self._sketches.items()]
+        }
+        arrays = {
+            'alteracoes_ids': array('q', self._alteracoes.keys()),
+            'alteracoes_seq': array('q', self._alteracoes.values()),
+            'remocoes_ids': array('q', self._remocoes.keys()),
+            'remocoes_seq': array('q', self._remocoes.values())
+        }
+        for campo, indice in self._indices_ordenados.items():
+            arrays[f'indice_{campo}_ids'] = array('q', indice.ids_em_ordem())
+        
+        # Índices de categoria: IDs agrupados por valor, [valor, quantidade] nos metadados
+        metadados['categorias'] = {}
+        for campo, indice in self._indices_categoria.items():
+            ids = array('q')
+            grupos = []
+            for chave, conjunto in indice.items():
+                grupos.append([chave, len(conjunto)])
+                ids.extend(conjunto)
+            arrays[f'categoria_{campo}_ids'] = ids
+            metadados['categorias'][campo] = grupos
+        
+        # Índices bitmap: contêineres gravados como estão
+        metadados['bitmaps'] = {}
+        for campo, indice in self._indices_bitmap.items():
+            esparsos, densos = array('H'), array('B')
+            metadados['bitmaps'][campo] = [[valor, bitmap.serializar(esparsos, densos)]
+                                           for valor, bitmap in indice.items()]
+            arrays[f'bitmap_{campo}_esparsos'] = esparsos
+            arrays[f'bitmap_{campo}_densos'] = densos
+        
+        return gravar_arquivo_snapshot(caminho, self.colheitas, COLUNAS_SNAPSHOT,
+                                       metadados, arrays)
+    
+    def _restaurar_indices_categoria(self, metadados: dict, arrays: dict, colheitas: list):
+        """
+        Restaura índices de categoria e bitmap gravados no snapshot
+        (fatias dos arrays); snapshots sem eles refazem colheita a colheita
+        
+        Args:
+            metadados (dict): Metadados do snapshot
+            arrays (dict): Arrays do snapshot
+            colheitas (list): Colheitas restauradas
+        """
+        self._indices_categoria = {campo: {} for campo in CAMPOS_INDICE_CATEGORIA}
+        self._indices_bitmap = {campo: {} for campo in CAMPOS_INDICE_BITMAP}
+        
+        categorias = metadados.get('categorias', {})
+        bitmaps = metadados.get('bitmaps', {})
+        if not (all(campo in categorias for campo in CAMPOS_INDICE_CATEGORIA) and
+                all(campo in bitmaps for campo in CAMPOS_INDICE_BITMAP)):
+            for c in colheitas:
+                self._indexar_categorias(c)
+            return
+        
+        for campo, indice in self._indices_categoria.items():
+            ids = arrays[f'categoria_{campo}_ids']
+            inicio = 0
+            for chave, quantidade in categorias[campo]:
+                indice[chave] = set(ids[inicio:inicio + quantidade])
+                inicio += quantidade
+        
+        for campo, indice in self._indices_bitmap.items():
+            esparsos = arrays[f'bitmap_{campo}_esparsos']
+            densos = arrays[f'bitmap_{campo}_densos']
+            for valor, blocos in bitmaps[campo]:
+                indice[valor] = BitmapRoaring.desserializar(blocos, esparsos, densos)
+    
+    def _restaurar_estado(self, dados: dict) -> list:
+        """
+        Monta colheitas, índices, alterações e sketches a partir do
+        conteúdo lido do snapshot
+        
+        Args:
+            dados (dict): Retorno de ler_arquivo_snapshot
+            
+        Returns:
+            list: Colheitas restauradas
+        """
+        # Montar registros a partir das colunas (zip de colunas inteiras)
+        nomes = list(dados['colunas'])
+        colunas = dados['colunas'].values()
+        if tuple(nomes) == CAMPOS_COLHEITA:
+            colheitas = [Colheita(*valores) for valores in zip(*colunas)]
+        else:
+            # Snapshot com outras colunas (ex: anterior a data_ordinal)
+            colheitas = [Colheita(**dict(zip(nomes, valores))) for valores in zip(*colunas)]
+        self._definir_registros(colheitas)
+        self.proximo_id = dados['metadados'].get('proximo_id', 1)
+        self.sequencia = dados['metadados'].get('sequencia', 0)
+        
+        # Snapshots anteriores à coluna data_ordinal
+        if 'data_ordinal' not in dados['colunas']:
+            for c in colheitas:
+                c.data_ordinal = converter_data_ordinal(c.data_colheita)
+        
+        # Reconstruir índices
+        self._indice_id = {c.id: c for c in colheitas}
+        arrays = dados['arrays']
+        
+        # Ordem dos índices gravada no snapshot evita reordenar
+        for campo in CAMPOS_INDICE_ORDENADO:
+            ids_ordem = arrays.get(f'indice_{campo}_ids')
+            if ids_ordem is not None and len(ids_ordem) == len(colheitas):
+                chaves = map(attrgetter(campo), map(self._indice_id.__getitem__, ids_ordem))
+                indice = IndiceOrdenado.de_ordenados(list(zip(chaves, ids_ordem)))
+            else:
+                indice = IndiceOrdenado((getattr(c, campo), c.id) for c in colheitas)
+            self._indices_ordenados[campo] = indice
+        
+        self._restaurar_indices_categoria(dados['metadados'], arrays, colheitas)
+        
+        self._alteracoes = OrderedDict(zip(arrays.get('alteracoes_ids', ()),
+                                           arrays.get('alteracoes_seq', ())))
+        self._remocoes = OrderedDict(zip(arrays.get('remocoes_ids', ()),
+                                         arrays.get('remocoes_seq', ())))
+        
+        # Sketches gravados no snapshot; snapshots antigos refazem a partir das colheitas
+        self._sketches_desatualizados = set()
+        if 'sketches' in dados['metadados']:
+            self._sketches = {(grupo, valor): SketchKLL.de_dict(estado)
+                              for grupo, valor, estado in dados['metadados']['sketches']}
+        else:
+            self._reconstruir_sketches()
+        
+        return colheitas
+    
+    def carregar_snapshot(self, caminho: str = None, usar_mmap: bool = None) -> tuple:
+        """
+        Restaura o estado do gerenciador a partir de um snapshot binário
+        (substitui as colheitas atuais e avisa os observadores com
+        ao_recarregar; recusa se algum observador não o implementa)
+        
+        Args:
+            caminho (str, optional): Caminho do arquivo. Usa o padrão se None.
+            usar_mmap (bool, optional): Ler via mmap. Usa o padrão se None.
+            
+        Returns:
+            tuple: (sucesso: bool, total: int, mensagem: str)
+        """
+        if caminho is None:
+            caminho = CONFIG_PERSISTENCIA['arquivo_snapshot']
+        if usar_mmap is None:
+            usar_mmap = CONFIG_PERSISTENCIA['usar_mmap']
+        
+        # Observador sem ao_recarregar ficaria com o estado das colheitas antigas
+        sem_recarga = [type(o).__name__ for o in self._observadores
+                       if not hasattr(o, 'ao_recarregar')]
+        if sem_recarga:
+            return (False, 0, f"❌ Snapshot não carregado: observador(es) sem "
+                              f"ao_recarregar registrado(s): {', '.join(sem_recarga)}")
+        
+        sucesso, dados, mensagem = ler_arquivo_snapshot(caminho, usar_mmap)
+        
+        if not sucesso:
+            return (False, 0, mensagem)
+        
+        # Milhões de objetos novos e sem ciclos: as coletas automáticas só
+        # percorreriam o heap inteiro várias vezes durante a montagem
+        with _coleta_pausada():
+            colheitas = self._restaurar_estado(dados)
+        
+        # Cubos e demais observadores refazem o estado com as colheitas novas
+        self._notificar('ao_recarregar', colheitas)
+        
+        return (True, len(colheitas), f"✅ {len(colheitas)} colheita(s) restaurada(s)!")
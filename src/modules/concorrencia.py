@@ -0,0 +1,286 @@
+"""
+CanaOptimizer - Acesso Concorrente
+Gerenciador de colheitas seguro para várias threads (ex: uma thread
+recebendo telemetria enquanto outras geram relatórios)
+Demonstra: THREADS, TRAVA DE LEITURA/ESCRITA e VARIÁVEIS DE CONDIÇÃO
+
+    manager = ColheitaManagerConcorrente()
+    # thread de ingestão
+    manager.adicionar_em_lote(leituras)
+    # threads de relatório (leem ao mesmo tempo)
+    manager.obter_estatisticas()
+    with manager.leitura():
+        Consulta(manager).igual('fazenda', 'Santa Rita').executar()
+
+Leituras compartilham a trava; alterações são exclusivas. Quando há
+escritor esperando, novos leitores aguardam (preferência ao escritor),
+então a ingestão avança mesmo com relatórios contínuos.
+
+As colheitas de um lote são montadas (cálculos, validação) fora da
+trava; só a numeração e o armazenamento acontecem sob uma única
+aquisição de escrita, o que deixa os IDs consecutivos e sem disputa.
+
+A trava é reentrante na mesma thread (leitura dentro de leitura,
+leitura ou escrita dentro de escrita); pedir escrita segurando só
+leitura levanta RuntimeError em vez de travar para sempre.
+"""
+
+import threading
+from functools import wraps
+from modules.colheita_manager import ColheitaManager
+from modules.visoes import VisaoColheitas
+
+
+class _EstadoThread(threading.local):
+    """Profundidade de leitura/escrita da thread atual na trava"""
+    leituras = 0
+    escritas = 0
+
+
+class TravaLeituraEscrita:
+    """Vários leitores ou um escritor, com preferência ao escritor"""
+
+    def __init__(self):
+        """Cria trava livre"""
+        self._mutex = threading.Lock()
+        self._condicao = threading.Condition(self._mutex)
+        self._leitores = 0
+        self._escrevendo = False
+        self._escritores_esperando = 0
+        self._estado = _EstadoThread()
+        # Contextos sem estado próprio (o estado é por thread): criados uma vez
+        self._contexto_leitura = _Contexto(self.adquirir_leitura, self.liberar_leitura)
+        self._contexto_escrita = _Contexto(self.adquirir_escrita, self.liberar_escrita)
+
+    def adquirir_leitura(self):
+        """Entra como leitor (aguarda escritor ativo ou na fila)"""
+        estado = self._estado
+        if estado.escritas:
+            # Quem escreve já tem acesso exclusivo
+            estado.escritas += 1
+            return
+        if estado.leituras:
+            estado.leituras += 1
+            return
+
+        with self._mutex:
+            while self._escrevendo or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        estado.leituras = 1
+
+    def liberar_leitura(self):
+        """Sai como leitor"""
+        estado = self._estado
+        if estado.escritas:
+            estado.escritas -= 1
+            return
+
+        estado.leituras -= 1
+        if estado.leituras == 0:
+            with self._mutex:
+                self._leitores -= 1
+                if self._leitores == 0 and self._escritores_esperando:
+                    self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        """
+        Entra como escritor (aguarda os leitores atuais saírem)
+
+        Raises:
+            RuntimeError: Thread segura só a leitura (promoção travaria)
+        """
+        estado = self._estado
+        if estado.escritas:
+            estado.escritas += 1
+            return
+        if estado.leituras:
+            raise RuntimeError("Escrita pedida dentro de uma leitura: libere a leitura antes")
+
+        with self._mutex:
+            self._escritores_esperando += 1
+            try:
+                while self._escrevendo or self._leitores:
+                    self._condicao.wait()
+            except BaseException:
+                # Desistência (ex: KeyboardInterrupt): libera leitores retidos
+                self._escritores_esperando -= 1
+                self._condicao.notify_all()
+                raise
+            self._escritores_esperando -= 1
+            self._escrevendo = True
+        estado.escritas = 1
+
+    def liberar_escrita(self):
+        """Sai como escritor"""
+        estado = self._estado
+        estado.escritas -= 1
+        if estado.escritas == 0:
+            with self._mutex:
+                self._escrevendo = False
+                self._condicao.notify_all()
+
+    def leitura(self) -> '_Contexto':
+        """
+        Contexto de leitura (with trava.leitura(): ...)
+
+        Returns:
+            _Contexto: Adquire na entrada e libera na saída
+        """
+        return self._contexto_leitura
+
+    def escrita(self) -> '_Contexto':
+        """
+        Contexto de escrita (with trava.escrita(): ...)
+
+        Returns:
+            _Contexto: Adquire na entrada e libera na saída
+        """
+        return self._contexto_escrita
+
+
+class _Contexto:
+    """Gerenciador de contexto para um par adquirir/liberar"""
+
+    __slots__ = ('_adquirir', '_liberar')
+
+    def __init__(self, adquirir, liberar):
+        """
+        Args:
+            adquirir (function): Chamada na entrada do with
+            liberar (function): Chamada na saída (mesmo com exceção)
+        """
+        self._adquirir = adquirir
+        self._liberar = liberar
+
+    def __enter__(self):
+        """Adquire a trava"""
+        self._adquirir()
+        return self
+
+    def __exit__(self, *excecao):
+        """Libera a trava (exceções seguem adiante)"""
+        self._liberar()
+        return False
+
+
+# Métodos públicos do ColheitaManager protegidos pela trava
+METODOS_LEITURA = (
+    '__len__', 'buscar_por_id', 'contar_combinacao', 'listar_maiores_perdas',
+    'listar_menores_perdas', 'obter_alteracoes_desde', 'obter_quantis_perda',
+    'obter_estatisticas', 'agregar', 'obter_ranking_fazendas',
+    'obter_totalizacao_por_tipo_cana', 'exportar_para_lista_simples', 'fixar_versao'
+)
+
+METODOS_ESCRITA = (
+    '_inserir_novas', 'atualizar_colheita', 'remover_colheita', 'remover_em_lote',
+    'restaurar_registro', 'descartar_remocoes_ate', 'registrar_observador',
+    'remover_observador', 'registrar_cubo', 'carregar_snapshot'
+)
+
+# Leituras que podem refazer caches (sketches): leitura + trava dos caches
+METODOS_CACHE = ('obter_sketch_perdas', 'salvar_snapshot')
+
+
+def _envolver(metodo, modo: str):
+    """
+    Envolve método do ColheitaManager com a trava do modo
+
+    Args:
+        metodo (function): Método original
+        modo (str): 'leitura', 'escrita' ou 'cache'
+
+    Returns:
+        function: Método que adquire a trava antes de executar
+    """
+    if modo == 'cache':
+        @wraps(metodo)
+        def envolvido(self, *args, **kwargs):
+            with self._trava.leitura(), self._trava_caches:
+                return metodo(self, *args, **kwargs)
+    else:
+        @wraps(metodo)
+        def envolvido(self, *args, **kwargs):
+            with getattr(self._trava, modo)():
+                return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+class ColheitaManagerConcorrente(ColheitaManager):
+    """ColheitaManager com trava de leitura/escrita em cada operação"""
+
+    def __init__(self, trava=None):
+        """
+        Cria gerenciador vazio
+
+        Args:
+            trava (optional): Objeto com leitura() e escrita(). Usa
+                              TravaLeituraEscrita se None.
+        """
+        super().__init__()
+        self._trava = trava if trava is not None else TravaLeituraEscrita()
+        # Sketches desatualizados são refeitos na leitura: um leitor por vez
+        self._trava_caches = threading.RLock()
+
+    def leitura(self):
+        """Contexto de leitura compartilhada"""
+        return self._trava.leitura()
+
+    def escrita(self):
+        """Contexto de escrita exclusiva (várias alterações, uma aquisição)"""
+        return self._trava.escrita()
+
+    @property
+    def colheitas(self) -> list:
+        """
+        Cópia das colheitas válidas (a lista interna muda com a ingestão)
+
+        Returns:
+            list: Colheitas
+        """
+        with self._trava.leitura():
+            return list(self._ativas())
+
+    def _criar_visao(self, gerar, contar, descricao: str) -> VisaoColheitas:
+        """
+        Visão cujas páginas são lidas sob a trava de leitura (cada página
+        vira lista antes de a trava ser liberada)
+
+        Args:
+            gerar (function): (offset, limite) -> iterador de colheitas
+            contar (function): () -> quantidade
+            descricao (str): Texto para depuração
+
+        Returns:
+            VisaoColheitas: Visão segura para iterar durante a ingestão
+        """
+        def gerar_travado(offset, limite):
+            with self._trava.leitura():
+                return iter(list(gerar(offset, limite)))
+
+        def contar_travado():
+            with self._trava.leitura():
+                return contar()
+
+        return VisaoColheitas(gerar_travado, contar_travado, descricao)
+
+    def iterar_linhas_exportacao(self):
+        """
+        Linhas de exportação lidas de uma vez sob a trava de leitura
+        (um gerador não pode segurar a trava entre um next() e outro)
+
+        Returns:
+            iterator: Cabeçalho e uma lista de valores por colheita
+        """
+        with self._trava.leitura():
+            linhas = list(super().iterar_linhas_exportacao())
+        return iter(linhas)
+
+
+for _modo, _nomes in (('leitura', METODOS_LEITURA), ('escrita', METODOS_ESCRITA),
+                      ('cache', METODOS_CACHE)):
+    for _nome in _nomes:
+        setattr(ColheitaManagerConcorrente, _nome,
+                _envolver(getattr(ColheitaManager, _nome), _modo))
+
+del _modo, _nomes, _nome
@@ -0,0 +1,380 @@
+"""
+CanaOptimizer - Consultas Combinadas
+Filtros encadeados (fazenda + classificação + período + perda) que
+usam os índices do manager em vez de percorrer todas as colheitas
+Demonstra: CONJUNTOS e BITMAPS (interseção de IDs) e PLANO DE EXECUÇÃO
+
+    consulta = (Consulta(manager)
+                .igual('fazenda', 'Santa Rita')
+                .igual('classificacao', 'Crítica')
+                .entre('data_colheita', '01/06/2024', '30/06/2024')
+                .entre('percentual_perda', minimo=10))
+    colheitas = consulta.executar()
+    print(consulta.explicar())
+
+O planejamento estima quantos registros cada índice devolve e começa
+pelo mais seletivo. Conjuntos de categoria, bitmaps e IDs já existem
+prontos, então sempre entram na interseção (os bitmaps entre si com AND
+bit a bit); faixas de índice ordenado só entram se forem menores que os
+candidatos atuais (montá-las custaria mais que testar os candidatos).
+O que sobra vira filtro sobre os candidatos.
+"""
+
+from operator import attrgetter
+from modules.colheita_manager import converter_data_ordinal, normalizar_categoria
+from modules.bitmaps import BitmapRoaring
+
+
+class Consulta:
+    """Filtros combinados sobre as colheitas de um ColheitaManager"""
+
+    def __init__(self, manager):
+        """
+        Cria consulta sem filtros (todas as colheitas)
+
+        Args:
+            manager (ColheitaManager): Gerenciador consultado
+        """
+        self._manager = manager
+        self._predicados = []
+
+    # === FILTROS (encadeáveis) ===
+
+    def igual(self, campo: str, valor) -> 'Consulta':
+        """
+        Campo igual ao valor (fazenda sem diferenciar maiúsculas)
+
+        Args:
+            campo (str): Campo da colheita
+            valor: Valor procurado
+
+        Returns:
+            Consulta: A própria consulta
+        """
+        return self.em(campo, (valor,))
+
+    def em(self, campo: str, valores) -> 'Consulta':
+        """
+        Campo igual a qualquer um dos valores
+
+        Args:
+            campo (str): Campo da colheita
+            valores (iterable): Valores aceitos
+
+        Returns:
+            Consulta: A própria consulta
+        """
+        valores = tuple(valores)
+        aceitos = {normalizar_categoria(campo, v) for v in valores}
+        ler = attrgetter(campo)
+        descricao = (f"{campo} = {valores[0]!r}" if len(valores) == 1
+                     else f"{campo} em {list(valores)!r}")
+
+        self._predicados.append({
+            'campo': campo,
+            'operador': 'em',
+            'valor': aceitos,
+            'descricao': descricao,
+            'teste': lambda c: normalizar_categoria(campo, ler(c)) in aceitos
+        })
+        return self
+
+    def entre(self, campo: str, minimo=None, maximo=None) -> 'Consulta':
+        """
+        Campo entre minimo e maximo (inclusive); None = sem limite
+
+        'data_colheita' aceita datas 'DD/MM/YYYY', date ou ordinal e é
+        comparada pelo ordinal (data_ordinal).
+
+        Args:
+            campo (str): Campo numérico ou 'data_colheita'
+            minimo (optional): Menor valor aceito
+            maximo (optional): Maior valor aceito
+
+        Returns:
+            Consulta: A própria consulta
+        """
+        descricao = f"{campo} entre {'-∞' if minimo is None else minimo} e {'+∞' if maximo is None else maximo}"
+
+        if campo == 'data_colheita':
+            campo = 'data_ordinal'
+            minimo = converter_data_ordinal(minimo) if minimo is not None else None
+            maximo = converter_data_ordinal(maximo) if maximo is not None else None
+
+        ler = attrgetter(campo)
+
+        def teste(c):
+            valor = ler(c)
+            return (minimo is None or valor >= minimo) and (maximo is None or valor <= maximo)
+
+        self._predicados.append({
+            'campo': campo,
+            'operador': 'entre',
+            'valor': (minimo, maximo),
+            'descricao': descricao,
+            'teste': teste
+        })
+        return self
+
+    def onde(self, funcao, descricao: str = 'função') -> 'Consulta':
+        """
+        Filtro livre (nunca usa índice)
+
+        Args:
+            funcao (function): colheita -> bool
+            descricao (str): Texto mostrado em explicar()
+
+        Returns:
+            Consulta: A própria consulta
+        """
+        self._predicados.append({
+            'campo': None,
+            'operador': 'funcao',
+            'valor': None,
+            'descricao': descricao,
+            'teste': funcao
+        })
+        return self
+
+    # === PLANEJAMENTO ===
+
+    def _fonte_indice(self, predicado: dict) -> tuple:
+        """
+        Índice capaz de responder o predicado
+
+        Args:
+            predicado (dict): Predicado da consulta
+
+        Returns:
+            tuple: (nome do índice, estimativa, pronto: bool, gerar: function) ou
+                   None se nenhum índice atende. pronto indica conjunto já
+                   existente (interseção barata); gerar() devolve os IDs
+                   (set ou BitmapRoaring).
+        """
+        manager = self._manager
+        campo, operador, valor = predicado['campo'], predicado['operador'], predicado['valor']
+
+        if operador == 'em' and campo == 'id':
+            ids = {i for i in valor if i in manager._indice_id}
+            return ('id', len(ids), True, lambda: ids)
+
+        if operador == 'em' and campo in manager._indices_categoria:
+            indice = manager._indices_categoria[campo]
+            conjuntos = [indice[v] for v in valor if v in indice]
+
+            def gerar():
+                if len(conjuntos) == 1:
+                    return conjuntos[0]
+                return set().union(*conjuntos)
+
+            # Vários valores exigem montar a união: deixa de ser conjunto pronto
+            return (f'categoria:{campo}', sum(len(ids) for ids in conjuntos),
+                    len(conjuntos) <= 1, gerar)
+
+        if operador == 'em' and campo in manager._indices_bitmap:
+            indice = manager._indices_bitmap[campo]
+            bitmaps = [indice[v] for v in valor if v in indice]
+
+            def gerar():
+                if len(bitmaps) == 1:
+                    return bitmaps[0]
+                return BitmapRoaring.uniao(*bitmaps)
+
+            # União de bitmaps é OR bit a bit: continua barata
+            return (f'bitmap:{campo}', sum(len(b) for b in bitmaps), True, gerar)
+
+        if operador == 'entre' and campo in manager._indices_ordenados:
+            indice = manager._indices_ordenados[campo]
+            minimo, maximo = valor
+            return (f'ordenado:{campo}', indice.contar(minimo, maximo), False,
+                    lambda: set(indice.intervalo(minimo, maximo)))
+
+        return None
+
+    def _planejar(self) -> list:
+        """
+        Monta o plano: índice mais seletivo, interseções e filtros restantes
+
+        Returns:
+            list: Passos (dict com operacao, indice, descricao, estimativa, predicado, gerar)
+        """
+        fontes = []
+        filtros = []
+
+        for predicado in self._predicados:
+            fonte = self._fonte_indice(predicado)
+            if fonte is None:
+                filtros.append(predicado)
+            else:
+                fontes.append((fonte, predicado))
+
+        if not fontes:
+            passos = [{'operacao': 'varredura', 'indice': None, 'descricao': 'todas as colheitas',
+                       'estimativa': len(self._manager)}]
+            return passos + [{'operacao': 'filtro', 'indice': None, 'descricao': p['descricao'],
+                              'estimativa': None, 'predicado': p} for p in filtros]
+
+        # Mais seletivo primeiro
+        fontes.sort(key=lambda item: item[0][1])
+        passos = []
+        candidatos = None
+
+        for (nome, estimativa, pronto, gerar), predicado in fontes:
+            if candidatos is None:
+                operacao = 'indice'
+            elif pronto or estimativa < candidatos:
+                operacao = 'intersecao'
+            else:
+                # Faixa grande: testar os candidatos sai mais barato que montá-la
+                filtros.append(predicado)
+                continue
+
+            candidatos = estimativa if candidatos is None else min(candidatos, estimativa)
+            passos.append({'operacao': operacao, 'indice': nome, 'descricao': predicado['descricao'],
+                           'estimativa': estimativa, 'predicado': predicado, 'gerar': gerar})
+
+        return passos + [{'operacao': 'filtro', 'indice': None, 'descricao': p['descricao'],
+                          'estimativa': None, 'predicado': p} for p in filtros]
+
+    def explicar(self) -> str:
+        """
+        Plano escolhido para a consulta, em texto
+
+        Returns:
+            str: Um passo por linha com índice usado e registros estimados
+        """
+        rotulos = {'indice': 'ÍNDICE', 'intersecao': 'INTERSEÇÃO',
+                   'filtro': 'FILTRO', 'varredura': 'VARREDURA'}
+        linhas = ["PLANO DA CONSULTA"]
+
+        with self._manager.leitura():
+            plano = self._planejar()
+
+        for numero, passo in enumerate(plano, 1):
+            linha = f"  {numero}. {rotulos[passo['operacao']]:<11} {passo['descricao']}"
+            if passo['indice']:
+                linha += f" [{passo['indice']}]"
+            if passo['estimativa'] is not None:
+                linha += f" (~{passo['estimativa']} registro(s))"
+            linhas.append(linha)
+
+        return "\n".join(linhas)
+
+    # === EXECUÇÃO ===
+
+    def _executar_plano(self) -> tuple:
+        """
+        Aplica os passos de índice do plano
+
+        Returns:
+            tuple: (ids: set ou None, bitmaps: list, testes restantes: list).
+                   ids None e bitmaps vazio = todas as colheitas.
+        """
+        ids = None
+        bitmaps = []
+        testes = []
+
+        for passo in self._planejar():
+            if passo['operacao'] in ('indice', 'intersecao'):
+                conjunto = passo['gerar']()
+                if not conjunto:
+                    return (set(), [], [])
+                if isinstance(conjunto, BitmapRoaring):
+                    bitmaps.append(conjunto)
+                else:
+                    # Conjuntos do índice nunca são alterados aqui: '&' cria um novo
+                    ids = conjunto if ids is None else ids & conjunto
+                    if not ids:
+                        return (set(), [], [])
+            elif passo['operacao'] == 'filtro':
+                testes.append(passo['predicado']['teste'])
+
+        return (ids, bitmaps, testes)
+
+    def _ids_candidatos(self, ids: set, bitmaps: list):
+        """
+        Cruza conjuntos e bitmaps em IDs ordenados
+
+        Args:
+            ids (set): IDs dos conjuntos (None = sem restrição)
+            bitmaps (list): Bitmaps a cruzar
+
+        Returns:
+            iterable: IDs em ordem crescente (None = todas as colheitas)
+        """
+        if not bitmaps:
+            return None if ids is None else sorted(ids)
+
+        if ids is not None and len(ids) <= min(len(b) for b in bitmaps):
+            # Poucos candidatos: testar cada um nos bitmaps
+            return sorted(i for i in ids if all(i in b for b in bitmaps))
+
+        mapa = bitmaps[0] if len(bitmaps) == 1 else BitmapRoaring.intersecao(*bitmaps)
+        if ids is None:
+            return mapa
+        return [i for i in mapa if i in ids]
+
+    def executar(self) -> list:
+        """
+        Colheitas que atendem todos os filtros, em ordem de ID
+
+        Returns:
+            list: Colheitas
+        """
+        # Índices lidos sob a trava do manager (se for concorrente)
+        with self._manager.leitura():
+            ids, bitmaps, testes = self._executar_plano()
+            return self._filtrar(self._ids_candidatos(ids, bitmaps), testes)
+
+    def _filtrar(self, ids, testes: list) -> list:
+        """
+        Aplica os filtros restantes aos candidatos
+
+        Args:
+            ids (iterable): IDs candidatos em ordem (None = todas as colheitas)
+            testes (list): Funções colheita -> bool
+
+        Returns:
+            list: Colheitas aprovadas, em ordem de ID
+        """
+        if ids is None:
+            candidatas = self._manager._ativas()
+        else:
+            por_id = self._manager._indice_id
+            candidatas = [por_id[i] for i in ids]
+
+        if not testes:
+            return list(candidatas)
+
+        return [c for c in candidatas if all(teste(c) for teste in testes)]
+
+    def contar(self) -> int:
+        """
+        Quantidade de colheitas que atendem os filtros (sem montar a lista
+        quando só há passos de índice; só bitmaps = popcount do AND)
+
+        Returns:
+            int: Quantidade
+        """
+        with self._manager.leitura():
+            return self._contar()
+
+    def _contar(self) -> int:
+        """
+        Contagem sem trava (chamada por contar())
+
+        Returns:
+            int: Quantidade
+        """
+        ids, bitmaps, testes = self._executar_plano()
+
+        if not testes:
+            if ids is None:
+                if bitmaps:
+                    return BitmapRoaring.contar_intersecao(*bitmaps)
+                return len(self._manager)
+            if not bitmaps:
+                return len(ids)
+            return sum(1 for _ in self._ids_candidatos(ids, bitmaps))
+
+        return len(self._filtrar(self._ids_candidatos(ids, bitmaps), testes))
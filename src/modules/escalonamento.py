@@ -0,0 +1,275 @@
+"""
+CanaOptimizer - Escalonamento da Frota de Colheita
+Distribui talhões entre colheitadeiras minimizando o tempo total da
+safra (makespan), a partir do tempo estimado por calcular_tempo_colheita
+Demonstra: ALGORITMOS GULOSOS (heap) e BUSCA LOCAL
+
+Cada máquina colhe a uma taxa fixa em ha/h, então o tempo de um talhão é
+área / taxa (máquinas uniformes). A solução inicial é LPT: talhões do
+maior para o menor, cada um na máquina que termina primeiro com ele. Em
+seguida, a busca local move ou troca talhões da máquina crítica.
+"""
+
+import heapq
+import time
+from bisect import bisect_left, bisect_right, insort
+from config import LARGURA_CORTE_PADRAO
+from modules.validations import validar_numero_positivo
+
+
+def calcular_taxa_colheita(velocidade_kmh: float, largura_corte_metros: float) -> float:
+    """
+    Calcula a taxa de colheita em hectares por hora
+
+    Mesma conta de calcular_tempo_colheita, sem arredondar:
+    tempo = área * 10 / (largura * velocidade).
+
+    Args:
+        velocidade_kmh (float): Velocidade média da máquina
+        largura_corte_metros (float): Largura de corte
+
+    Returns:
+        float: Hectares por hora
+    """
+    return velocidade_kmh * largura_corte_metros / 10
+
+
+def _preparar_maquinas(maquinas: list) -> list:
+    """
+    Normaliza máquinas com largura de corte e taxa
+
+    Args:
+        maquinas (list): Dicionários com 'id', 'marca', 'velocidade_kmh'
+                         e, opcionalmente, 'largura_corte_metros'
+
+    Returns:
+        list: Dicionários com 'id', 'marca', 'largura', 'velocidade' e 'taxa'
+    """
+    preparadas = []
+
+    for i, maquina in enumerate(maquinas):
+        marca = maquina.get('marca', 'Outra')
+        largura = maquina.get('largura_corte_metros') or LARGURA_CORTE_PADRAO
+        velocidade = maquina['velocidade_kmh']
+        taxa = calcular_taxa_colheita(velocidade, largura)
+
+        if taxa <= 0:
+            raise ValueError(f"Máquina {maquina.get('id', i)} com velocidade/largura inválida")
+
+        preparadas.append({'id': maquina.get('id', i), 'marca': marca, 'largura': largura,
+                           'velocidade': velocidade, 'taxa': taxa})
+
+    return preparadas
+
+
+def _escalonar_lpt(areas: list, taxas: list) -> tuple:
+    """
+    Lista gulosa LPT para máquinas uniformes
+
+    As máquinas são agrupadas por taxa; em cada grupo, um heap guarda a
+    carga atual, então só a máquina menos carregada de cada grupo precisa
+    ser avaliada para cada talhão.
+
+    Args:
+        areas (list): Área de cada talhão
+        taxas (list): Taxa (ha/h) de cada máquina
+
+    Returns:
+        tuple: (atribuicao: list talhão -> máquina, cargas: list horas por máquina)
+    """
+    grupos = {}
+    for indice, taxa in enumerate(taxas):
+        grupos.setdefault(taxa, []).append((0.0, indice))
+    grupos = [(taxa, heap) for taxa, heap in grupos.items()]
+    for _, heap in grupos:
+        heapq.heapify(heap)
+
+    atribuicao = [0] * len(areas)
+    cargas = [0.0] * len(taxas)
+
+    for talhao in sorted(range(len(areas)), key=areas.__getitem__, reverse=True):
+        area = areas[talhao]
+        melhor_fim = None
+        melhor_heap = None
+
+        for taxa, heap in grupos:
+            fim = heap[0][0] + area / taxa
+            if melhor_fim is None or fim < melhor_fim:
+                melhor_fim = fim
+                melhor_heap = heap
+
+        _, maquina = melhor_heap[0]
+        heapq.heapreplace(melhor_heap, (melhor_fim, maquina))
+        atribuicao[talhao] = maquina
+        cargas[maquina] = melhor_fim
+
+    return (atribuicao, cargas)
+
+
+def _busca_local(areas: list, taxas: list, atribuicao: list, cargas: list,
+                 max_iteracoes: int, tempo_limite_s: float) -> int:
+    """
+    Refina a solução movendo/trocando talhões da máquina crítica
+    (altera atribuicao e cargas no lugar)
+
+    Só aceita mudanças em que a máquina de destino termina antes do
+    makespan atual, então a lista de cargas ordenada sempre diminui.
+
+    Args:
+        areas (list): Área de cada talhão
+        taxas (list): Taxa de cada máquina
+        atribuicao (list): Talhão -> máquina
+        cargas (list): Horas por máquina
+        max_iteracoes (int): Limite de melhorias
+        tempo_limite_s (float): Limite de tempo em segundos
+
+    Returns:
+        int: Quantidade de melhorias aplicadas
+    """
+    # Áreas ordenadas (com talhão) por máquina, para achar trocas com bisect
+    por_maquina = [[] for _ in taxas]
+    for talhao, maquina in enumerate(atribuicao):
+        por_maquina[maquina].append((areas[talhao], talhao))
+    for lista in por_maquina:
+        lista.sort()
+
+    limite = time.perf_counter() + tempo_limite_s
+    melhorias = 0
+    maquinas = range(len(taxas))
+
+    while melhorias < max_iteracoes and time.perf_counter() < limite:
+        critica = max(maquinas, key=cargas.__getitem__)
+        makespan = cargas[critica]
+        taxa_critica = taxas[critica]
+        aplicou = False
+
+        # 1) Mover um talhão da crítica para a máquina que termina antes com ele
+        for area, talhao in reversed(por_maquina[critica]):
+            destino = min(maquinas, key=lambda k: cargas[k] + area / taxas[k] if k != critica
+                          else float('inf'))
+            if cargas[destino] + area / taxas[destino] < makespan - 1e-9:
+                por_maquina[critica].remove((area, talhao))
+                insort(por_maquina[destino], (area, talhao))
+                cargas[critica] -= area / taxa_critica
+                cargas[destino] += area / taxas[destino]
+                atribuicao[talhao] = destino
+                aplicou = True
+                break
+
+        # 2) Trocar um talhão da crítica por um menor de outra máquina
+        if not aplicou:
+            for area, talhao in reversed(por_maquina[critica]):
+                for destino in maquinas:
+                    if destino == critica:
+                        continue
+                    folga = (makespan - cargas[destino]) * taxas[destino]
+                    # Menor área aceita: a de destino não pode passar do makespan
+                    lista = por_maquina[destino]
+                    inicio = bisect_right(lista, (area - folga, float('inf')))
+                    fim = bisect_left(lista, (area, -1))
+                    if inicio < fim:
+                        area_troca, talhao_troca = lista[fim - 1]
+                        del lista[fim - 1]
+                        por_maquina[critica].remove((area, talhao))
+                        insort(lista, (area, talhao))
+                        insort(por_maquina[critica], (area_troca, talhao_troca))
+                        cargas[critica] += (area_troca - area) / taxa_critica
+                        cargas[destino] += (area - area_troca) / taxas[destino]
+                        atribuicao[talhao] = destino
+                        atribuicao[talhao_troca] = critica
+                        aplicou = True
+                        break
+                if aplicou:
+                    break
+
+        if not aplicou:
+            break
+
+        melhorias += 1
+
+    return melhorias
+
+
+def escalonar_frota(talhoes: list, maquinas: list, horas_por_dia: float = None,
+                    max_iteracoes: int = 10000, tempo_limite_s: float = 2.0) -> tuple:
+    """
+    Atribui talhões às colheitadeiras minimizando o makespan
+
+    Args:
+        talhoes (list): Dicionários com 'id' e 'area_hectares'
+        maquinas (list): Dicionários com 'id', 'marca', 'velocidade_kmh' e,
+                         opcionalmente, 'largura_corte_metros' (senão usa
+                         LARGURA_CORTE_PADRAO)
+        horas_por_dia (float, optional): Jornada diária para converter em dias
+        max_iteracoes (int): Limite de melhorias da busca local
+        tempo_limite_s (float): Tempo máximo da busca local
+
+    Returns:
+        tuple: (sucesso: bool, plano: dict, mensagem: str)
+               plano = {'makespan_horas', 'limite_inferior_horas',
+                        'gap_percentual', 'melhorias_busca_local',
+                        'maquinas': [{'id', 'marca', 'taxa_ha_hora',
+                                      'horas', 'area_total', 'talhoes'}]}
+    """
+    try:
+        if not talhoes or not maquinas:
+            return (False, {}, "❌ Informe ao menos um talhão e uma máquina!")
+
+        areas = []
+        for i, talhao in enumerate(talhoes):
+            valido, area, mensagem = validar_numero_positivo(
+                talhao.get('area_hectares', ''), f"Área do talhão {talhao.get('id', i)}")
+            if not valido:
+                return (False, {}, mensagem)
+            areas.append(area)
+
+        frota = _preparar_maquinas(maquinas)
+        taxas = [m['taxa'] for m in frota]
+
+        atribuicao, cargas = _escalonar_lpt(areas, taxas)
+        melhorias = _busca_local(areas, taxas, atribuicao, cargas, max_iteracoes, tempo_limite_s)
+
+        # Recalcular cargas da atribuição final (sem erro acumulado das trocas)
+        areas_por_maquina = [0.0] * len(frota)
+        for talhao, maquina in enumerate(atribuicao):
+            areas_por_maquina[maquina] += areas[talhao]
+        cargas = [area / taxa for area, taxa in zip(areas_por_maquina, taxas)]
+
+        # Limite inferior: frota inteira dividindo a área, ou o maior talhão na máquina mais rápida
+        limite_inferior = max(sum(areas) / sum(taxas), max(areas) / max(taxas))
+        makespan = max(cargas)
+
+        resultado_maquinas = [{
+            'id': m['id'],
+            'marca': m['marca'],
+            'taxa_ha_hora': round(m['taxa'], 3),
+            'horas': 0.0,
+            'area_total': 0.0,
+            'talhoes': []
+        } for m in frota]
+
+        for talhao, maquina in enumerate(atribuicao):
+            resultado_maquinas[maquina]['talhoes'].append(talhoes[talhao].get('id', talhao))
+
+        for maquina, carga, area in zip(resultado_maquinas, cargas, areas_por_maquina):
+            maquina['horas'] = round(carga, 2)
+            maquina['area_total'] = round(area, 2)
+
+        gap = (makespan / limite_inferior - 1) * 100 if limite_inferior > 0 else 0.0
+
+        plano = {
+            'makespan_horas': round(makespan, 2),
+            'limite_inferior_horas': round(limite_inferior, 2),
+            'gap_percentual': round(gap, 2),
+            'melhorias_busca_local': melhorias,
+            'maquinas': resultado_maquinas
+        }
+
+        if horas_por_dia:
+            plano['makespan_dias'] = round(makespan / horas_por_dia, 1)
+
+        return (True, plano, f"✅ {len(talhoes)} talhão(ões) distribuído(s) "
+                             f"entre {len(maquinas)} máquina(s)")
+
+    except Exception as e:
+        return (False, {}, f"❌ Erro no escalonamento: {str(e)}")
@@ -0,0 +1,287 @@
+"""
+CanaOptimizer - Índices Ordenados
+Índice secundário mantido em ordem para consultas por intervalo
+Demonstra: BUSCA BINÁRIA (bisect) em LISTAS ORDENADAS
+
+Cada entrada é o par (chave, id). A chave pode ser um número, uma data
+(ordinal) ou uma tupla (chave composta, ex: (fazenda, data)); o id
+desempata chaves iguais, então achar uma entrada específica também é
+uma busca binária.
+
+As entradas ficam em blocos ordenados de até 2 × CARGA_BLOCO itens, com
+a lista do maior par de cada bloco ao lado. Inserir ou remover desloca
+só um bloco (e não a lista inteira), o que mantém a inclusão rápida
+mesmo com milhões de registros.
+
+    consulta por intervalo: O(log n + k)
+    inserção / remoção:     O(log n + CARGA_BLOCO)
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+
+
+CARGA_BLOCO = 1000
+
+
+class IndiceOrdenado:
+    """Pares (chave, id) ordenados em blocos"""
+
+    def __init__(self, pares=()):
+        """
+        Cria índice, opcionalmente a partir de pares (chave, id) em qualquer ordem
+
+        Args:
+            pares (iterable): Pares (chave, id) iniciais
+        """
+        self._carregar(sorted(pares))
+
+    def _carregar(self, ordenados: list):
+        """
+        Divide pares já ordenados em blocos
+
+        Args:
+            ordenados (list): Pares (chave, id) em ordem crescente
+        """
+        self._blocos = [ordenados[i:i + CARGA_BLOCO]
+                        for i in range(0, len(ordenados), CARGA_BLOCO)]
+        self._maximos = [bloco[-1] for bloco in self._blocos]
+        self._tamanho = len(ordenados)
+
+    @classmethod
+    def de_ordenados(cls, pares: list) -> 'IndiceOrdenado':
+        """
+        Cria índice a partir de pares já ordenados (ex: lidos de um snapshot),
+        sem reordenar
+
+        Args:
+            pares (list): Pares (chave, id) em ordem crescente
+
+        Returns:
+            IndiceOrdenado: Índice pronto
+        """
+        indice = cls()
+        indice._carregar(pares)
+        return indice
+
+    def __len__(self) -> int:
+        """Quantidade de entradas"""
+        return self._tamanho
+
+    def inserir(self, chave, id_registro: int):
+        """
+        Inclui entrada mantendo a ordem
+
+        Args:
+            chave: Valor indexado
+            id_registro (int): ID do registro
+        """
+        entrada = (chave, id_registro)
+
+        if not self._blocos:
+            self._blocos.append([entrada])
+            self._maximos.append(entrada)
+            self._tamanho = 1
+            return
+
+        posicao = bisect_left(self._maximos, entrada)
+        if posicao == len(self._blocos):
+            posicao -= 1  # Maior que tudo: vai para o fim do último bloco
+
+        bloco = self._blocos[posicao]
+        insort(bloco, entrada)
+        self._maximos[posicao] = bloco[-1]
+        self._tamanho += 1
+
+        # Bloco cheio: dividir ao meio
+        if len(bloco) > 2 * CARGA_BLOCO:
+            metade = bloco[CARGA_BLOCO:]
+            del bloco[CARGA_BLOCO:]
+            self._blocos.insert(posicao + 1, metade)
+            self._maximos[posicao] = bloco[-1]
+            self._maximos.insert(posicao + 1, metade[-1])
+
+    def remover(self, chave, id_registro: int) -> bool:
+        """
+        Remove entrada
+
+        Args:
+            chave: Valor indexado (o mesmo usado na inclusão)
+            id_registro (int): ID do registro
+
+        Returns:
+            bool: True se a entrada existia
+        """
+        entrada = (chave, id_registro)
+        posicao = bisect_left(self._maximos, entrada)
+
+        if posicao == len(self._blocos):
+            return False
+
+        bloco = self._blocos[posicao]
+        indice = bisect_left(bloco, entrada)
+        if indice == len(bloco) or bloco[indice] != entrada:
+            return False
+
+        del bloco[indice]
+        self._tamanho -= 1
+
+        if bloco:
+            self._maximos[posicao] = bloco[-1]
+        else:
+            del self._blocos[posicao]
+            del self._maximos[posicao]
+
+        return True
+
+    def _trechos(self, minimo, maximo) -> list:
+        """
+        Trechos (bloco, início, fim) com chave entre minimo e maximo (inclusive)
+
+        Args:
+            minimo: Menor chave (None = sem limite)
+            maximo: Maior chave (None = sem limite)
+
+        Returns:
+            list: Tuplas (bloco, início, fim) em ordem crescente
+        """
+        # (chave,) ordena antes de qualquer (chave, id); (chave, inf) depois
+        inferior = None if minimo is None else (minimo,)
+        superior = None if maximo is None else (maximo, float('inf'))
+
+        primeiro = 0 if inferior is None else bisect_left(self._maximos, inferior)
+        ultimo = (len(self._blocos) - 1 if superior is None
+                  else min(bisect_left(self._maximos, superior), len(self._blocos) - 1))
+
+        trechos = []
+        for bloco in self._blocos[primeiro:ultimo + 1]:
+            inicio = 0 if inferior is None else bisect_left(bloco, inferior)
+            fim = len(bloco) if superior is None else bisect_right(bloco, superior)
+            if inicio < fim:
+                trechos.append((bloco, inicio, fim))
+
+        return trechos
+
+    def _percorrer(self, minimo, maximo, decrescente: bool = False):
+        """
+        Gera entradas com chave entre minimo e maximo (inclusive)
+
+        Args:
+            minimo: Menor chave (None = sem limite)
+            maximo: Maior chave (None = sem limite)
+            decrescente (bool): Da maior para a menor chave
+
+        Yields:
+            tuple: Pares (chave, id)
+        """
+        trechos = self._trechos(minimo, maximo)
+
+        if decrescente:
+            for bloco, inicio, fim in reversed(trechos):
+                yield from reversed(bloco[inicio:fim])
+        else:
+            for bloco, inicio, fim in trechos:
+                yield from bloco[inicio:fim]
+
+    def intervalo(self, minimo=None, maximo=None, decrescente: bool = False) -> list:
+        """
+        IDs com chave entre minimo e maximo (inclusive), em ordem da chave
+
+        Args:
+            minimo (optional): Menor chave. None = sem limite inferior.
+            maximo (optional): Maior chave. None = sem limite superior.
+            decrescente (bool): Ordem da maior para a menor chave
+
+        Returns:
+            list: IDs dos registros
+        """
+        return [id_registro for _, id_registro in self._percorrer(minimo, maximo, decrescente)]
+
+    def iterar(self, minimo=None, maximo=None, offset: int = 0, limite: int = None):
+        """
+        Gera IDs do intervalo em ordem da chave, a partir da posição `offset`
+        (trechos antes dela são pulados pelo tamanho) - O(log n + limite)
+
+        Args:
+            minimo (optional): Menor chave. None = sem limite inferior.
+            maximo (optional): Maior chave. None = sem limite superior.
+            offset (int): Entradas do intervalo a pular
+            limite (int, optional): Máximo de IDs gerados. None = até o fim.
+
+        Yields:
+            int: IDs dos registros
+        """
+        restantes = limite
+
+        for bloco, inicio, fim in self._trechos(minimo, maximo):
+            if restantes is not None and restantes <= 0:
+                return
+            if offset >= fim - inicio:
+                offset -= fim - inicio
+                continue
+
+            inicio += offset
+            offset = 0
+            if restantes is not None:
+                fim = min(fim, inicio + restantes)
+                restantes -= fim - inicio
+
+            for _, id_registro in bloco[inicio:fim]:
+                yield id_registro
+
+    def contar(self, minimo=None, maximo=None) -> int:
+        """
+        Quantidade de entradas no intervalo (blocos inteiros contam pelo tamanho)
+
+        Args:
+            minimo (optional): Menor chave (inclusive)
+            maximo (optional): Maior chave (inclusive)
+
+        Returns:
+            int: Quantidade de entradas
+        """
+        return sum(fim - inicio for _, inicio, fim in self._trechos(minimo, maximo))
+
+    def menores(self, quantidade: int) -> list:
+        """
+        IDs das `quantidade` menores chaves (da menor para a maior)
+
+        Args:
+            quantidade (int): Quantidade de IDs
+
+        Returns:
+            list: IDs dos registros
+        """
+        resultado = []
+        for bloco in self._blocos:
+            if len(resultado) >= quantidade:
+                break
+            resultado.extend(id_registro for _, id_registro in bloco[:quantidade - len(resultado)])
+        return resultado
+
+    def maiores(self, quantidade: int) -> list:
+        """
+        IDs das `quantidade` maiores chaves (da maior para a menor)
+
+        Args:
+            quantidade (int): Quantidade de IDs
+
+        Returns:
+            list: IDs dos registros
+        """
+        resultado = []
+        for bloco in reversed(self._blocos):
+            faltam = quantidade - len(resultado)
+            if faltam <= 0:
+                break
+            resultado.extend(id_registro for _, id_registro in reversed(bloco[-faltam:]))
+        return resultado
+
+    def ids_em_ordem(self) -> list:
+        """
+        Todos os IDs em ordem crescente da chave (ex: para gravar no snapshot)
+
+        Returns:
+            list: IDs dos registros
+        """
+        return [id_registro for _, id_registro in chain.from_iterable(self._blocos)]
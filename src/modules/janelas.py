@@ -0,0 +1,194 @@
+"""
+CanaOptimizer - Estatísticas em Janelas Móveis
+Perda dos últimos 7/30 dias por fazenda sem reler as colheitas
+Demonstra: DICIONÁRIOS (baldes diários) e OBSERVADOR do manager
+
+Cada colheita soma seus valores no balde do seu dia (o ordinal da data,
+já gravado na colheita em data_ordinal). Uma janela de N dias é a
+soma de N baldes, então o custo da consulta depende só do tamanho da
+janela. Colheitas registradas com atraso caem no balde do dia delas.
+
+Fazendas são agrupadas como no índice do manager (normalizar_categoria:
+'Fazenda A' e 'fazenda a' são a mesma); o ranking mostra o nome como
+apareceu na primeira colheita.
+"""
+
+from datetime import date
+from modules.colheita import Colheita
+from modules.colheita_manager import converter_data_ordinal, normalizar_categoria
+
+
+TODAS_FAZENDAS = '*'
+
+# Posições no balde: [quantidade, soma_perda, area, toneladas_perdidas, perda_financeira]
+_QUANTIDADE, _SOMA_PERDA, _AREA, _TONELADAS, _FINANCEIRA = range(5)
+
+
+class EstatisticasJanela:
+    """Acumuladores diários por fazenda para janelas móveis"""
+
+    def __init__(self):
+        """Inicializa baldes vazios"""
+        self._baldes = {}  # fazenda normalizada -> {ordinal do dia: balde}
+        self._nomes = {}   # fazenda normalizada -> nome exibido
+
+    # === OBSERVADOR DO MANAGER ===
+
+    def ao_adicionar(self, colheita: Colheita):
+        """Soma colheita no balde do seu dia"""
+        self._acumular(colheita, 1)
+
+    def ao_atualizar(self, colheita: Colheita, anterior: Colheita):
+        """Troca a versão anterior da colheita pela atual"""
+        self._acumular(anterior, -1)
+        self._acumular(colheita, 1)
+
+    def ao_remover(self, colheita: Colheita):
+        """Retira colheita do balde do seu dia"""
+        self._acumular(colheita, -1)
+
+    # === BALDES ===
+
+    def _acumular(self, colheita: Colheita, sinal: int):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1) a colheita nos baldes do dia
+        (da fazenda e do total geral)
+
+        Args:
+            colheita (Colheita): Registro de colheita
+            sinal (int): 1 para incluir, -1 para retirar
+        """
+        dia = colheita.data_ordinal
+        valores = (sinal, sinal * colheita.percentual_perda, sinal * colheita.area_hectares,
+                   sinal * colheita.toneladas_perdidas, sinal * colheita.perda_financeira)
+
+        chave = normalizar_categoria('fazenda', colheita.fazenda)
+        self._nomes.setdefault(chave, colheita.fazenda)
+
+        for fazenda in (chave, TODAS_FAZENDAS):
+            dias = self._baldes.setdefault(fazenda, {})
+            balde = dias.get(dia)
+            if balde is None:
+                balde = dias[dia] = [0, 0.0, 0.0, 0.0, 0.0]
+
+            for i, valor in enumerate(valores):
+                balde[i] += valor
+
+            if balde[_QUANTIDADE] <= 0:
+                del dias[dia]
+
+    # === CONSULTAS ===
+
+    def _resumir(self, soma: list) -> dict:
+        """
+        Monta resultado de uma janela a partir da soma dos baldes
+
+        Args:
+            soma (list): Balde somado
+
+        Returns:
+            dict: quantidade, perda_media, area_total, toneladas_perdidas, perda_financeira
+        """
+        quantidade = soma[_QUANTIDADE]
+        return {
+            'quantidade': quantidade,
+            'perda_media': round(soma[_SOMA_PERDA] / quantidade, 2) if quantidade else 0.0,
+            'area_total': round(soma[_AREA], 2),
+            'toneladas_perdidas': round(soma[_TONELADAS], 2),
+            'perda_financeira': round(soma[_FINANCEIRA], 2)
+        }
+
+    def estatisticas_janela(self, fazenda: str = TODAS_FAZENDAS, dias: int = 7,
+                            data_referencia=None) -> dict:
+        """
+        Estatísticas dos últimos `dias` dias até a data de referência (inclusive)
+        Custo O(dias), independente da quantidade de colheitas
+
+        Args:
+            fazenda (str): Nome da fazenda ('*' para todas)
+            dias (int): Tamanho da janela em dias
+            data_referencia (optional): Último dia da janela ('DD/MM/YYYY',
+                                        date ou ordinal). Hoje se None.
+
+        Returns:
+            dict: quantidade, perda_media, area_total, toneladas_perdidas, perda_financeira
+        """
+        if data_referencia is None:
+            data_referencia = date.today()
+        fim = converter_data_ordinal(data_referencia)
+        baldes = self._baldes.get(normalizar_categoria('fazenda', fazenda), {})
+        soma = [0, 0.0, 0.0, 0.0, 0.0]
+
+        for dia in range(fim - dias + 1, fim + 1):
+            balde = baldes.get(dia)
+            if balde is not None:
+                for i, valor in enumerate(balde):
+                    soma[i] += valor
+
+        return self._resumir(soma)
+
+    def ranking_janela(self, dias: int = 7, data_referencia=None) -> list:
+        """
+        Fazendas com colheitas na janela, da maior para a menor perda média
+
+        Args:
+            dias (int): Tamanho da janela em dias
+            data_referencia (optional): Último dia da janela. Hoje se None.
+
+        Returns:
+            list: Dicionários com 'fazenda' e as estatísticas da janela
+        """
+        ranking = []
+
+        for fazenda in self._baldes:
+            if fazenda == TODAS_FAZENDAS:
+                continue
+            estatisticas = self.estatisticas_janela(fazenda, dias, data_referencia)
+            if estatisticas['quantidade']:
+                ranking.append({'fazenda': self._nomes[fazenda], **estatisticas})
+
+        ranking.sort(key=lambda x: x['perda_media'], reverse=True)
+        return ranking
+
+    def serie_movel(self, fazenda: str = TODAS_FAZENDAS, dias: int = 7,
+                    data_inicio=None, data_fim=None) -> list:
+        """
+        Série diária da janela móvel (soma deslizante: entra o dia novo,
+        sai o dia que deixou a janela)
+
+        Args:
+            fazenda (str): Nome da fazenda ('*' para todas)
+            dias (int): Tamanho da janela em dias
+            data_inicio (optional): Primeiro dia da série. Primeiro dia com dados se None.
+            data_fim (optional): Último dia da série. Hoje se None.
+
+        Returns:
+            list: Dicionários com 'data' (DD/MM/YYYY) e as estatísticas da janela
+        """
+        baldes = self._baldes.get(normalizar_categoria('fazenda', fazenda), {})
+        if not baldes:
+            return []
+
+        inicio = converter_data_ordinal(data_inicio) if data_inicio is not None else min(baldes)
+        fim = converter_data_ordinal(data_fim if data_fim is not None else date.today())
+        soma = [0, 0.0, 0.0, 0.0, 0.0]
+        serie = []
+
+        primeiro = inicio - dias + 1  # Primeiro dia da janela do início da série
+
+        for dia in range(primeiro, fim + 1):
+            entrando = baldes.get(dia)
+            if entrando is not None:
+                for i, valor in enumerate(entrando):
+                    soma[i] += valor
+
+            saindo = baldes.get(dia - dias) if dia - dias >= primeiro else None
+            if saindo is not None:
+                for i, valor in enumerate(saindo):
+                    soma[i] -= valor
+
+            if dia >= inicio:
+                serie.append({'data': date.fromordinal(dia).strftime('%d/%m/%Y'),
+                              **self._resumir(soma)})
+
+        return serie
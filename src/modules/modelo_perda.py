@@ -0,0 +1,224 @@
+"""
+CanaOptimizer - Modelo de Perda Online
+Regressão linear do percentual de perda sobre velocidade, clima,
+colheitadeira e tipo de cana, atualizada a cada colheita registrada
+Demonstra: ESTATÍSTICAS SUFICIENTES (X'X e X'y) e OBSERVADOR do manager
+
+Cada registro vira um vetor esparso: intercepto, velocidade e um 1 para
+cada categoria (one-hot). Incluir ou remover um registro só soma ou
+subtrai o produto externo desse vetor em X'X, então o modelo nunca
+precisa reler o histórico. Os coeficientes são recalculados sob demanda
+(regressão ridge, resolvida por Cholesky) quando houve alteração.
+"""
+
+import math
+from config import CONDICOES_CLIMATICAS, MARCAS_COLHEITADEIRAS, TIPOS_CANA
+
+
+# Categorias usadas no one-hot; valores fora da lista caem no balde '?'
+CATEGORIAS_MODELO = (
+    ('condicao_clima', CONDICOES_CLIMATICAS),
+    ('colheitadeira', MARCAS_COLHEITADEIRAS),
+    ('tipo_cana', TIPOS_CANA)
+)
+
+CATEGORIA_DESCONHECIDA = '?'
+
+
+class ModeloPerdaOnline:
+    """Regressão linear incremental do percentual de perda"""
+
+    def __init__(self, regularizacao: float = 1e-3):
+        """
+        Inicializa modelo vazio
+
+        Args:
+            regularizacao (float): Penalidade ridge dos coeficientes
+                                   (exceto intercepto); mantém o sistema
+                                   resolvível com categorias sem registros
+        """
+        self.regularizacao = regularizacao
+
+        # Nome de cada coeficiente e posição de cada categoria no vetor
+        self.nomes = ['intercepto', 'velocidade']
+        self._posicoes = {}
+        for campo, valores in CATEGORIAS_MODELO:
+            posicoes = {}
+            for valor in valores + (CATEGORIA_DESCONHECIDA,):
+                posicoes[valor] = len(self.nomes)
+                self.nomes.append(f"{campo}={valor}")
+            self._posicoes[campo] = posicoes
+
+        dimensao = len(self.nomes)
+        self._xtx = [[0.0] * dimensao for _ in range(dimensao)]
+        self._xty = [0.0] * dimensao
+        self._yty = 0.0
+        self.total = 0
+        self._coeficientes = None  # Cache; None = recalcular
+
+    # === OBSERVADOR DO MANAGER ===
+
+    def ao_adicionar(self, colheita: dict):
+        """Inclui colheita nas estatísticas"""
+        self._acumular(colheita, 1.0)
+
+    def ao_atualizar(self, colheita: dict, anterior: dict):
+        """Troca a versão anterior da colheita pela atual"""
+        self._acumular(anterior, -1.0)
+        self._acumular(colheita, 1.0)
+
+    def ao_remover(self, colheita: dict):
+        """Retira colheita das estatísticas"""
+        self._acumular(colheita, -1.0)
+
+    # === ESTATÍSTICAS SUFICIENTES ===
+
+    def _vetor(self, dados: dict) -> list:
+        """
+        Monta o vetor esparso de características
+
+        Args:
+            dados (dict): Colheita (ou dados planejados) com velocidade,
+                          condicao_clima, colheitadeira e tipo_cana
+
+        Returns:
+            list: Pares (posição, valor) não nulos
+        """
+        vetor = [(0, 1.0), (1, float(dados['velocidade']))]
+
+        for campo, posicoes in self._posicoes.items():
+            posicao = posicoes.get(dados.get(campo), posicoes[CATEGORIA_DESCONHECIDA])
+            vetor.append((posicao, 1.0))
+
+        return vetor
+
+    def _acumular(self, colheita: dict, sinal: float):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1) a colheita de X'X, X'y e y'y
+        Custo O(k²) com k características não nulas (k = 5)
+
+        Args:
+            colheita (dict): Registro de colheita
+            sinal (float): 1.0 para incluir, -1.0 para retirar
+        """
+        vetor = self._vetor(colheita)
+        y = float(colheita['percentual_perda'])
+
+        for i, xi in vetor:
+            linha = self._xtx[i]
+            for j, xj in vetor:
+                linha[j] += sinal * xi * xj
+            self._xty[i] += sinal * xi * y
+
+        self._yty += sinal * y * y
+        self.total += int(sinal)
+        self._coeficientes = None
+
+    # === AJUSTE ===
+
+    def _resolver(self) -> list:
+        """
+        Resolve (X'X + λI) b = X'y por Cholesky
+
+        Returns:
+            list: Coeficientes na ordem de self.nomes
+        """
+        dimensao = len(self.nomes)
+        a = [linha[:] for linha in self._xtx]
+        for i in range(1, dimensao):
+            a[i][i] += self.regularizacao
+        # Intercepto com penalidade mínima só para o caso sem registros
+        a[0][0] += 1e-12
+
+        # Decomposição a = L L^T (L guardado no triângulo inferior de a)
+        for j in range(dimensao):
+            soma = a[j][j] - sum(a[j][k] * a[j][k] for k in range(j))
+            a[j][j] = math.sqrt(max(soma, 1e-12))
+            for i in range(j + 1, dimensao):
+                a[i][j] = (a[i][j] - sum(a[i][k] * a[j][k] for k in range(j))) / a[j][j]
+
+        # L z = X'y, depois L^T b = z
+        z = [0.0] * dimensao
+        for i in range(dimensao):
+            z[i] = (self._xty[i] - sum(a[i][k] * z[k] for k in range(i))) / a[i][i]
+
+        b = [0.0] * dimensao
+        for i in reversed(range(dimensao)):
+            b[i] = (z[i] - sum(a[k][i] * b[k] for k in range(i + 1, dimensao))) / a[i][i]
+
+        return b
+
+    def obter_coeficientes(self) -> dict:
+        """
+        Retorna os coeficientes atuais (recalculados só após alterações)
+
+        Returns:
+            dict: Nome da característica -> coeficiente
+        """
+        if self._coeficientes is None:
+            self._coeficientes = self._resolver()
+
+        return dict(zip(self.nomes, self._coeficientes))
+
+    # === PREVISÃO ===
+
+    def prever(self, dados: dict) -> float:
+        """
+        Prevê o percentual de perda de uma colheita planejada
+
+        Args:
+            dados (dict): velocidade, condicao_clima, colheitadeira e tipo_cana
+
+        Returns:
+            float: Perda prevista em % (0-100)
+        """
+        return self.prever_lote([dados])[0]
+
+    def prever_lote(self, lista_dados: list) -> list:
+        """
+        Prevê o percentual de perda de várias colheitas planejadas
+        (coeficientes resolvidos uma vez para o lote inteiro)
+
+        Args:
+            lista_dados (list): Dicionários como em prever()
+
+        Returns:
+            list: Perdas previstas em %, na mesma ordem
+        """
+        if self._coeficientes is None:
+            self._coeficientes = self._resolver()
+
+        coeficientes = self._coeficientes
+        previsoes = []
+
+        for dados in lista_dados:
+            valor = sum(coeficientes[i] * x for i, x in self._vetor(dados))
+            previsoes.append(round(min(max(valor, 0.0), 100.0), 2))
+
+        return previsoes
+
+    def obter_resumo(self) -> dict:
+        """
+        Qualidade do ajuste calculada a partir das estatísticas suficientes
+
+        Returns:
+            dict: total, r2 e erro_padrao (em pontos percentuais)
+        """
+        if self.total < 2:
+            return {'total': self.total, 'r2': 0.0, 'erro_padrao': 0.0}
+
+        b = [self.obter_coeficientes()[nome] for nome in self.nomes]
+        dimensao = len(b)
+
+        # SQE = y'y - 2 b'X'y + b'X'X b
+        bxtxb = sum(b[i] * sum(self._xtx[i][j] * b[j] for j in range(dimensao))
+                    for i in range(dimensao))
+        sqe = max(self._yty - 2 * sum(bi * xy for bi, xy in zip(b, self._xty)) + bxtxb, 0.0)
+        media = self._xty[0] / self.total
+        sqt = self._yty - self.total * media * media
+
+        return {
+            'total': self.total,
+            'r2': round(1 - sqe / sqt, 4) if sqt > 1e-12 else 0.0,
+            'erro_padrao': round(math.sqrt(sqe / self.total), 4)
+        }
@@ -0,0 +1,259 @@
+"""
+CanaOptimizer - Simulação Monte Carlo
+Distribuição da economia anual e da perda financeira quando perda,
+produtividade e preço são incertos (P10/P50/P90 e histogramas)
+Demonstra: SIMULAÇÃO ESTOCÁSTICA VETORIZADA (NumPy)
+
+Requer NumPy (opcional no projeto): pip install numpy
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+from config import PARAMETROS_COLHEITA
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: as funções retornam erro amigável
+    np = None
+
+
+DISTRIBUICOES_SUPORTADAS = ('constante', 'uniforme', 'normal', 'triangular', 'lognormal')
+
+MENSAGEM_SEM_NUMPY = "❌ Simulação Monte Carlo requer NumPy (pip install numpy)"
+
+
+def ajustar_distribuicao(valores: list, tipo: str = 'normal') -> dict:
+    """
+    Ajusta distribuição aos valores históricos (método dos momentos)
+
+    Args:
+        valores (list): Valores observados (ex: percentuais de perda)
+        tipo (str): 'normal', 'lognormal', 'triangular' ou 'uniforme'
+
+    Returns:
+        dict: Especificação da distribuição (usada em simular_economia_monte_carlo)
+    """
+    if not valores:
+        raise ValueError("Sem valores para ajustar a distribuição")
+
+    minimo = min(valores)
+    maximo = max(valores)
+
+    if len(valores) == 1 or minimo == maximo:
+        return {'tipo': 'constante', 'valor': valores[0]}
+
+    media = sum(valores) / len(valores)
+    desvio = math.sqrt(sum((v - media) ** 2 for v in valores) / (len(valores) - 1))
+
+    if tipo == 'normal':
+        return {'tipo': 'normal', 'media': media, 'desvio': desvio,
+                'minimo': minimo, 'maximo': maximo}
+
+    if tipo == 'lognormal':
+        if minimo <= 0:
+            raise ValueError("Lognormal exige valores positivos")
+        sigma2 = math.log(1 + (desvio / media) ** 2)
+        return {'tipo': 'lognormal', 'mu': math.log(media) - sigma2 / 2,
+                'sigma': math.sqrt(sigma2)}
+
+    if tipo == 'triangular':
+        # Média da triangular = (min + moda + max) / 3
+        moda = min(max(3 * media - minimo - maximo, minimo), maximo)
+        return {'tipo': 'triangular', 'minimo': minimo, 'moda': moda, 'maximo': maximo}
+
+    if tipo == 'uniforme':
+        return {'tipo': 'uniforme', 'minimo': minimo, 'maximo': maximo}
+
+    raise ValueError(f"Distribuição não suportada: {tipo}")
+
+
+def _amostrar(rng, distribuicao, tamanho: int):
+    """
+    Sorteia valores de uma distribuição
+
+    Args:
+        rng (numpy.random.Generator): Gerador
+        distribuicao: Número (constante) ou dicionário de especificação
+        tamanho (int): Quantidade de sorteios
+
+    Returns:
+        numpy.ndarray: Valores sorteados
+    """
+    if not isinstance(distribuicao, dict):
+        return np.full(tamanho, float(distribuicao))
+
+    tipo = distribuicao['tipo']
+
+    if tipo == 'constante':
+        valores = np.full(tamanho, float(distribuicao['valor']))
+    elif tipo == 'uniforme':
+        valores = rng.uniform(distribuicao['minimo'], distribuicao['maximo'], tamanho)
+    elif tipo == 'normal':
+        valores = rng.normal(distribuicao['media'], distribuicao['desvio'], tamanho)
+    elif tipo == 'triangular':
+        valores = rng.triangular(distribuicao['minimo'], distribuicao['moda'],
+                                 distribuicao['maximo'], tamanho)
+    elif tipo == 'lognormal':
+        valores = rng.lognormal(distribuicao['mu'], distribuicao['sigma'], tamanho)
+    else:
+        raise ValueError(f"Distribuição não suportada: {tipo}")
+
+    # Limites opcionais (ex: normal truncada ao intervalo observado)
+    if 'minimo' in distribuicao or 'maximo' in distribuicao:
+        np.clip(valores, distribuicao.get('minimo'), distribuicao.get('maximo'), out=valores)
+
+    return valores
+
+
+def _simular_lote(tarefa: tuple) -> tuple:
+    """
+    Simula um lote de cenários (executado em processo separado)
+
+    Args:
+        tarefa (tuple): (semente: SeedSequence, tamanho: int, parametros: dict)
+
+    Returns:
+        tuple: (economia_anual: ndarray, perda_financeira: ndarray)
+    """
+    semente, tamanho, parametros = tarefa
+    rng = np.random.default_rng(semente)
+
+    perda = np.clip(_amostrar(rng, parametros['perda_atual'], tamanho), 0.0, 100.0)
+    produtividade = np.maximum(_amostrar(rng, parametros['produtividade'], tamanho), 0.0)
+    preco = np.maximum(_amostrar(rng, parametros['preco_tonelada'], tamanho), 0.0)
+
+    # Mesmas fórmulas de calcular_perda_financeira_completa e projetar_economia_anual
+    valor_por_ponto = parametros['area'] * produtividade * preco / 100
+    perda_financeira = valor_por_ponto * perda
+    economia_anual = (valor_por_ponto * np.maximum(perda - parametros['perda_meta'], 0.0)
+                      * parametros['safras_ano'])
+
+    return (economia_anual, perda_financeira)
+
+
+def _resumir(valores, quantis: tuple, bins_histograma: int) -> dict:
+    """
+    Resume distribuição simulada
+
+    Args:
+        valores (numpy.ndarray): Resultados das simulações
+        quantis (tuple): Percentis desejados (ex: (10, 50, 90))
+        bins_histograma (int): Quantidade de faixas do histograma
+
+    Returns:
+        dict: media, desvio, quantis {'P10': ...} e histograma
+    """
+    contagens, limites = np.histogram(valores, bins=bins_histograma)
+    percentis = np.percentile(valores, quantis)
+
+    return {
+        'media': round(float(valores.mean()), 2),
+        'desvio': round(float(valores.std()), 2),
+        'minimo': round(float(valores.min()), 2),
+        'maximo': round(float(valores.max()), 2),
+        'quantis': {f"P{q:g}": round(float(v), 2) for q, v in zip(quantis, percentis)},
+        'histograma': {
+            'limites': [round(float(v), 2) for v in limites],
+            'contagens': contagens.tolist()
+        }
+    }
+
+
+def simular_economia_monte_carlo(area_hectares: float, produtividade, perda_atual,
+                                 preco_tonelada=None, perda_meta: float = None,
+                                 safras_ano: int = 1, n_simulacoes: int = 1_000_000,
+                                 tamanho_lote: int = 250_000, semente: int = None,
+                                 processos: int = 1, quantis: tuple = (10, 50, 90),
+                                 bins_histograma: int = 40) -> tuple:
+    """
+    Simula economia anual e perda financeira com parâmetros incertos
+
+    produtividade, perda_atual e preco_tonelada aceitam um número (valor
+    fixo) ou um dicionário de distribuição, ex:
+        {'tipo': 'triangular', 'minimo': 6, 'moda': 9, 'maximo': 15}
+        ajustar_distribuicao(perdas_historicas, 'normal')
+
+    Os lotes têm sementes derivadas de `semente`, então o resultado é o
+    mesmo com qualquer número de processos.
+
+    Args:
+        area_hectares (float): Área em hectares
+        produtividade: Produtividade em t/ha (número ou distribuição)
+        perda_atual: Perda atual em % (número ou distribuição)
+        preco_tonelada (optional): Preço da tonelada (número ou distribuição)
+        perda_meta (float, optional): Meta de perda em %. Usa padrão se None.
+        safras_ano (int): Número de safras por ano
+        n_simulacoes (int): Quantidade de cenários sorteados
+        tamanho_lote (int): Cenários por lote (limita memória intermediária)
+        semente (int, optional): Semente para reprodutibilidade
+        processos (int): Processos em paralelo (1 = no processo atual)
+        quantis (tuple): Percentis a calcular
+        bins_histograma (int): Faixas dos histogramas
+
+    Returns:
+        tuple: (sucesso: bool, resultado: dict, mensagem: str)
+               resultado = {'economia_anual': {...}, 'perda_financeira': {...},
+                            'n_simulacoes': int}
+    """
+    if np is None:
+        return (False, {}, MENSAGEM_SEM_NUMPY)
+
+    try:
+        if n_simulacoes <= 0 or tamanho_lote <= 0:
+            return (False, {}, "❌ Número de simulações e tamanho do lote devem ser positivos!")
+
+        parametros = {
+            'area': float(area_hectares),
+            'produtividade': produtividade,
+            'perda_atual': perda_atual,
+            'preco_tonelada': (preco_tonelada if preco_tonelada is not None
+                               else PARAMETROS_COLHEITA['preco_tonelada']),
+            'perda_meta': (perda_meta if perda_meta is not None
+                           else PARAMETROS_COLHEITA['perda_meta']),
+            'safras_ano': safras_ano
+        }
+
+        tamanhos = [tamanho_lote] * (n_simulacoes // tamanho_lote)
+        if n_simulacoes % tamanho_lote:
+            tamanhos.append(n_simulacoes % tamanho_lote)
+
+        sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+        tarefas = [(s, t, parametros) for s, t in zip(sementes, tamanhos)]
+
+        economia = np.empty(n_simulacoes)
+        perda_financeira = np.empty(n_simulacoes)
+
+        if processos > 1 and len(tarefas) > 1:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                resultados = executor.map(_simular_lote, tarefas)
+                _preencher_resultados(resultados, economia, perda_financeira)
+        else:
+            _preencher_resultados(map(_simular_lote, tarefas), economia, perda_financeira)
+
+        resultado = {
+            'n_simulacoes': n_simulacoes,
+            'economia_anual': _resumir(economia, quantis, bins_histograma),
+            'perda_financeira': _resumir(perda_financeira, quantis, bins_histograma)
+        }
+
+        return (True, resultado, f"✅ {n_simulacoes:,} cenários simulados!")
+
+    except Exception as e:
+        return (False, {}, f"❌ Erro na simulação: {str(e)}")
+
+
+def _preencher_resultados(resultados, economia, perda_financeira):
+    """
+    Copia os lotes simulados para os arrays finais
+
+    Args:
+        resultados: Iterável de tuplas (economia, perda_financeira) por lote
+        economia (numpy.ndarray): Destino da economia anual
+        perda_financeira (numpy.ndarray): Destino da perda financeira
+    """
+    inicio = 0
+    for economia_lote, perda_lote in resultados:
+        fim = inicio + len(economia_lote)
+        economia[inicio:fim] = economia_lote
+        perda_financeira[inicio:fim] = perda_lote
+        inicio = fim
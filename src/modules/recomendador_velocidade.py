@@ -0,0 +1,149 @@
+"""
+CanaOptimizer - Recomendador de Velocidade
+Faixa de velocidade com menor perda média para cada combinação
+(colheitadeira, condição climática, tipo de cana), a partir do histórico
+Demonstra: DICIONÁRIOS (tabelas pré-calculadas) e OBSERVADOR do manager
+
+A velocidade é dividida em faixas de largura fixa. Para cada célula
+(combinação × faixa) guardamos quantidade e soma das perdas; a melhor
+faixa de cada combinação fica pronta em uma tabela, então a consulta é
+uma busca em dicionário. Uma colheita nova só recalcula as combinações
+que ela toca.
+"""
+
+import math
+
+
+# Níveis de consulta, do mais específico ao mais geral ('*' = qualquer valor)
+NIVEIS_RECOMENDACAO = (
+    ('exato', lambda colheitadeira, clima, tipo: (colheitadeira, clima, tipo)),
+    ('colheitadeira_clima', lambda colheitadeira, clima, tipo: (colheitadeira, clima, '*')),
+    ('clima', lambda colheitadeira, clima, tipo: ('*', clima, '*'))
+)
+
+
+class RecomendadorVelocidade:
+    """Tabela incremental da melhor faixa de velocidade por combinação"""
+
+    def __init__(self, largura_faixa: float = 0.5, minimo_registros: int = 3):
+        """
+        Inicializa recomendador vazio
+
+        Args:
+            largura_faixa (float): Largura de cada faixa de velocidade (km/h)
+            minimo_registros (int): Colheitas mínimas para uma faixa ser recomendada
+        """
+        self.largura_faixa = largura_faixa
+        self.minimo_registros = minimo_registros
+        self._celulas = {}  # chave -> {faixa: [quantidade, soma_perda]}
+        self._melhores = {}  # chave -> recomendação pronta
+
+    # === OBSERVADOR DO MANAGER ===
+
+    def ao_adicionar(self, colheita: dict):
+        """Inclui colheita nas faixas"""
+        self._acumular(colheita, 1)
+
+    def ao_atualizar(self, colheita: dict, anterior: dict):
+        """Troca a versão anterior da colheita pela atual"""
+        self._acumular(anterior, -1)
+        self._acumular(colheita, 1)
+
+    def ao_remover(self, colheita: dict):
+        """Retira colheita das faixas"""
+        self._acumular(colheita, -1)
+
+    # === TABELAS ===
+
+    def _chaves(self, colheita: dict) -> list:
+        """
+        Chaves de todos os níveis que a colheita alimenta
+
+        Args:
+            colheita (dict): Registro de colheita
+
+        Returns:
+            list: Tuplas (colheitadeira, clima, tipo_cana) com '*' nos níveis gerais
+        """
+        valores = (colheita['colheitadeira'], colheita['condicao_clima'], colheita['tipo_cana'])
+        return [montar(*valores) for _, montar in NIVEIS_RECOMENDACAO]
+
+    def _acumular(self, colheita: dict, sinal: int):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1) a colheita e refaz só as
+        recomendações das chaves afetadas
+
+        Args:
+            colheita (dict): Registro de colheita
+            sinal (int): 1 para incluir, -1 para retirar
+        """
+        faixa = math.floor(colheita['velocidade'] / self.largura_faixa)
+        perda = colheita['percentual_perda']
+
+        for chave in self._chaves(colheita):
+            faixas = self._celulas.setdefault(chave, {})
+            celula = faixas.setdefault(faixa, [0, 0.0])
+            celula[0] += sinal
+            celula[1] += sinal * perda
+
+            if celula[0] <= 0:
+                del faixas[faixa]
+            if not faixas:
+                del self._celulas[chave]
+
+            self._atualizar_melhor(chave)
+
+    def _atualizar_melhor(self, chave: tuple):
+        """
+        Recalcula a melhor faixa de uma chave - O(faixas da chave)
+
+        Args:
+            chave (tuple): Combinação a recalcular
+        """
+        melhor = None
+
+        for faixa, (quantidade, soma) in self._celulas.get(chave, {}).items():
+            if quantidade < self.minimo_registros:
+                continue
+            media = soma / quantidade
+            # Empate: a faixa mais rápida colhe em menos tempo
+            if melhor is None or (media, -faixa) < (melhor[1], -melhor[0]):
+                melhor = (faixa, media, quantidade)
+
+        if melhor is None:
+            self._melhores.pop(chave, None)
+            return
+
+        faixa, media, quantidade = melhor
+        self._melhores[chave] = {
+            'velocidade_min': round(faixa * self.largura_faixa, 2),
+            'velocidade_max': round((faixa + 1) * self.largura_faixa, 2),
+            'velocidade_recomendada': round((faixa + 0.5) * self.largura_faixa, 2),
+            'perda_media': round(media, 2),
+            'registros': quantidade
+        }
+
+    # === CONSULTA ===
+
+    def recomendar(self, colheitadeira: str, condicao_clima: str, tipo_cana: str) -> dict:
+        """
+        Faixa de velocidade recomendada - O(1)
+
+        Sem histórico suficiente para a combinação exata, usa a da
+        colheitadeira no clima e, por último, a do clima.
+
+        Args:
+            colheitadeira (str): Marca da colheitadeira
+            condicao_clima (str): Condição climática
+            tipo_cana (str): Tipo de cana
+
+        Returns:
+            dict: velocidade_min, velocidade_max, velocidade_recomendada,
+                  perda_media, registros e nivel; None sem histórico
+        """
+        for nivel, montar in NIVEIS_RECOMENDACAO:
+            recomendacao = self._melhores.get(montar(colheitadeira, condicao_clima, tipo_cana))
+            if recomendacao is not None:
+                return {**recomendacao, 'nivel': nivel}
+
+        return None
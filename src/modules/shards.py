@@ -0,0 +1,535 @@
+"""
+CanaOptimizer - Colheitas em Shards
+Colheitas divididas por fazenda entre processos, cada um com seu
+próprio ColheitaManager, para que agregações usem vários núcleos
+Demonstra: PROCESSOS (multiprocessing), PARTICIONAMENTO POR HASH e SCATTER-GATHER
+
+    with ColheitaManagerDistribuido(shards=4) as manager:
+        manager.adicionar_em_lote(leituras)
+        manager.obter_estatisticas()          # os 4 processos somam ao mesmo tempo
+        manager.obter_ranking_fazendas()
+
+Cada fazenda vai sempre para o mesmo shard (crc32 do nome em minúsculas,
+estável entre execuções, ao contrário de hash()). Consultas de todas as
+colheitas são enviadas a todos os shards de uma vez e só depois as
+respostas são lidas, então os processos trabalham em paralelo; o
+coordenador apenas junta resultados pequenos:
+
+    contagens e somas    somadas (médias refeitas no fim)
+    mínimos e máximos    comparados
+    quantis de perda     sketches KLL mesclados (aproximados, inclusive por período)
+    maiores perdas       top-K de cada shard, depois top-K do conjunto
+
+O ID de uma colheita codifica o shard: id = (id_local - 1) × shards +
+shard + 1. Buscar, atualizar e remover vão direto ao shard certo, sem
+mapa no coordenador; os IDs são únicos, mas não consecutivos.
+
+Colheitas e argumentos passam entre processos por pickle: o filtro de
+agregar() precisa ser uma função de módulo (lambda não serve). O
+coordenador atende uma operação por vez (trava própria).
+"""
+
+import heapq
+import multiprocessing
+import os
+import threading
+import weakref
+import zlib
+from operator import attrgetter
+from modules.colheita_manager import ColheitaManager
+from modules.sketches import SketchKLL, QUANTIS_PADRAO
+from modules.agregacoes import (
+    medidas_parciais, mesclar_agregacoes, somar_colheitas, combinar_estatisticas,
+    RelatoriosAgregados
+)
+
+
+def shard_da_fazenda(fazenda: str, shards: int) -> int:
+    """
+    Shard responsável por uma fazenda (sem diferenciar maiúsculas)
+
+    Args:
+        fazenda (str): Nome da fazenda
+        shards (int): Quantidade de shards
+
+    Returns:
+        int: Índice do shard (0 a shards - 1)
+    """
+    return zlib.crc32(str(fazenda).lower().encode('utf-8')) % shards
+
+
+class _Trabalho:
+    """Estado de um processo de shard: o manager local e o lote pendente"""
+
+    def __init__(self):
+        """Cria manager vazio"""
+        self.manager = ColheitaManager()
+        self._pendentes = []
+
+    def __getattr__(self, nome: str):
+        """Demais operações vão direto ao manager local"""
+        return getattr(self.manager, nome)
+
+    def preparar_lote(self, lista_dados: list) -> tuple:
+        """
+        Monta as colheitas do lote sem armazenar (1ª fase do lote)
+
+        Args:
+            lista_dados (list): Dados das colheitas deste shard
+
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        try:
+            self._pendentes = [self.manager._criar_registro(0, dados) for dados in lista_dados]
+        except Exception as e:
+            self._pendentes = []
+            return (False, f"❌ Erro ao adicionar lote: {str(e)}")
+        return (True, "")
+
+    def confirmar_lote(self) -> list:
+        """
+        Armazena o lote preparado (2ª fase)
+
+        Returns:
+            list: IDs locais, na ordem dos dados
+        """
+        registros, self._pendentes = self._pendentes, []
+        self.manager._inserir_novas(registros)
+        return [c.id for c in registros]
+
+    def descartar_lote(self):
+        """Abandona o lote preparado (outro shard falhou)"""
+        self._pendentes = []
+
+    def colheitas_da_fazenda(self, nome_fazenda: str) -> list:
+        """Colheitas da fazenda como lista (a visão não passa entre processos)"""
+        return list(self.manager.listar_por_fazenda(nome_fazenda))
+
+    def parciais_estatisticas(self, data_inicio=None, data_fim=None) -> tuple:
+        """
+        Somas e sketch de perdas do shard para obter_estatisticas
+
+        Args:
+            data_inicio (optional): Início do período
+            data_fim (optional): Fim do período
+
+        Returns:
+            tuple: (somas de somar_colheitas, SketchKLL)
+        """
+        if data_inicio is None and data_fim is None:
+            return somar_colheitas(self.manager._ativas()), self.manager.obter_sketch_perdas()
+
+        colheitas = list(self.manager.listar_por_periodo(data_inicio, data_fim))
+        sketch = SketchKLL()
+        for c in colheitas:
+            sketch.adicionar(c.percentual_perda)
+        return somar_colheitas(colheitas), sketch
+
+
+def _trabalhar(conexao):
+    """
+    Laço do processo de shard: recebe (operação, argumentos), responde
+    (True, resultado) ou (False, exceção); None encerra
+
+    Args:
+        conexao (Connection): Ponta do Pipe do shard
+    """
+    trabalho = _Trabalho()
+
+    while True:
+        try:
+            pedido = conexao.recv()
+        except (EOFError, KeyboardInterrupt):
+            break
+        if pedido is None:
+            break
+
+        nome, args = pedido
+        try:
+            resposta = (True, getattr(trabalho, nome)(*args))
+        except Exception as e:
+            resposta = (False, e)
+        conexao.send(resposta)
+
+    conexao.close()
+
+
+def _encerrar(conexoes: list, processos: list):
+    """
+    Pede o fim dos processos de shard e aguarda (usado pelo finalizador)
+
+    Args:
+        conexoes (list): Pontas do coordenador
+        processos (list): Processos dos shards
+    """
+    for conexao in conexoes:
+        try:
+            conexao.send(None)
+        except (OSError, ValueError):
+            pass  # Processo já terminou
+
+    for processo in processos:
+        processo.join(timeout=5)
+        if processo.is_alive():
+            processo.terminate()
+
+    for conexao in conexoes:
+        conexao.close()
+
+
+class ColheitaManagerDistribuido(RelatoriosAgregados):
+    """Coordenador de shards de colheitas, um processo por shard"""
+
+    def __init__(self, shards: int = None):
+        """
+        Inicia os processos dos shards
+
+        Args:
+            shards (int, optional): Quantidade de shards. None = um por núcleo.
+        """
+        self.shards = shards or os.cpu_count() or 1
+        self._trava = threading.RLock()  # Lote: preparar e confirmar sem intercalar
+        self._conexoes = []
+        self._processos = []
+
+        for indice in range(self.shards):
+            coordenador, trabalhador = multiprocessing.Pipe()
+            processo = multiprocessing.Process(target=_trabalhar, args=(trabalhador,),
+                                               name=f"shard-{indice}", daemon=True)
+            processo.start()
+            trabalhador.close()
+            self._conexoes.append(coordenador)
+            self._processos.append(processo)
+
+        # Encerra no fim do with, em fechar() ou quando o objeto for coletado
+        self._finalizador = weakref.finalize(self, _encerrar, self._conexoes, self._processos)
+
+    def __enter__(self) -> 'ColheitaManagerDistribuido':
+        """with ColheitaManagerDistribuido() as manager: ..."""
+        return self
+
+    def __exit__(self, *excecao):
+        """Encerra os processos ao sair do with"""
+        self.fechar()
+        return False
+
+    def fechar(self):
+        """Encerra os processos dos shards (chamadas repetidas não têm efeito)"""
+        self._finalizador()
+
+    # === COMUNICAÇÃO COM OS SHARDS ===
+
+    def _espalhar(self, pedidos: dict) -> dict:
+        """
+        Envia os pedidos a todos os shards e só depois lê as respostas
+        (os shards trabalham ao mesmo tempo)
+
+        Args:
+            pedidos (dict): índice do shard -> (operação, argumentos)
+
+        Returns:
+            dict: índice do shard -> resultado
+
+        Raises:
+            RuntimeError: Shards já encerrados
+            Exception: Primeira exceção levantada em um shard (as demais
+                       respostas são lidas antes, para não dessincronizar)
+        """
+        if not self._finalizador.alive:
+            raise RuntimeError("Shards já encerrados")
+
+        with self._trava:
+            for indice, pedido in pedidos.items():
+                self._conexoes[indice].send(pedido)
+            respostas = {indice: self._conexoes[indice].recv() for indice in pedidos}
+
+        for sucesso, valor in respostas.values():
+            if not sucesso:
+                raise valor
+        return {indice: valor for indice, (_, valor) in respostas.items()}
+
+    def _chamar(self, indice: int, nome: str, *args):
+        """Executa uma operação em um shard"""
+        return self._espalhar({indice: (nome, args)})[indice]
+
+    def _todos(self, nome: str, *args) -> list:
+        """Executa a mesma operação em todos os shards (resultados em ordem de shard)"""
+        respostas = self._espalhar({indice: (nome, args) for indice in range(self.shards)})
+        return [respostas[indice] for indice in range(self.shards)]
+
+    # === IDS E ROTEAMENTO ===
+
+    def shard_da_fazenda(self, fazenda: str) -> int:
+        """
+        Shard responsável por uma fazenda
+
+        Args:
+            fazenda (str): Nome da fazenda
+
+        Returns:
+            int: Índice do shard
+        """
+        return shard_da_fazenda(fazenda, self.shards)
+
+    def _id_global(self, indice: int, id_local: int) -> int:
+        """ID visível fora do shard"""
+        return (id_local - 1) * self.shards + indice + 1
+
+    def _localizar(self, id_colheita: int) -> tuple:
+        """
+        Shard e ID local de um ID global
+
+        Returns:
+            tuple: (índice do shard, id local) ou (None, None) se inválido
+        """
+        if not isinstance(id_colheita, int) or id_colheita < 1:
+            return (None, None)
+        return ((id_colheita - 1) % self.shards, (id_colheita - 1) // self.shards + 1)
+
+    def _globalizar(self, indice: int, colheita):
+        """Troca o ID local da colheita recebida pelo global (cópia do shard)"""
+        if colheita is not None:
+            colheita.id = self._id_global(indice, colheita.id)
+        return colheita
+
+    # === INCLUSÃO E ALTERAÇÃO ===
+
+    def adicionar_colheita(self, dados_colheita: dict) -> tuple:
+        """
+        Adiciona colheita no shard da sua fazenda
+
+        Args:
+            dados_colheita (dict): Dicionário com dados da colheita
+
+        Returns:
+            tuple: (sucesso: bool, id: int, mensagem: str)
+        """
+        indice = self.shard_da_fazenda(dados_colheita.get('fazenda', ''))
+        sucesso, id_local, mensagem = self._chamar(indice, 'adicionar_colheita', dados_colheita)
+
+        if not sucesso:
+            return (False, 0, mensagem)
+        return (True, self._id_global(indice, id_local), mensagem)
+
+    def adicionar_em_lote(self, lista_dados: list) -> tuple:
+        """
+        Adiciona várias colheitas de uma vez (todas ou nenhuma)
+
+        Cada shard monta os registros da sua parte; só se todos
+        conseguirem, todos armazenam (senão, todos descartam).
+
+        Args:
+            lista_dados (list): Lista de dicionários com dados das colheitas
+
+        Returns:
+            tuple: (sucesso: bool, quantidade: int, mensagem: str)
+        """
+        lotes = {}
+        for dados in lista_dados:
+            indice = self.shard_da_fazenda(dados.get('fazenda', ''))
+            lotes.setdefault(indice, []).append(dados)
+
+        with self._trava:
+            preparados = self._espalhar({indice: ('preparar_lote', (lote,))
+                                         for indice, lote in lotes.items()})
+            falhas = [mensagem for sucesso, mensagem in preparados.values() if not sucesso]
+
+            if falhas:
+                self._espalhar({indice: ('descartar_lote', ()) for indice in lotes})
+                return (False, 0, falhas[0])
+
+            self._espalhar({indice: ('confirmar_lote', ()) for indice in lotes})
+
+        return (True, len(lista_dados), f"✅ {len(lista_dados)} colheita(s) registrada(s)!")
+
+    def buscar_por_id(self, id_colheita: int):
+        """
+        Busca colheita no shard indicado pelo ID
+
+        Args:
+            id_colheita (int): ID da colheita
+
+        Returns:
+            Colheita: Cópia do registro ou None
+        """
+        indice, id_local = self._localizar(id_colheita)
+        if indice is None:
+            return None
+        return self._globalizar(indice, self._chamar(indice, 'buscar_por_id', id_local))
+
+    def atualizar_colheita(self, id_colheita: int, dados_atualizados: dict) -> tuple:
+        """
+        Atualiza dados de uma colheita (a fazenda não é editável, então a
+        colheita nunca muda de shard)
+
+        Args:
+            id_colheita (int): ID da colheita
+            dados_atualizados (dict): Campos a atualizar
+
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        indice, id_local = self._localizar(id_colheita)
+        if indice is None:
+            return (False, "❌ Colheita não encontrada!")
+        return self._chamar(indice, 'atualizar_colheita', id_local, dados_atualizados)
+
+    def remover_colheita(self, id_colheita: int) -> tuple:
+        """
+        Remove colheita do seu shard
+
+        Args:
+            id_colheita (int): ID da colheita
+
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        indice, id_local = self._localizar(id_colheita)
+        if indice is None:
+            return (False, "❌ Colheita não encontrada!")
+        return self._chamar(indice, 'remover_colheita', id_local)
+
+    # === CONSULTAS (SCATTER-GATHER) ===
+
+    def __len__(self) -> int:
+        """Quantidade de colheitas em todos os shards"""
+        return sum(self._todos('__len__'))
+
+    def tamanhos_shards(self) -> list:
+        """
+        Colheitas em cada shard (para conferir o equilíbrio da divisão)
+
+        Returns:
+            list: Quantidade por shard, em ordem de shard
+        """
+        return self._todos('__len__')
+
+    def agregar(self, dimensoes: list, medidas: list, filtro=None) -> list:
+        """
+        Agrupa colheitas de todos os shards (ver agregacoes.agregar)
+
+        Args:
+            dimensoes (list): Campos (ou 'mes'/'ano') que formam o grupo
+            medidas (list): Pares (campo, função)
+            filtro (function, optional): Função de módulo (vai por pickle)
+
+        Returns:
+            list: Uma linha (dict) por grupo
+        """
+        parciais = self._todos('agregar', list(dimensoes), medidas_parciais(medidas), filtro)
+        return mesclar_agregacoes(parciais, dimensoes, medidas)
+
+    def obter_sketch_perdas(self, grupo: str = 'geral', valor: str = '') -> SketchKLL:
+        """
+        Sketch do percentual de perda de um grupo, mesclado dos shards
+        (uma fazenda está em um só shard)
+
+        Args:
+            grupo (str): 'geral', 'fazenda' ou 'tipo_cana'
+            valor (str): Nome da fazenda ou tipo de cana ('' para geral)
+
+        Returns:
+            SketchKLL: Sketch do grupo
+        """
+        if grupo == 'fazenda':
+            return self._chamar(self.shard_da_fazenda(valor), 'obter_sketch_perdas', grupo, valor)
+
+        sketch = SketchKLL()
+        for parte in self._todos('obter_sketch_perdas', grupo, valor):
+            sketch.mesclar(parte)
+        return sketch
+
+    def obter_quantis_perda(self, grupo: str = 'geral', valor: str = '',
+                            quantis: tuple = QUANTIS_PADRAO) -> dict:
+        """
+        Quantis aproximados do percentual de perda de um grupo
+
+        Args:
+            grupo (str): 'geral', 'fazenda' ou 'tipo_cana'
+            valor (str): Nome da fazenda ou tipo de cana ('' para geral)
+            quantis (tuple): Quantis entre 0 e 1
+
+        Returns:
+            dict: {'P50': valor, 'P90': valor, 'P99': valor} (None sem colheitas)
+        """
+        return self.obter_sketch_perdas(grupo, valor).quantis(quantis)
+
+    def obter_estatisticas(self, data_inicio=None, data_fim=None) -> dict:
+        """
+        Estatísticas gerais: somas de cada shard e sketches mesclados
+        (quantis aproximados também com período)
+
+        Args:
+            data_inicio (optional): Início do período ('DD/MM/YYYY', date ou ordinal)
+            data_fim (optional): Fim do período ('DD/MM/YYYY', date ou ordinal)
+
+        Returns:
+            dict: Mesmo formato de ColheitaManager.obter_estatisticas
+        """
+        partes = self._todos('parciais_estatisticas', data_inicio, data_fim)
+
+        sketch = SketchKLL()
+        for _, parte in partes:
+            sketch.mesclar(parte)
+
+        return combinar_estatisticas([somas for somas, _ in partes],
+                                     sketch.quantis() if sketch.n else None)
+
+    def _top_perdas(self, nome: str, quantidade: int, campo: str) -> list:
+        """
+        Top-K de cada shard (com IDs globais), para escolher o top-K geral
+
+        Returns:
+            list: Colheitas candidatas
+        """
+        respostas = self._todos(nome, quantidade, campo)
+        return [self._globalizar(indice, c)
+                for indice, colheitas in enumerate(respostas) for c in colheitas]
+
+    def listar_maiores_perdas(self, quantidade: int = 50, campo: str = 'percentual_perda') -> list:
+        """
+        As `quantidade` colheitas com maior perda, da maior para a menor
+
+        Args:
+            quantidade (int): Quantidade de colheitas
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+
+        Returns:
+            list: Colheitas
+        """
+        candidatas = self._top_perdas('listar_maiores_perdas', quantidade, campo)
+        return heapq.nlargest(quantidade, candidatas, key=attrgetter(campo, 'id'))
+
+    def listar_menores_perdas(self, quantidade: int = 50, campo: str = 'percentual_perda') -> list:
+        """
+        As `quantidade` colheitas com menor perda, da menor para a maior
+
+        Args:
+            quantidade (int): Quantidade de colheitas
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+
+        Returns:
+            list: Colheitas
+        """
+        candidatas = self._top_perdas('listar_menores_perdas', quantidade, campo)
+        return heapq.nsmallest(quantidade, candidatas, key=attrgetter(campo, 'id'))
+
+    def listar_por_fazenda(self, nome_fazenda: str) -> list:
+        """
+        Colheitas de uma fazenda (lidas só do seu shard)
+
+        Args:
+            nome_fazenda (str): Nome da fazenda
+
+        Returns:
+            list: Cópias das colheitas, em ordem de inclusão
+        """
+        indice = self.shard_da_fazenda(nome_fazenda)
+        colheitas = self._chamar(indice, 'colheitas_da_fazenda', nome_fazenda)
+        return [self._globalizar(indice, c) for c in colheitas]
+
+    def __repr__(self) -> str:
+        """Representação para depuração"""
+        estado = 'ativo' if self._finalizador.alive else 'encerrado'
+        return f"ColheitaManagerDistribuido({self.shards} shard(s), {estado})"
@@ -0,0 +1,336 @@
+"""
+CanaOptimizer - Simulação de Eventos Discretos da Safra
+Simula a safra inteira (máquinas, talhões e mudanças de clima) para
+comparar políticas de operação, como reduzir a velocidade na chuva
+Demonstra: SIMULAÇÃO DE EVENTOS DISCRETOS (heapq) e PROCESSAMENTO PARALELO
+
+Eventos na fila (tempo em horas de operação):
+    mudança de clima  -> máquinas em operação fecham o trecho colhido e
+                         seguem na nova velocidade (ou param)
+    fim de talhão     -> perda do talhão é calculada e a máquina pega o próximo
+
+A perda de cada trecho segue o modelo:
+    perda % = base do clima + sensibilidade do clima × (velocidade - referência) + ruído
+e a perda do talhão é a média dos trechos ponderada pela área colhida.
+"""
+
+import heapq
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from config import CONDICOES_CLIMATICAS, LARGURA_CORTE_PADRAO, PARAMETROS_COLHEITA
+from modules.calculations import calcular_perda_toneladas, calcular_perda_financeira_completa
+
+
+# Frequência relativa de cada condição climática na safra
+PROBABILIDADE_CLIMA = {
+    'Ensolarado': 0.40,
+    'Parcialmente Nublado': 0.20,
+    'Nublado': 0.15,
+    'Garoa': 0.10,
+    'Chuva Leve': 0.10,
+    'Chuva Forte': 0.05
+}
+
+# Modelo de perda por clima: (perda base %, aumento de perda por km/h acima da referência)
+MODELO_PERDA_CLIMA = {
+    'Ensolarado': (4.0, 0.4),
+    'Parcialmente Nublado': (4.3, 0.45),
+    'Nublado': (4.8, 0.5),
+    'Garoa': (6.0, 0.8),
+    'Chuva Leve': (7.5, 1.2),
+    'Chuva Forte': (11.0, 2.0)
+}
+
+VELOCIDADE_REFERENCIA = 5.0    # km/h em que a perda é a base do clima
+DESVIO_RUIDO_PERDA = 1.0       # Desvio do ruído da perda (pontos percentuais)
+DURACAO_MEDIA_CLIMA = 12.0     # Horas médias entre mudanças de clima
+
+# Fator aplicado à velocidade da máquina em cada clima (0 = máquina parada)
+POLITICA_PADRAO = {clima: 1.0 for clima in CONDICOES_CLIMATICAS}
+POLITICA_PADRAO['Chuva Forte'] = 0.0
+
+
+def _sortear_clima(rng: random.Random) -> str:
+    """Sorteia condição climática pela frequência configurada"""
+    return rng.choices(list(PROBABILIDADE_CLIMA), weights=list(PROBABILIDADE_CLIMA.values()))[0]
+
+
+def _perda_trecho(rng: random.Random, clima: str, velocidade: float) -> float:
+    """
+    Sorteia percentual de perda de um trecho colhido
+
+    Args:
+        rng (random.Random): Gerador do ruído
+        clima (str): Condição climática
+        velocidade (float): Velocidade efetiva (km/h)
+
+    Returns:
+        float: Perda em % (0-100)
+    """
+    base, sensibilidade = MODELO_PERDA_CLIMA[clima]
+    perda = base + sensibilidade * (velocidade - VELOCIDADE_REFERENCIA)
+    perda += rng.gauss(0, DESVIO_RUIDO_PERDA)
+    return min(max(perda, 0.0), 100.0)
+
+
+def simular_replicacao(cenario: dict, semente: int) -> dict:
+    """
+    Executa uma replicação da safra
+
+    Args:
+        cenario (dict): Ver simular_safra
+        semente (int): Semente da replicação
+
+    Returns:
+        dict: Métricas da replicação
+
+    Raises:
+        ValueError: Máquina sem velocidade/largura positiva ou política
+                    que para as máquinas em todos os climas
+    """
+    # Clima e ruído da perda com geradores separados: políticas diferentes
+    # com a mesma semente enfrentam exatamente o mesmo clima
+    rng_clima = random.Random(f"clima-{semente}")
+    rng_perda = random.Random(f"perda-{semente}")
+
+    politica = {**POLITICA_PADRAO, **cenario.get('politica_velocidade', {})}
+    horizonte = cenario.get('horizonte_horas', float('inf'))
+    preco = cenario.get('preco_tonelada', PARAMETROS_COLHEITA['preco_tonelada'])
+
+    # Sem clima sorteável em que as máquinas andem, a safra nunca termina
+    pode_retomar = any(politica.get(c, 0) > 0 for c, p in PROBABILIDADE_CLIMA.items() if p > 0)
+    if not pode_retomar:
+        raise ValueError("Política de velocidade para as máquinas em todos os climas")
+
+    maquinas = []
+    for i, m in enumerate(cenario['maquinas']):
+        largura = m.get('largura_corte_metros') or LARGURA_CORTE_PADRAO
+        if m['velocidade_kmh'] <= 0 or largura <= 0:
+            raise ValueError(f"Máquina {m.get('id', i)} com velocidade/largura inválida")
+        maquinas.append({
+            'velocidade': m['velocidade_kmh'],
+            'largura': largura,
+            'talhao': None,      # índice do talhão em colheita
+            'restante': 0.0,     # hectares que faltam no talhão
+            'inicio_trecho': 0.0,
+            'versao': 0          # invalida eventos de fim agendados antes
+        })
+
+    # Fila de talhões: maiores primeiro
+    fila_talhoes = sorted(range(len(cenario['talhoes'])),
+                          key=lambda i: cenario['talhoes'][i]['area_hectares'])
+    perda_ponderada = [0.0] * len(cenario['talhoes'])
+
+    eventos = []
+    contador = 0  # desempate estável na fila de eventos
+    clima = _sortear_clima(rng_clima)
+    tempo = 0.0
+
+    def taxa(maquina):
+        # ha/h (mesma conta de calcular_tempo_colheita) na velocidade da política
+        return maquina['velocidade'] * politica[clima] * maquina['largura'] / 10
+
+    def agendar_fim(indice, maquina):
+        nonlocal contador
+        maquina['versao'] += 1
+        maquina['inicio_trecho'] = tempo
+        taxa_atual = taxa(maquina)
+        if taxa_atual > 0:
+            contador += 1
+            heapq.heappush(eventos, (tempo + maquina['restante'] / taxa_atual, contador,
+                                     'fim', indice, maquina['versao']))
+
+    def fechar_trecho(maquina):
+        # Contabiliza a área colhida desde o início do trecho no clima atual
+        colhido = min(taxa(maquina) * (tempo - maquina['inicio_trecho']), maquina['restante'])
+        if colhido > 0:
+            velocidade = maquina['velocidade'] * politica[clima]
+            perda_ponderada[maquina['talhao']] += colhido * _perda_trecho(rng_perda, clima, velocidade)
+            maquina['restante'] -= colhido
+
+    def iniciar_proximo(indice, maquina):
+        if fila_talhoes:
+            maquina['talhao'] = fila_talhoes.pop()
+            maquina['restante'] = cenario['talhoes'][maquina['talhao']]['area_hectares']
+            agendar_fim(indice, maquina)
+        else:
+            maquina['talhao'] = None
+
+    for indice, maquina in enumerate(maquinas):
+        iniciar_proximo(indice, maquina)
+
+    contador += 1
+    heapq.heappush(eventos, (rng_clima.expovariate(1 / DURACAO_MEDIA_CLIMA), contador, 'clima', -1, 0))
+
+    colhidos = []
+    fim_safra = 0.0
+
+    while eventos:
+        tempo, _, tipo, indice, versao = heapq.heappop(eventos)
+
+        if tempo > horizonte:
+            break
+
+        if tipo == 'clima':
+            if all(m['talhao'] is None for m in maquinas):
+                break
+            for i, maquina in enumerate(maquinas):
+                if maquina['talhao'] is not None:
+                    fechar_trecho(maquina)
+            clima = _sortear_clima(rng_clima)
+            for i, maquina in enumerate(maquinas):
+                if maquina['talhao'] is not None:
+                    agendar_fim(i, maquina)
+            # Todas paradas e nenhum clima futuro as retoma: safra encerrada
+            if not pode_retomar and not any(m['talhao'] is not None and taxa(m) > 0
+                                            for m in maquinas):
+                break
+            contador += 1
+            heapq.heappush(eventos, (tempo + rng_clima.expovariate(1 / DURACAO_MEDIA_CLIMA),
+                                     contador, 'clima', -1, 0))
+
+        elif versao == maquinas[indice]['versao']:
+            maquina = maquinas[indice]
+            maquina['restante'] = max(maquina['restante'], 1e-12)
+            fechar_trecho(maquina)
+            colhidos.append(maquina['talhao'])
+            fim_safra = tempo
+            iniciar_proximo(indice, maquina)
+
+    # Perdas por talhão colhido, com as funções do módulo de cálculos
+    perda_toneladas = 0.0
+    perda_financeira = 0.0
+    area_colhida = 0.0
+    soma_perda_area = 0.0
+
+    for indice_talhao in colhidos:
+        talhao = cenario['talhoes'][indice_talhao]
+        area = talhao['area_hectares']
+        percentual = perda_ponderada[indice_talhao] / area
+        produtividade = talhao.get('produtividade', PARAMETROS_COLHEITA['produtividade_media'])
+        perda_toneladas += calcular_perda_toneladas(area, produtividade, percentual)
+        perda_financeira += calcular_perda_financeira_completa(area, produtividade, percentual, preco)
+        area_colhida += area
+        soma_perda_area += percentual * area
+
+    return {
+        'duracao_horas': fim_safra,
+        'talhoes_colhidos': len(colhidos),
+        'talhoes_pendentes': len(cenario['talhoes']) - len(colhidos),
+        'area_colhida': area_colhida,
+        'perda_media': soma_perda_area / area_colhida if area_colhida else 0.0,
+        'perda_toneladas': perda_toneladas,
+        'perda_financeira': perda_financeira
+    }
+
+
+def _executar_replicacao(tarefa: tuple) -> dict:
+    """Desempacota (cenario, semente) para o pool de processos"""
+    return simular_replicacao(*tarefa)
+
+
+def _resumir_metrica(valores: list) -> dict:
+    """
+    Resume uma métrica entre replicações
+
+    Args:
+        valores (list): Valor da métrica em cada replicação
+
+    Returns:
+        dict: media, desvio, minimo, maximo, p10, p50, p90
+    """
+    ordenados = sorted(valores)
+    n = len(ordenados)
+    media = sum(ordenados) / n
+    desvio = math.sqrt(sum((v - media) ** 2 for v in ordenados) / (n - 1)) if n > 1 else 0.0
+
+    def percentil(p):
+        posicao = (n - 1) * p / 100
+        inferior = math.floor(posicao)
+        superior = min(inferior + 1, n - 1)
+        return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicao - inferior)
+
+    return {
+        'media': round(media, 2),
+        'desvio': round(desvio, 2),
+        'minimo': round(ordenados[0], 2),
+        'maximo': round(ordenados[-1], 2),
+        'p10': round(percentil(10), 2),
+        'p50': round(percentil(50), 2),
+        'p90': round(percentil(90), 2)
+    }
+
+
+def simular_safra(cenario: dict, replicacoes: int = 10, semente: int = 0,
+                  processos: int = 1) -> tuple:
+    """
+    Executa replicações independentes da safra e agrega os resultados
+
+    Args:
+        cenario (dict):
+            'talhoes': [{'area_hectares', 'produtividade' (opcional)}]
+            'maquinas': [{'marca', 'velocidade_kmh', 'largura_corte_metros' (opcional)}]
+            'politica_velocidade' (opcional): {clima: fator da velocidade}, 0 = parar
+            'horizonte_horas' (opcional): encerra a safra nesse tempo
+            'preco_tonelada' (opcional): preço para a perda financeira
+        replicacoes (int): Quantidade de replicações
+        semente (int): Semente base (replicação i usa semente + i)
+        processos (int): Processos em paralelo
+
+    Returns:
+        tuple: (sucesso: bool, resultado: dict, mensagem: str)
+               resultado = {'replicacoes', 'metricas': {nome: resumo},
+                            'execucoes': [métricas de cada replicação]}
+    """
+    try:
+        if not cenario.get('talhoes') or not cenario.get('maquinas'):
+            return (False, {}, "❌ Cenário precisa de talhões e máquinas!")
+        if replicacoes <= 0:
+            return (False, {}, "❌ Número de replicações deve ser positivo!")
+
+        tarefas = [(cenario, semente + i) for i in range(replicacoes)]
+
+        if processos > 1 and replicacoes > 1:
+            with ProcessPoolExecutor(max_workers=processos) as executor:
+                execucoes = list(executor.map(_executar_replicacao, tarefas))
+        else:
+            execucoes = [_executar_replicacao(tarefa) for tarefa in tarefas]
+
+        metricas = {nome: _resumir_metrica([e[nome] for e in execucoes])
+                    for nome in execucoes[0]}
+
+        return (True, {'replicacoes': replicacoes, 'metricas': metricas, 'execucoes': execucoes},
+                f"✅ {replicacoes} replicação(ões) simulada(s)!")
+
+    except Exception as e:
+        return (False, {}, f"❌ Erro na simulação da safra: {str(e)}")
+
+
+def comparar_politicas(cenario: dict, politicas: dict, replicacoes: int = 10,
+                       semente: int = 0, processos: int = 1) -> tuple:
+    """
+    Simula o mesmo cenário com várias políticas de velocidade
+    (mesmas sementes: todas enfrentam o mesmo clima)
+
+    Args:
+        cenario (dict): Cenário base (ver simular_safra)
+        politicas (dict): {nome: {clima: fator da velocidade}}
+        replicacoes (int): Replicações por política
+        semente (int): Semente base
+        processos (int): Processos em paralelo
+
+    Returns:
+        tuple: (sucesso: bool, resultados: dict {nome: metricas}, mensagem: str)
+    """
+    resultados = {}
+
+    for nome, politica in politicas.items():
+        sucesso, resultado, mensagem = simular_safra(
+            {**cenario, 'politica_velocidade': politica}, replicacoes, semente, processos
+        )
+        if not sucesso:
+            return (False, {}, mensagem)
+        resultados[nome] = resultado['metricas']
+
+    return (True, resultados, f"✅ {len(politicas)} política(s) comparada(s)!")
@@ -0,0 +1,224 @@
+"""
+CanaOptimizer - Sketches de Quantis
+Mediana, P90 e P99 de perdas sem ordenar listas inteiras
+Demonstra: ALGORITMOS DE STREAMING (sketch KLL)
+
+O sketch guarda os valores em níveis (compactadores). O nível h tem
+itens com peso 2^h; quando um nível enche, ele é ordenado e metade dos
+itens (posições pares ou ímpares, sorteadas) sobe para o nível seguinte.
+A memória fica em O(k) itens e o erro de posição em ~1,7/k do total.
+Dois sketches se mesclam nível a nível, então sketches de partes
+diferentes dos dados (ex: shards) somam-se sem perder precisão extra.
+"""
+
+import math
+import random
+from bisect import bisect_right
+
+
+QUANTIS_PADRAO = (0.5, 0.9, 0.99)
+
+
+def posicao_quantil(q: float, total: int) -> int:
+    """
+    Posição (0-based, valores em ordem) do quantil q pelo posto mais
+    próximo, ceil(q × n) - 1: a mesma definição nos quantis exatos e
+    no sketch (com [2, 8], a mediana é 2)
+
+    Args:
+        q (float): Quantil entre 0 e 1
+        total (int): Quantidade de valores (> 0)
+
+    Returns:
+        int: Posição entre 0 e total - 1
+    """
+    # round: 0.9 × 10 = 9.000000000000002 não pode virar posto 10
+    return min(max(math.ceil(round(q * total, 9)) - 1, 0), total - 1)
+
+
+class SketchKLL:
+    """Sketch KLL de quantis com inclusão O(1) amortizada e mescla"""
+
+    def __init__(self, k: int = 200, semente: int = 0):
+        """
+        Inicializa sketch vazio
+
+        Args:
+            k (int): Tamanho do maior compactador (precisão x memória)
+            semente (int): Semente dos sorteios da compactação
+        """
+        self.k = k
+        self.n = 0
+        self.minimo = None
+        self.maximo = None
+        self._niveis = [[]]
+        self._tamanho = 0
+        self._capacidades = []
+        self._limite = 0
+        self._recalcular_capacidades()
+        self._rng = random.Random(semente)
+        self._ordenado = None  # Cache (valores, pesos acumulados) para consultas
+
+    def _recalcular_capacidades(self):
+        """
+        Capacidade de cada nível: k no topo, diminuindo 2/3 a cada nível
+        abaixo (refeito só quando um nível novo é criado)
+        """
+        altura = len(self._niveis)
+        self._capacidades = [max(2, int(self.k * (2 / 3) ** (altura - nivel - 1)) + 1)
+                             for nivel in range(altura)]
+        self._limite = sum(self._capacidades)
+
+    def adicionar(self, valor: float):
+        """
+        Inclui valor no sketch
+
+        Args:
+            valor (float): Valor observado
+        """
+        self._niveis[0].append(valor)
+        self._tamanho += 1
+        self.n += 1
+        self._ordenado = None
+
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if self.maximo is None or valor > self.maximo:
+            self.maximo = valor
+
+        if self._tamanho >= self._limite:
+            self._comprimir()
+
+    def _comprimir(self):
+        """Compacta o nível mais baixo cheio até caber na capacidade total"""
+        while self._tamanho >= self._limite:
+            for nivel, itens in enumerate(self._niveis):
+                if len(itens) >= self._capacidades[nivel]:
+                    break
+
+            if nivel + 1 == len(self._niveis):
+                self._niveis.append([])
+                self._recalcular_capacidades()
+
+            itens.sort()
+            # Número ímpar de itens: o último fica no nível
+            sobra = [itens.pop()] if len(itens) % 2 else []
+            promovidos = itens[self._rng.randint(0, 1)::2]
+
+            self._niveis[nivel + 1].extend(promovidos)
+            self._niveis[nivel] = sobra
+            self._tamanho -= len(itens) - len(promovidos)
+
+    def mesclar(self, outro: 'SketchKLL'):
+        """
+        Incorpora outro sketch (ex: de outro shard ou grupo)
+
+        Args:
+            outro (SketchKLL): Sketch a incorporar (não é alterado)
+        """
+        if outro.n == 0:
+            return
+
+        while len(self._niveis) < len(outro._niveis):
+            self._niveis.append([])
+        self._recalcular_capacidades()
+
+        for nivel, itens in enumerate(outro._niveis):
+            self._niveis[nivel].extend(itens)
+
+        self.n += outro.n
+        self._tamanho += outro._tamanho
+        self.minimo = outro.minimo if self.minimo is None else min(self.minimo, outro.minimo)
+        self.maximo = outro.maximo if self.maximo is None else max(self.maximo, outro.maximo)
+        self._ordenado = None
+        self._comprimir()
+
+    def _preparar_consulta(self) -> tuple:
+        """
+        Ordena os itens com pesos acumulados (refeito só após alterações)
+
+        Returns:
+            tuple: (valores ordenados, pesos acumulados)
+        """
+        if self._ordenado is None:
+            pares = sorted((valor, 1 << nivel)
+                           for nivel, itens in enumerate(self._niveis) for valor in itens)
+            valores = []
+            acumulados = []
+            total = 0
+            for valor, peso in pares:
+                total += peso
+                valores.append(valor)
+                acumulados.append(total)
+            self._ordenado = (valores, acumulados)
+
+        return self._ordenado
+
+    def quantil(self, q: float) -> float:
+        """
+        Valor aproximado do quantil q
+
+        Args:
+            q (float): Quantil entre 0 e 1 (ex: 0.9 para P90)
+
+        Returns:
+            float: Valor estimado (None se o sketch está vazio)
+        """
+        if self.n == 0:
+            return None
+        if q <= 0:
+            return self.minimo
+        if q >= 1:
+            return self.maximo
+
+        valores, acumulados = self._preparar_consulta()
+        # Item i cobre os postos acumulados[i-1] .. acumulados[i] - 1
+        posicao = bisect_right(acumulados, posicao_quantil(q, acumulados[-1]))
+        return valores[min(posicao, len(valores) - 1)]
+
+    def quantis(self, lista_q: tuple = QUANTIS_PADRAO) -> dict:
+        """
+        Vários quantis de uma vez
+
+        Args:
+            lista_q (tuple): Quantis entre 0 e 1
+
+        Returns:
+            dict: {'P50': valor, 'P90': valor, ...}
+        """
+        return {f"P{q * 100:g}": self.quantil(q) for q in lista_q}
+
+    def para_dict(self) -> dict:
+        """
+        Serializa o sketch (JSON)
+
+        Returns:
+            dict: Estado completo do sketch
+        """
+        return {
+            'k': self.k,
+            'n': self.n,
+            'minimo': self.minimo,
+            'maximo': self.maximo,
+            'niveis': self._niveis
+        }
+
+    @classmethod
+    def de_dict(cls, dados: dict) -> 'SketchKLL':
+        """
+        Reconstrói sketch serializado por para_dict
+
+        Args:
+            dados (dict): Estado do sketch
+
+        Returns:
+            SketchKLL: Sketch restaurado
+        """
+        sketch = cls(dados['k'])
+        sketch.n = dados['n']
+        sketch.minimo = dados['minimo']
+        sketch.maximo = dados['maximo']
+        sketch._niveis = [list(itens) for itens in dados['niveis']] or [[]]
+        sketch._tamanho = sum(len(itens) for itens in sketch._niveis)
+        sketch._recalcular_capacidades()
+        return sketch
@@ -4,6 +4,9 @@ Funções para validar entradas do usuário
 Demonstra: SUBALGORITMOS (funções com passagem de parâmetros)
 """
 
+from datetime import datetime
+
+
 def validar_numero_positivo(valor_str: str, nome_campo: str) -> tuple:
     """
     Valida se a entrada é um número positivo
@@ -101,6 +104,24 @@ def validar_ano(ano_str: str) -> tuple:
         return (False, 0, "⚠️  Ano deve ser um número inteiro!")
 
 
+def validar_data(data_str: str, nome_campo: str) -> tuple:
+    """
+    Valida data no formato brasileiro DD/MM/AAAA
+    
+    Args:
+        data_str (str): Data digitada
+        nome_campo (str): Nome do campo para mensagem de erro
+        
+    Returns:
+        tuple: (sucesso: bool, data_normalizada: str, mensagem: str)
+    """
+    try:
+        data = datetime.strptime(data_str.strip(), '%d/%m/%Y')
+        return (True, data.strftime('%d/%m/%Y'), "")
+    except ValueError:
+        return (False, "", f"⚠️  {nome_campo} deve estar no formato DD/MM/AAAA!")
+
+
 def validar_cpf_simples(cpf: str) -> tuple:
     """
     Validação simples de CPF (apenas formato)
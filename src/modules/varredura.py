@@ -0,0 +1,180 @@
+"""
+CanaOptimizer - Varredura de Parâmetros
+Avalia calcular_economia_potencial e projetar_economia_anual sobre uma
+grade perda_meta × preco_tonelada × safras_ano × área para cada fazenda
+Demonstra: VETORIZAÇÃO COM BROADCASTING (NumPy)
+
+Requer NumPy (opcional no projeto): pip install numpy
+"""
+
+from config import PARAMETROS_COLHEITA
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: as funções retornam erro amigável
+    np = None
+
+
+MENSAGEM_SEM_NUMPY = "❌ Varredura de parâmetros requer NumPy (pip install numpy)"
+
+# Eixos dos arrays de resultado
+EIXOS_ECONOMIA_SAFRA = ('fazenda', 'perda_meta', 'preco_tonelada', 'area')
+EIXOS_ECONOMIA_ANUAL = ('fazenda', 'perda_meta', 'preco_tonelada', 'safras_ano', 'area')
+
+
+def _arredondar_2_casas(valores):
+    """
+    Arredonda a 2 casas com o mesmo resultado de round(valor, 2)
+
+    np.round multiplica por 100 antes de arredondar, o que muda o lado de
+    empates como 5768.685; esses casos (raros) são refeitos com round().
+
+    Args:
+        valores (ndarray): Valores a arredondar
+
+    Returns:
+        ndarray: Valores arredondados
+    """
+    escalados = valores * 100
+    arredondados = np.rint(escalados) / 100
+
+    quase_empate = np.abs(escalados - np.floor(escalados) - 0.5) < 1e-6
+    if quase_empate.any():
+        indices = np.nonzero(quase_empate)
+        arredondados[indices] = [round(v, 2) for v in valores[indices].tolist()]
+
+    return arredondados
+
+
+def _calcular_bloco(produtividade, perda_atual, area, metas, precos, safras) -> tuple:
+    """
+    Calcula um bloco de fazendas com broadcasting
+
+    Repete a ordem das operações e os arredondamentos das funções escalares:
+    economia por safra arredondada a 2 casas, depois multiplicada pelas
+    safras e arredondada de novo.
+
+    Args:
+        produtividade (ndarray): (F,) t/ha por fazenda
+        perda_atual (ndarray): (F,) perda atual por fazenda
+        area (ndarray): (F, A) ou (1, A) áreas em hectares
+        metas (ndarray): (M,) metas de perda
+        precos (ndarray): (P,) preços da tonelada
+        safras (ndarray): (S,) safras por ano
+
+    Returns:
+        tuple: (economia_safra (F, M, P, A), economia_anual (F, M, P, S, A))
+    """
+    # Eixos: fazenda, meta, preço, área
+    perda = perda_atual[:, None, None, None]
+    meta = metas[None, :, None, None]
+    toneladas_total = area[:, None, None, :] * produtividade[:, None, None, None]
+    diferenca = perda - meta
+
+    toneladas_economizadas = toneladas_total * (diferenca / 100)
+    economia_safra = toneladas_economizadas * precos[None, None, :, None]
+    economia_safra = np.where(perda <= meta, 0.0, _arredondar_2_casas(economia_safra))
+
+    economia_anual = _arredondar_2_casas(
+        economia_safra[:, :, :, None, :] * safras[None, None, None, :, None]
+    )
+
+    return (economia_safra, economia_anual)
+
+
+def varrer_economia(fazendas: list, perdas_meta: list = None, precos_tonelada: list = None,
+                    safras_ano: list = (1,), areas: list = None,
+                    max_celulas_bloco: int = 2_000_000) -> tuple:
+    """
+    Prepara a varredura da grade de parâmetros para todas as fazendas
+
+    Os resultados saem em blocos de fazendas para que grades maiores que
+    a memória possam ser processadas (cada bloco tem no máximo
+    max_celulas_bloco células na economia anual, salvo se uma única
+    fazenda já passar disso).
+
+    Args:
+        fazendas (list): Dicionários com 'fazenda', 'produtividade',
+                         'perda_atual' e 'area_hectares'
+        perdas_meta (list, optional): Metas de perda (%). Usa a padrão se None.
+        precos_tonelada (list, optional): Preços. Usa o padrão se None.
+        safras_ano (list): Safras por ano
+        areas (list, optional): Áreas a varrer (ha). None usa a área de cada fazenda.
+        max_celulas_bloco (int): Limite de células por bloco
+
+    Returns:
+        tuple: (sucesso: bool, blocos: generator, mensagem: str)
+               Cada bloco é um dict com 'inicio', 'fazendas',
+               'economia_safra' (EIXOS_ECONOMIA_SAFRA) e
+               'economia_anual' (EIXOS_ECONOMIA_ANUAL)
+    """
+    if np is None:
+        return (False, iter(()), MENSAGEM_SEM_NUMPY)
+
+    try:
+        if not fazendas:
+            return (False, iter(()), "❌ Nenhuma fazenda informada!")
+
+        metas = np.asarray(perdas_meta if perdas_meta is not None
+                           else [PARAMETROS_COLHEITA['perda_meta']], dtype=float)
+        precos = np.asarray(precos_tonelada if precos_tonelada is not None
+                            else [PARAMETROS_COLHEITA['preco_tonelada']], dtype=float)
+        safras = np.asarray(safras_ano, dtype=float)
+
+        produtividade = np.asarray([f['produtividade'] for f in fazendas], dtype=float)
+        perda_atual = np.asarray([f['perda_atual'] for f in fazendas], dtype=float)
+        nomes = [f.get('fazenda', '') for f in fazendas]
+
+        if areas is not None:
+            grade_areas = np.asarray(areas, dtype=float)[None, :]
+        else:
+            grade_areas = np.asarray([f['area_hectares'] for f in fazendas], dtype=float)[:, None]
+
+        celulas_por_fazenda = len(metas) * len(precos) * len(safras) * grade_areas.shape[1]
+        fazendas_por_bloco = max(1, max_celulas_bloco // celulas_por_fazenda)
+
+    except Exception as e:
+        return (False, iter(()), f"❌ Erro ao preparar varredura: {str(e)}")
+
+    def gerar_blocos():
+        for inicio in range(0, len(fazendas), fazendas_por_bloco):
+            fim = inicio + fazendas_por_bloco
+            area_bloco = grade_areas if areas is not None else grade_areas[inicio:fim]
+            economia_safra, economia_anual = _calcular_bloco(
+                produtividade[inicio:fim], perda_atual[inicio:fim], area_bloco,
+                metas, precos, safras
+            )
+            yield {
+                'inicio': inicio,
+                'fazendas': nomes[inicio:fim],
+                'economia_safra': economia_safra,
+                'economia_anual': economia_anual
+            }
+
+    return (True, gerar_blocos(), f"✅ Grade com {celulas_por_fazenda * len(fazendas):,} células")
+
+
+def varrer_economia_total(fazendas: list, perdas_meta: list = None, precos_tonelada: list = None,
+                          safras_ano: list = (1,), areas: list = None,
+                          max_celulas_bloco: int = 2_000_000) -> tuple:
+    """
+    Soma a economia anual de todas as fazendas para cada ponto da grade,
+    processando bloco a bloco (memória limitada ao tamanho do bloco)
+
+    Args:
+        (mesmos de varrer_economia)
+
+    Returns:
+        tuple: (sucesso: bool, total: ndarray (M, P, S, A), mensagem: str)
+    """
+    sucesso, blocos, mensagem = varrer_economia(fazendas, perdas_meta, precos_tonelada,
+                                                safras_ano, areas, max_celulas_bloco)
+    if not sucesso:
+        return (False, None, mensagem)
+
+    total = None
+    for bloco in blocos:
+        parcial = bloco['economia_anual'].sum(axis=0)
+        total = parcial if total is None else total + parcial
+
+    return (True, _arredondar_2_casas(total), mensagem)
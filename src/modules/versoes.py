@@ -0,0 +1,314 @@
+"""
+CanaOptimizer - Versões das Colheitas (MVCC)
+Armazenamento em páginas com cópia na escrita, para que um relatório
+longo leia um estado fixo enquanto a ingestão continua
+Demonstra: CÓPIA NA ESCRITA (copy-on-write) e CONTROLE DE VERSÕES
+
+    with manager.fixar_versao() as versao:
+        versao.obter_estatisticas()     # os três leem o mesmo estado,
+        versao.obter_ranking_fazendas() # mesmo com colheitas sendo
+        versao.listar_todas()           # incluídas ou removidas
+
+As colheitas ficam em páginas de TAMANHO_PAGINA posições. Fixar uma
+versão copia só a lista de páginas (uma referência por página) e anota
+a época atual. Depois disso, quem altera uma posição numa página que
+alguma versão fixada ainda compartilha copia a página antes (só essa
+página); sem versões fixadas, altera no lugar. Inclusões vão para o fim
+da última página, além do tamanho que a versão enxerga.
+
+Colheitas armazenadas não são alteradas no lugar: atualizar troca o
+objeto, então a versão continua vendo os valores antigos.
+
+Liberar a versão (fim do with, liberar() ou coleta do objeto) solta as
+páginas antigas, que o Python recolhe quando ninguém mais as usa.
+"""
+
+import heapq
+import threading
+import weakref
+from itertools import chain
+from operator import attrgetter
+from modules.agregacoes import agregar, resumir_colheitas, RelatoriosAgregados
+from modules.visoes import VisaoColheitas, fatiar
+
+
+BITS_PAGINA = 10
+TAMANHO_PAGINA = 1 << BITS_PAGINA   # 1024 colheitas por página
+_MASCARA_PAGINA = TAMANHO_PAGINA - 1
+
+
+def _iterar_paginas(paginas, tamanho: int, offset: int = 0, limite: int = None):
+    """
+    Posições de um conjunto de páginas (inclusive vazias), a partir de `offset`
+
+    Args:
+        paginas (list/tuple): Páginas (todas cheias, menos a última)
+        tamanho (int): Posições válidas no total
+        offset (int): Posições a pular (páginas inteiras sem percorrer)
+        limite (int, optional): Máximo de posições. None = até o fim.
+
+    Yields:
+        Colheita ou None
+    """
+    fim = tamanho if limite is None else min(tamanho, offset + limite)
+
+    while offset < fim:
+        inicio = offset & _MASCARA_PAGINA
+        quantidade = min(TAMANHO_PAGINA - inicio, fim - offset)
+        yield from paginas[offset >> BITS_PAGINA][inicio:inicio + quantidade]
+        offset += quantidade
+
+
+class ArmazemPaginado:
+    """Posições de colheitas em páginas com cópia na escrita"""
+
+    def __init__(self, registros=()):
+        """
+        Cria armazém, opcionalmente com colheitas iniciais
+
+        Args:
+            registros (iterable): Colheitas em ordem
+        """
+        registros = list(registros)
+        self._paginas = [registros[i:i + TAMANHO_PAGINA]
+                         for i in range(0, len(registros), TAMANHO_PAGINA)]
+        self._epoca = 0
+        self._epocas = [0] * len(self._paginas)  # Época em que cada página foi criada/copiada
+        self._tamanho = len(registros)
+        self._fixacoes = {}                      # época -> versões fixadas vivas
+        self._trava = threading.Lock()           # Fixar/liberar podem vir de outras threads
+
+    def __len__(self) -> int:
+        """Posições ocupadas (inclusive as vazias de remoções)"""
+        return self._tamanho
+
+    def __getitem__(self, posicao: int):
+        """Colheita (ou None) da posição"""
+        return self._paginas[posicao >> BITS_PAGINA][posicao & _MASCARA_PAGINA]
+
+    def __iter__(self):
+        """Todas as posições em ordem (None nas removidas)"""
+        return chain.from_iterable(self._paginas)
+
+    def iterar(self, offset: int = 0, limite: int = None):
+        """
+        Posições a partir de `offset`, sem percorrer as anteriores
+
+        Args:
+            offset (int): Posições a pular
+            limite (int, optional): Máximo de posições. None = até o fim.
+
+        Returns:
+            iterator: Colheitas (ou None nas removidas)
+        """
+        return _iterar_paginas(self._paginas, self._tamanho, offset, limite)
+
+    def anexar(self, colheita) -> int:
+        """
+        Inclui colheita no fim (página compartilhada recebe a inclusão no
+        lugar: a versão só enxerga as posições que existiam ao fixar)
+
+        Args:
+            colheita (Colheita): Colheita nova
+
+        Returns:
+            int: Posição da colheita
+        """
+        posicao = self._tamanho
+        if posicao & _MASCARA_PAGINA == 0:
+            self._paginas.append([colheita])
+            self._epocas.append(self._epoca)
+        else:
+            self._paginas[-1].append(colheita)
+        self._tamanho = posicao + 1
+        return posicao
+
+    def trocar(self, posicao: int, colheita):
+        """
+        Substitui a colheita da posição (None = remoção), copiando antes a
+        página se uma versão fixada a compartilha
+
+        Args:
+            posicao (int): Posição
+            colheita (Colheita): Novo conteúdo (ou None)
+        """
+        indice = posicao >> BITS_PAGINA
+
+        with self._trava:
+            if self._fixacoes and self._epocas[indice] <= max(self._fixacoes):
+                self._paginas[indice] = list(self._paginas[indice])
+                self._epocas[indice] = self._epoca
+
+        self._paginas[indice][posicao & _MASCARA_PAGINA] = colheita
+
+    def fixar(self) -> tuple:
+        """
+        Congela o estado atual - O(páginas), sem copiar colheitas
+
+        Returns:
+            tuple: (páginas, tamanho, época) para liberar(época) depois
+        """
+        with self._trava:
+            epoca = self._epoca
+            self._fixacoes[epoca] = self._fixacoes.get(epoca, 0) + 1
+            self._epoca += 1
+            return (tuple(self._paginas), self._tamanho, epoca)
+
+    def liberar(self, epoca: int):
+        """
+        Solta uma versão fixada (páginas deixam de ser copiadas por ela)
+
+        Args:
+            epoca (int): Época devolvida por fixar()
+        """
+        with self._trava:
+            restantes = self._fixacoes[epoca] - 1
+            if restantes:
+                self._fixacoes[epoca] = restantes
+            else:
+                del self._fixacoes[epoca]
+
+    def versoes_fixadas(self) -> int:
+        """
+        Quantidade de versões ainda fixadas
+
+        Returns:
+            int: Versões vivas
+        """
+        return sum(self._fixacoes.values())
+
+
+class VersaoColheitas(RelatoriosAgregados):
+    """Estado das colheitas congelado em um instante (somente leitura)"""
+
+    def __init__(self, armazem: ArmazemPaginado, total: int, sequencia: int):
+        """
+        Fixa o estado atual do armazém (use ColheitaManager.fixar_versao)
+
+        Args:
+            armazem (ArmazemPaginado): Armazém do manager
+            total (int): Colheitas válidas no momento
+            sequencia (int): Sequência de alterações do manager no momento
+        """
+        self._paginas, self._posicoes, epoca = armazem.fixar()
+        self._total = total
+        self.sequencia = sequencia
+        # Libera no fim do with, em liberar() ou quando o objeto for coletado
+        self._finalizador = weakref.finalize(self, armazem.liberar, epoca)
+
+    def __enter__(self) -> 'VersaoColheitas':
+        """with manager.fixar_versao() as versao: ..."""
+        return self
+
+    def __exit__(self, *excecao):
+        """Libera a versão ao sair do with"""
+        self.liberar()
+        return False
+
+    def liberar(self):
+        """Solta a versão (chamadas repetidas não têm efeito)"""
+        self._finalizador()
+        self._paginas = ()
+
+    @property
+    def ativa(self) -> bool:
+        """Versão ainda fixada"""
+        return self._finalizador.alive
+
+    def _verificar(self):
+        """
+        Confere se a versão ainda pode ser lida
+
+        Raises:
+            RuntimeError: Versão já liberada
+        """
+        if not self._finalizador.alive:
+            raise RuntimeError("Versão já liberada")
+
+    def __len__(self) -> int:
+        """Colheitas válidas da versão"""
+        return self._total
+
+    def __iter__(self):
+        """Colheitas da versão, em ordem de inclusão"""
+        return self._fatia(0, None)
+
+    def _fatia(self, offset: int, limite: int = None):
+        """
+        Colheitas da versão a partir da posição `offset`
+
+        Args:
+            offset (int): Colheitas a pular
+            limite (int, optional): Máximo de colheitas
+
+        Returns:
+            iterator: Colheitas
+        """
+        self._verificar()
+        if self._total == self._posicoes:
+            # Sem remoções pendentes: posição = índice da colheita
+            return _iterar_paginas(self._paginas, self._posicoes, offset, limite)
+        return fatiar(filter(None, _iterar_paginas(self._paginas, self._posicoes)), offset, limite)
+
+    def listar_todas(self) -> VisaoColheitas:
+        """
+        Todas as colheitas da versão
+
+        Returns:
+            VisaoColheitas: Visão paginável
+        """
+        return VisaoColheitas(self._fatia, self.__len__, f"versão {self.sequencia}")
+
+    def agregar(self, dimensoes: list, medidas: list, filtro=None) -> list:
+        """
+        Agrupa as colheitas da versão (ver agregacoes.agregar)
+
+        Args:
+            dimensoes (list): Campos (ou 'mes'/'ano') que formam o grupo
+            medidas (list): Pares (campo, função)
+            filtro (function, optional): Só agrega colheitas com filtro(c) verdadeiro
+
+        Returns:
+            list: Uma linha (dict) por grupo
+        """
+        return agregar(iter(self), dimensoes, medidas, filtro)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Estatísticas gerais da versão (quantis exatos)
+
+        Returns:
+            dict: Mesmo formato de ColheitaManager.obter_estatisticas
+        """
+        return resumir_colheitas(list(self))
+
+    def listar_maiores_perdas(self, quantidade: int = 50, campo: str = 'percentual_perda') -> list:
+        """
+        As `quantidade` colheitas com maior perda, da maior para a menor
+
+        Args:
+            quantidade (int): Quantidade de colheitas
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+
+        Returns:
+            list: Colheitas
+        """
+        return heapq.nlargest(quantidade, self, key=attrgetter(campo, 'id'))
+
+    def listar_menores_perdas(self, quantidade: int = 50, campo: str = 'percentual_perda') -> list:
+        """
+        As `quantidade` colheitas com menor perda, da menor para a maior
+
+        Args:
+            quantidade (int): Quantidade de colheitas
+            campo (str): 'percentual_perda' (%) ou 'perda_financeira' (R$)
+
+        Returns:
+            list: Colheitas
+        """
+        return heapq.nsmallest(quantidade, self, key=attrgetter(campo, 'id'))
+
+    def __repr__(self) -> str:
+        """Representação para depuração"""
+        estado = 'ativa' if self.ativa else 'liberada'
+        return f"VersaoColheitas(seq={self.sequencia}, {self._total} colheita(s), {estado})"
@@ -0,0 +1,132 @@
+"""
+CanaOptimizer - Visões de Colheitas
+Listagens somente leitura que não copiam as colheitas
+Demonstra: GERADORES e ITERADORES PREGUIÇOSOS (islice) com PAGINAÇÃO
+
+    visao = manager.listar_por_fazenda('Santa Rita')
+    len(visao)                 # pelo índice, sem percorrer
+    visao.pagina(1, 20)        # só as 20 primeiras viram lista
+    for c in visao.fatia(40):  # gerador a partir da 41ª
+
+A visão guarda apenas como gerar as colheitas (uma função que recebe
+offset e limite) e como contá-las; nada é montado até alguém iterar.
+Ela lê o estado atual do gerenciador a cada uso, então reflete
+inclusões e remoções feitas depois de criada; colheitas removidas no
+meio de uma iteração (ex: no corpo do for) são puladas. Quem precisa de
+uma cópia estável usa list(visao).
+"""
+
+from itertools import islice
+
+
+class VisaoColheitas:
+    """Sequência preguiçosa e somente leitura de colheitas"""
+
+    def __init__(self, gerar, contar, descricao: str = 'colheitas'):
+        """
+        Cria visão
+
+        Args:
+            gerar (function): (offset, limite) -> iterador de colheitas;
+                              limite None = até o fim
+            contar (function): () -> quantidade de colheitas da visão
+            descricao (str): Texto para depuração
+        """
+        self._gerar = gerar
+        self._contar = contar
+        self.descricao = descricao
+
+    def __len__(self) -> int:
+        """Quantidade de colheitas (normalmente lida do índice)"""
+        return self._contar()
+
+    def __bool__(self) -> bool:
+        """Visão com ao menos uma colheita"""
+        return self._contar() > 0
+
+    def __iter__(self):
+        """Colheitas, na ordem da visão"""
+        return iter(self._gerar(0, None))
+
+    def fatia(self, offset: int = 0, limite: int = None):
+        """
+        Gerador de colheitas a partir da posição `offset`
+
+        Args:
+            offset (int): Colheitas a pular
+            limite (int, optional): Máximo de colheitas. None = até o fim.
+
+        Returns:
+            iterator: Colheitas
+        """
+        if offset < 0 or (limite is not None and limite < 0):
+            raise ValueError("offset e limite não podem ser negativos")
+        return iter(self._gerar(offset, limite))
+
+    def pagina(self, numero: int, tamanho: int) -> list:
+        """
+        Uma página de colheitas (a única parte copiada para lista)
+
+        Args:
+            numero (int): Página, começando em 1
+            tamanho (int): Colheitas por página
+
+        Returns:
+            list: Colheitas da página (vazia depois da última)
+        """
+        if numero < 1 or tamanho < 1:
+            raise ValueError("Página e tamanho começam em 1")
+        return list(self.fatia((numero - 1) * tamanho, tamanho))
+
+    def total_paginas(self, tamanho: int) -> int:
+        """
+        Quantidade de páginas
+
+        Args:
+            tamanho (int): Colheitas por página
+
+        Returns:
+            int: Páginas (0 se a visão está vazia)
+        """
+        return -(-len(self) // tamanho)
+
+    def __getitem__(self, posicao):
+        """
+        visao[i] ou visao[inicio:fim] (fatias viram lista; sem passo)
+
+        Raises:
+            IndexError: Posição fora da visão
+            ValueError: Fatia com passo diferente de 1
+        """
+        if isinstance(posicao, slice):
+            inicio, fim, passo = posicao.indices(len(self))
+            if passo != 1:
+                raise ValueError("Visão não aceita fatia com passo")
+            return list(self.fatia(inicio, max(fim - inicio, 0)))
+
+        if posicao < 0:
+            posicao += len(self)
+        if posicao < 0:
+            raise IndexError("posição fora da visão")
+        for colheita in self.fatia(posicao, 1):
+            return colheita
+        raise IndexError("posição fora da visão")
+
+    def __repr__(self) -> str:
+        """Representação para depuração"""
+        return f"VisaoColheitas({self.descricao!r}, {len(self)} colheita(s))"
+
+
+def fatiar(iteravel, offset: int = 0, limite: int = None):
+    """
+    Fatia preguiçosa de qualquer iterável (islice com offset/limite)
+
+    Args:
+        iteravel (iterable): Origem
+        offset (int): Itens a pular
+        limite (int, optional): Máximo de itens. None = até o fim.
+
+    Returns:
+        iterator: Itens da fatia
+    """
+    return islice(iteravel, offset, None if limite is None else offset + limite)
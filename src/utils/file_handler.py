@@ -4,10 +4,31 @@ Funções para leitura e escrita de arquivos texto e JSON
 Demonstra: MANIPULAÇÃO DE ARQUIVOS (texto e JSON)
 """
 
+import csv
 import json
 import os
 from datetime import datetime
-from config import CONFIG_ARQUIVOS
+from config import CONFIG_ARQUIVOS, CONFIG_PERSISTENCIA, PARAMETROS_COLHEITA, CONDICOES_CLIMATICAS
+from modules.validations import (
+    validar_numero_positivo,
+    validar_percentual,
+    validar_texto_nao_vazio,
+    validar_velocidade,
+    validar_data
+)
+
+
+# Cache do índice de diretórios: {diretorio: {'mtime_ns', 'entradas', 'ordenacoes'}}
+# Cada entrada é a tupla (nome, caminho, tamanho, mtime, extensao)
+_cache_indice_diretorios = {}
+
+# Posição de cada campo ordenável na tupla da entrada
+_CAMPOS_ORDENACAO_ARQUIVOS = {
+    'nome': 0,
+    'tamanho_bytes': 2,
+    'data_modificacao': 3,
+    'tipo': 4
+}
 
 
 def salvar_relatorio_texto(nome_arquivo: str, conteudo: str) -> tuple:
@@ -34,6 +55,7 @@ def salvar_relatorio_texto(nome_arquivo: str, conteudo: str) -> tuple:
         # Salvar arquivo
         with open(caminho_completo, 'w', encoding=CONFIG_ARQUIVOS['encoding']) as arquivo:
             arquivo.write(conteudo)
+        _invalidar_indices_diretorios()
         
         return (True, caminho_completo, "✅ Relatório salvo com sucesso!")
     
@@ -87,6 +109,7 @@ def salvar_dados_json(nome_arquivo: str, dados: dict) -> tuple:
         # Salvar arquivo JSON
         with open(caminho_completo, 'w', encoding=CONFIG_ARQUIVOS['encoding']) as arquivo:
             json.dump(dados, arquivo, indent=4, ensure_ascii=False)
+        _invalidar_indices_diretorios()
         
         return (True, caminho_completo, "✅ Dados JSON salvos com sucesso!")
     
@@ -118,10 +141,86 @@ def ler_dados_json(caminho_arquivo: str) -> tuple:
         return (False, {}, f"❌ Erro ao ler JSON: {str(e)}")
 
 
-def listar_arquivos_exportados() -> list:
+def _carregar_indice_diretorio(diretorio: str) -> dict:
+    """
+    Obtém índice de arquivos do diretório, reaproveitando o cache
+    enquanto o mtime do diretório não mudar (as funções de gravação deste
+    módulo descartam o cache, pois sobrescrever não altera esse mtime)
+    
+    Args:
+        diretorio (str): Diretório a indexar
+        
+    Returns:
+        dict: Índice com 'entradas' (lista de tuplas) e 'ordenacoes' (cache)
+    """
+    mtime_diretorio = os.stat(diretorio).st_mtime_ns
+    indice = _cache_indice_diretorios.get(diretorio)
+    
+    if indice is not None and indice['mtime_ns'] == mtime_diretorio:
+        return indice
+    
+    # scandir reaproveita o stat do DirEntry (uma chamada por arquivo)
+    entradas = []
+    with os.scandir(diretorio) as iterador:
+        for entrada in iterador:
+            if not entrada.is_file():
+                continue
+            info = entrada.stat()
+            extensao = os.path.splitext(entrada.name)[1][1:].upper()
+            entradas.append((entrada.name, entrada.path, info.st_size, info.st_mtime, extensao))
+    
+    indice = {'mtime_ns': mtime_diretorio, 'entradas': entradas, 'ordenacoes': {}}
+    _cache_indice_diretorios[diretorio] = indice
+    return indice
+
+
+def _invalidar_indices_diretorios():
+    """
+    Descarta o cache dos índices de diretório (chamada por quem grava
+    arquivos): sobrescrever um arquivo existente não muda o mtime do
+    diretório, e a listagem mostraria tamanho e data antigos
+    """
+    _cache_indice_diretorios.clear()
+
+
+def _entradas_ordenadas(indice: dict, ordenar_por: str, decrescente: bool) -> list:
+    """
+    Retorna entradas do índice ordenadas, guardando o resultado no cache
+    
+    Args:
+        indice (dict): Índice do diretório
+        ordenar_por (str): 'data_modificacao', 'nome', 'tamanho_bytes' ou 'tipo'
+        decrescente (bool): Ordem decrescente
+        
+    Returns:
+        list: Lista de tuplas ordenada
+    """
+    chave_cache = (ordenar_por, decrescente)
+    
+    if chave_cache not in indice['ordenacoes']:
+        posicao = _CAMPOS_ORDENACAO_ARQUIVOS[ordenar_por]
+        indice['ordenacoes'][chave_cache] = sorted(
+            indice['entradas'],
+            key=lambda entrada: entrada[posicao],
+            reverse=decrescente
+        )
+    
+    return indice['ordenacoes'][chave_cache]
+
+
+def listar_arquivos_exportados(ordenar_por: str = 'data_modificacao', decrescente: bool = True,
+                               extensoes: tuple = None, pagina: int = None,
+                               tamanho_pagina: int = 50) -> list:
     """
-    Lista todos os arquivos exportados
+    Lista arquivos exportados usando índice em cache do diretório
     
+    Args:
+        ordenar_por (str): 'data_modificacao', 'nome', 'tamanho_bytes' ou 'tipo'
+        decrescente (bool): Ordem decrescente (padrão: mais recente primeiro)
+        extensoes (tuple, optional): Extensões aceitas (ex: ('json', 'txt'))
+        pagina (int, optional): Página desejada (começa em 1). None retorna tudo.
+        tamanho_pagina (int): Quantidade de arquivos por página
+        
     Returns:
         list: Lista de dicionários com informações dos arquivos
     """
@@ -133,26 +232,29 @@ def listar_arquivos_exportados() -> list:
         # Criar diretório se não existir
         os.makedirs(diretorio, exist_ok=True)
         
-        # Listar arquivos
-        for arquivo in os.listdir(diretorio):
-            caminho_completo = os.path.join(diretorio, arquivo)
-            
-            if os.path.isfile(caminho_completo):
-                # Obter informações do arquivo
-                tamanho = os.path.getsize(caminho_completo)
-                data_modificacao = datetime.fromtimestamp(os.path.getmtime(caminho_completo))
-                extensao = os.path.splitext(arquivo)[1]
-                
-                arquivos_info.append({
-                    'nome': arquivo,
-                    'caminho': caminho_completo,
-                    'tamanho_bytes': tamanho,
-                    'data_modificacao': data_modificacao.strftime(CONFIG_ARQUIVOS['formato_data']),
-                    'tipo': extensao[1:].upper() if extensao else 'Desconhecido'
-                })
+        indice = _carregar_indice_diretorio(diretorio)
+        entradas = _entradas_ordenadas(indice, ordenar_por, decrescente)
         
-        # Ordenar por data de modificação (mais recente primeiro)
-        arquivos_info.sort(key=lambda x: x['data_modificacao'], reverse=True)
+        # Filtrar por extensão
+        if extensoes:
+            aceitas = {ext.lstrip('.').upper() for ext in extensoes}
+            entradas = [entrada for entrada in entradas if entrada[4] in aceitas]
+        
+        # Paginar antes de formatar (só a página é convertida em dicionários)
+        if pagina is not None:
+            inicio = (max(pagina, 1) - 1) * tamanho_pagina
+            entradas = entradas[inicio:inicio + tamanho_pagina]
+        
+        for nome, caminho, tamanho, mtime, extensao in entradas:
+            arquivos_info.append({
+                'nome': nome,
+                'caminho': caminho,
+                'tamanho_bytes': tamanho,
+                'data_modificacao': datetime.fromtimestamp(mtime).strftime(
+                    CONFIG_ARQUIVOS['formato_data']
+                ),
+                'tipo': extensao if extensao else 'Desconhecido'
+            })
         
     except Exception as e:
         print(f"⚠️  Erro ao listar arquivos: {str(e)}")
@@ -160,6 +262,32 @@ def listar_arquivos_exportados() -> list:
     return arquivos_info
 
 
+def contar_arquivos_exportados(extensoes: tuple = None) -> int:
+    """
+    Conta arquivos exportados (usa o mesmo índice em cache da listagem)
+    
+    Args:
+        extensoes (tuple, optional): Extensões aceitas (ex: ('json', 'txt'))
+        
+    Returns:
+        int: Quantidade de arquivos
+    """
+    try:
+        diretorio = CONFIG_ARQUIVOS['diretorio_exports']
+        os.makedirs(diretorio, exist_ok=True)
+        entradas = _carregar_indice_diretorio(diretorio)['entradas']
+        
+        if not extensoes:
+            return len(entradas)
+        
+        aceitas = {ext.lstrip('.').upper() for ext in extensoes}
+        return sum(1 for entrada in entradas if entrada[4] in aceitas)
+    
+    except Exception as e:
+        print(f"⚠️  Erro ao contar arquivos: {str(e)}")
+        return 0
+
+
 def exportar_colheitas_json(lista_colheitas: list, nome_arquivo: str = "colheitas") -> tuple:
     """
     Exporta lista de colheitas para JSON
@@ -183,6 +311,335 @@ def exportar_colheitas_json(lista_colheitas: list, nome_arquivo: str = "colheita
     return salvar_dados_json(nome_arquivo, dados_export)
 
 
+def ler_marca_exportacao() -> int:
+    """
+    Lê a marca (número de sequência) da última exportação incremental
+    
+    Returns:
+        int: Sequência já exportada (0 se nunca exportou)
+    """
+    sucesso, dados, _ = ler_dados_json(CONFIG_PERSISTENCIA['arquivo_marca_exportacao'])
+    return dados.get('sequencia', 0) if sucesso else 0
+
+
+def salvar_marca_exportacao(sequencia: int) -> tuple:
+    """
+    Grava a marca da última exportação incremental (escrita atômica)
+    
+    Args:
+        sequencia (int): Sequência exportada
+        
+    Returns:
+        tuple: (sucesso: bool, mensagem: str)
+    """
+    try:
+        caminho = CONFIG_PERSISTENCIA['arquivo_marca_exportacao']
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        
+        caminho_temporario = caminho + '.tmp'
+        with open(caminho_temporario, 'w', encoding=CONFIG_ARQUIVOS['encoding']) as arquivo:
+            json.dump({
+                'sequencia': sequencia,
+                'data_exportacao': datetime.now().strftime(CONFIG_ARQUIVOS['formato_data'])
+            }, arquivo, indent=4, ensure_ascii=False)
+        os.replace(caminho_temporario, caminho)
+        _invalidar_indices_diretorios()
+        
+        return (True, "")
+    
+    except Exception as e:
+        return (False, f"❌ Erro ao salvar marca de exportação: {str(e)}")
+
+
+def exportar_colheitas_delta(manager, nome_arquivo: str = "colheitas_delta") -> tuple:
+    """
+    Exporta para JSON só o que mudou desde a última exportação incremental
+    
+    Colheitas incluídas ou atualizadas vão em 'colheitas' (com 'seq');
+    removidas vão em 'removidas' como tombstones {'id', 'seq'}. Sem marca
+    gravada, exporta tudo (carga inicial); o mesmo vale para marca à frente
+    da sequência do manager (estado recomeçado, ex: snapshot e journal
+    apagados), senão as colheitas novas ficariam abaixo da marca.
+    
+    Args:
+        manager (ColheitaManager): Gerenciador de colheitas
+        nome_arquivo (str): Nome base do arquivo
+        
+    Returns:
+        tuple: (sucesso: bool, caminho: str, mensagem: str)
+    """
+    marca = ler_marca_exportacao()
+    if marca > manager.sequencia:
+        marca = 0
+    alteradas, removidas, sequencia_atual = manager.obter_alteracoes_desde(marca)
+    
+    if not alteradas and not removidas:
+        return (False, "", "📭 Nenhuma alteração desde a última exportação!")
+    
+    dados_export = {
+        'metadata': {
+            'data_exportacao': datetime.now().strftime(CONFIG_ARQUIVOS['formato_data']),
+            'tipo': 'delta' if marca else 'completo',
+            'desde_seq': marca,
+            'ate_seq': sequencia_atual,
+            'total_registros': len(alteradas),
+            'total_removidas': len(removidas),
+            'sistema': 'CanaOptimizer'
+        },
+        'colheitas': [c.to_dict() for c in alteradas],
+        'removidas': removidas
+    }
+    
+    sucesso, caminho, mensagem = salvar_dados_json(nome_arquivo, dados_export)
+    
+    if sucesso:
+        # Marca só avança depois que o arquivo foi gravado
+        sucesso_marca, mensagem_marca = salvar_marca_exportacao(sequencia_atual)
+        if not sucesso_marca:
+            return (False, caminho, mensagem_marca)
+        manager.descartar_remocoes_ate(sequencia_atual)
+    
+    return (sucesso, caminho, mensagem)
+
+
+# CSV no padrão brasileiro: ';' como separador e vírgula decimal.
+# 'utf-8-sig' grava o BOM que o Excel usa para reconhecer acentos.
+_DELIMITADOR_CSV = ';'
+_ENCODING_CSV = 'utf-8-sig'
+
+# Colunas do CSV -> campos da colheita (Preço e Observações não estão no
+# cabeçalho padrão de exportação, mas são aceitas na importação)
+_COLUNAS_IMPORTACAO_CSV = {
+    'Fazenda': 'fazenda',
+    'Área (ha)': 'area_hectares',
+    'Tipo Cana': 'tipo_cana',
+    'Produtividade': 'produtividade',
+    'Perda (%)': 'percentual_perda',
+    'Perda (t)': 'toneladas_perdidas',
+    'Perda (R$)': 'perda_financeira',
+    'Data': 'data_colheita',
+    'Preço (R$/t)': 'preco_tonelada',
+    'Colheitadeira': 'colheitadeira',
+    'Velocidade (km/h)': 'velocidade',
+    'Clima': 'condicao_clima',
+    'Observações': 'observacoes'
+}
+_COLUNAS_OBRIGATORIAS_CSV = ('Fazenda', 'Área (ha)', 'Tipo Cana', 'Produtividade', 'Perda (%)')
+
+
+def _formatar_valor_csv(valor) -> str:
+    """Formata valor para CSV brasileiro (vírgula decimal)"""
+    if isinstance(valor, float):
+        return repr(valor).replace('.', ',')
+    return valor
+
+
+def _normalizar_decimal(valor_str: str) -> str:
+    """
+    Converte número brasileiro ('1.234,56') para o formato do float ('1234.56')
+    
+    Args:
+        valor_str (str): Número lido do CSV
+        
+    Returns:
+        str: Número com ponto decimal
+    """
+    if ',' in valor_str:
+        return valor_str.replace('.', '').replace(',', '.')
+    return valor_str
+
+
+def exportar_colheitas_csv(linhas, nome_arquivo: str = "colheitas") -> tuple:
+    """
+    Grava linhas em CSV conforme são geradas (memória constante)
+    
+    Args:
+        linhas: Iterável de listas, cabeçalho primeiro
+                (ex: manager.iterar_linhas_exportacao())
+        nome_arquivo (str): Nome base do arquivo
+        
+    Returns:
+        tuple: (sucesso: bool, caminho: str, mensagem: str)
+    """
+    try:
+        diretorio = CONFIG_ARQUIVOS['diretorio_exports']
+        os.makedirs(diretorio, exist_ok=True)
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        caminho_completo = os.path.join(diretorio, f"{nome_arquivo}_{timestamp}.csv")
+        
+        with open(caminho_completo, 'w', encoding=_ENCODING_CSV, newline='') as arquivo:
+            escritor = csv.writer(arquivo, delimiter=_DELIMITADOR_CSV)
+            escritor.writerows(map(_formatar_valor_csv, linha) for linha in linhas)
+        _invalidar_indices_diretorios()
+        
+        return (True, caminho_completo, "✅ CSV salvo com sucesso!")
+    
+    except Exception as e:
+        return (False, "", f"❌ Erro ao salvar CSV: {str(e)}")
+
+
+def _validar_linha_csv(valores: dict, cache_datas: dict) -> tuple:
+    """
+    Aplica as regras de validação a uma linha do CSV
+    
+    Args:
+        valores (dict): Coluna do CSV -> texto
+        cache_datas (dict): Datas já validadas (datas se repetem muito)
+        
+    Returns:
+        tuple: (sucesso: bool, dados_colheita: dict, mensagem: str)
+    """
+    valido, fazenda, mensagem = validar_texto_nao_vazio(valores['fazenda'], "Fazenda")
+    if not valido:
+        return (False, {}, mensagem)
+    
+    valido, tipo_cana, mensagem = validar_texto_nao_vazio(valores['tipo_cana'], "Tipo Cana")
+    if not valido:
+        return (False, {}, mensagem)
+    
+    valido, area, mensagem = validar_numero_positivo(
+        _normalizar_decimal(valores['area_hectares']), "Área")
+    if not valido:
+        return (False, {}, mensagem)
+    
+    valido, produtividade, mensagem = validar_numero_positivo(
+        _normalizar_decimal(valores['produtividade']), "Produtividade")
+    if not valido:
+        return (False, {}, mensagem)
+    
+    valido, perda, mensagem = validar_percentual(
+        _normalizar_decimal(valores['percentual_perda']), "Perda")
+    if not valido:
+        return (False, {}, mensagem)
+    
+    # Preço: coluna própria, ou Perda (R$) / Perda (t), ou o padrão
+    preco = PARAMETROS_COLHEITA['preco_tonelada']
+    if valores.get('preco_tonelada'):
+        valido, preco, mensagem = validar_numero_positivo(
+            _normalizar_decimal(valores['preco_tonelada']), "Preço")
+        if not valido:
+            return (False, {}, mensagem)
+    elif valores.get('perda_financeira') and valores.get('toneladas_perdidas'):
+        toneladas = float(_normalizar_decimal(valores['toneladas_perdidas']))
+        if toneladas > 0:
+            preco = round(float(_normalizar_decimal(valores['perda_financeira'])) / toneladas, 2)
+    
+    # Velocidade e clima alimentam modelo, recomendador, índices e cubos:
+    # sem valor real a linha é rejeitada (um padrão criaria faixa/categoria falsa)
+    if not valores.get('velocidade'):
+        return (False, {}, "❌ Velocidade não informada!")
+    valido, velocidade, mensagem = validar_velocidade(_normalizar_decimal(valores['velocidade']))
+    if not valido:
+        return (False, {}, mensagem)
+    
+    condicao_clima = valores.get('condicao_clima')
+    if not condicao_clima:
+        return (False, {}, "❌ Condição climática não informada!")
+    if condicao_clima not in CONDICOES_CLIMATICAS:
+        return (False, {}, f"❌ Condição climática desconhecida: {condicao_clima}")
+    
+    data_str = valores.get('data_colheita') or datetime.now().strftime('%d/%m/%Y')
+    if data_str not in cache_datas:
+        cache_datas[data_str] = validar_data(data_str, "Data")
+    valido, data_colheita, mensagem = cache_datas[data_str]
+    if not valido:
+        return (False, {}, mensagem)
+    
+    return (True, {
+        'fazenda': fazenda,
+        'area_hectares': area,
+        'tipo_cana': tipo_cana,
+        'produtividade': produtividade,
+        'percentual_perda': perda,
+        'preco_tonelada': preco,
+        'colheitadeira': valores.get('colheitadeira') or 'Outra',
+        'velocidade': velocidade,
+        'condicao_clima': condicao_clima,
+        'data_colheita': data_colheita,
+        'observacoes': valores.get('observacoes') or ''
+    }, "")
+
+
+def importar_colheitas_csv(caminho_arquivo: str, manager, tamanho_lote: int = 10000) -> tuple:
+    """
+    Importa colheitas de CSV em streaming, validando e incluindo em lotes
+    
+    Aceita o cabeçalho da exportação (datas DD/MM/AAAA, vírgula decimal).
+    A coluna ID é ignorada: o manager atribui novos IDs. Linhas sem
+    velocidade ou com condição climática fora de CONDICOES_CLIMATICAS
+    são rejeitadas.
+    
+    Args:
+        caminho_arquivo (str): Caminho do CSV
+        manager (ColheitaManager): Gerenciador de destino
+        tamanho_lote (int): Linhas válidas por chamada de adicionar_em_lote
+        
+    Returns:
+        tuple: (sucesso: bool, resumo: dict, mensagem: str)
+               resumo = {'importadas', 'rejeitadas', 'erros': [(linha, mensagem)]}
+    """
+    resumo = {'importadas': 0, 'rejeitadas': 0, 'erros': []}
+    max_erros_listados = 20
+    
+    try:
+        with open(caminho_arquivo, 'r', encoding=_ENCODING_CSV, newline='') as arquivo:
+            leitor = csv.reader(arquivo, delimiter=_DELIMITADOR_CSV)
+            cabecalho = next(leitor, None)
+            
+            if cabecalho is None:
+                return (False, resumo, "❌ Arquivo CSV vazio!")
+            
+            faltando = [col for col in _COLUNAS_OBRIGATORIAS_CSV if col not in cabecalho]
+            if faltando:
+                return (False, resumo, f"❌ Colunas ausentes no CSV: {', '.join(faltando)}")
+            
+            # Posição de cada campo conhecido na linha
+            posicoes = [(i, _COLUNAS_IMPORTACAO_CSV[nome]) for i, nome in enumerate(cabecalho)
+                        if nome in _COLUNAS_IMPORTACAO_CSV]
+            cache_datas = {}
+            lote = []
+            
+            for numero_linha, linha in enumerate(leitor, start=2):
+                if not linha:
+                    continue
+                
+                try:
+                    valores = {campo: linha[i].strip() for i, campo in posicoes}
+                    valido, dados, mensagem = _validar_linha_csv(valores, cache_datas)
+                except (IndexError, ValueError):
+                    valido, mensagem = False, "⚠️  Linha com colunas faltando ou inválidas!"
+                
+                if not valido:
+                    resumo['rejeitadas'] += 1
+                    if len(resumo['erros']) < max_erros_listados:
+                        resumo['erros'].append((numero_linha, mensagem))
+                    continue
+                
+                lote.append(dados)
+                
+                if len(lote) >= tamanho_lote:
+                    sucesso, quantidade, mensagem = manager.adicionar_em_lote(lote)
+                    if not sucesso:
+                        return (False, resumo, mensagem)
+                    resumo['importadas'] += quantidade
+                    lote = []
+            
+            if lote:
+                sucesso, quantidade, mensagem = manager.adicionar_em_lote(lote)
+                if not sucesso:
+                    return (False, resumo, mensagem)
+                resumo['importadas'] += quantidade
+        
+        return (True, resumo, f"✅ {resumo['importadas']} colheita(s) importada(s), "
+                              f"{resumo['rejeitadas']} rejeitada(s)")
+    
+    except FileNotFoundError:
+        return (False, resumo, "❌ Arquivo CSV não encontrado!")
+    except Exception as e:
+        return (False, resumo, f"❌ Erro ao importar CSV: {str(e)}")
+
+
 def gerar_cabecalho_relatorio(titulo: str) -> str:
     """
     Gera cabeçalho padrão para relatórios
@@ -243,6 +700,7 @@ def salvar_configuracao_sistema(configuracoes: dict) -> tuple:
         
         with open(caminho, 'w', encoding='utf-8') as arquivo:
             json.dump(configuracoes, arquivo, indent=4, ensure_ascii=False)
+        _invalidar_indices_diretorios()
         
         return (True, "✅ Configurações salvas!")
     
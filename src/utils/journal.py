@@ -0,0 +1,334 @@
+"""
+CanaOptimizer - Journal de Operações
+Log append-only das alterações do ColheitaManager com group commit
+e compactação em segundo plano para um novo snapshot
+Demonstra: MANIPULAÇÃO DE ARQUIVOS (log de operações)
+
+Cada linha do journal é um JSON:
+    {"op": "put", "c": {...colheita completa...}}
+    {"op": "del", "id": 7}
+
+Reproduzir uma operação mais de uma vez dá o mesmo resultado, então um
+journal já incorporado ao snapshot pode ser reaplicado sem problema.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from config import CONFIG_PERSISTENCIA
+from modules.colheita_manager import ColheitaManager
+
+
+class JournalColheitas:
+    """Journal append-only com group commit e compactação em background"""
+
+    def __init__(self, caminho_journal: str = None, caminho_snapshot: str = None,
+                 intervalo_fsync: float = None, max_operacoes_pendentes: int = None,
+                 limite_bytes: int = None):
+        """
+        Inicializa journal (o arquivo é aberto em recuperar())
+
+        Args:
+            caminho_journal (str, optional): Arquivo do journal
+            caminho_snapshot (str, optional): Arquivo do snapshot base
+            intervalo_fsync (float, optional): Segundos entre fsyncs do group commit
+            max_operacoes_pendentes (int, optional): Força fsync ao acumular N operações
+            limite_bytes (int, optional): Tamanho que dispara a compactação
+        """
+        self.caminho_journal = caminho_journal or CONFIG_PERSISTENCIA['arquivo_journal']
+        self.caminho_snapshot = caminho_snapshot or CONFIG_PERSISTENCIA['arquivo_snapshot']
+        self.caminho_compactando = self.caminho_journal + '.compactando'
+        self.intervalo_fsync = (intervalo_fsync if intervalo_fsync is not None
+                                else CONFIG_PERSISTENCIA['intervalo_fsync'])
+        self.max_operacoes_pendentes = (max_operacoes_pendentes or
+                                        CONFIG_PERSISTENCIA['max_operacoes_pendentes'])
+        self.limite_bytes = limite_bytes or CONFIG_PERSISTENCIA['limite_journal_bytes']
+
+        self._arquivo = None
+        self._bytes_escritos = 0
+        self._pendentes = 0
+        self._lock = threading.Lock()
+        self._sinal = threading.Condition(self._lock)
+        self._ativo = False
+        self._thread_fsync = None
+        self._thread_compactacao = None
+        self._fechando = False                 # fechar() em andamento: sem novas compactações
+        self._falhas_compactacao = 0           # Falhas seguidas (espera dobra a cada uma)
+        self._proxima_compactacao = 0.0        # time.monotonic() a partir do qual pode retentar
+        self.ultimo_erro_compactacao = ""
+
+    # === RECUPERAÇÃO ===
+
+    def recuperar(self, manager: ColheitaManager) -> tuple:
+        """
+        Restaura o manager (snapshot + journal) e passa a registrar suas alterações
+
+        Args:
+            manager (ColheitaManager): Gerenciador (vazio) a restaurar
+
+        Returns:
+            tuple: (sucesso: bool, total: int, mensagem: str)
+        """
+        try:
+            if os.path.exists(self.caminho_snapshot):
+                sucesso, _, mensagem = manager.carregar_snapshot(self.caminho_snapshot)
+                if not sucesso:
+                    return (False, 0, mensagem)
+
+            # Segmento de uma compactação interrompida vem antes do journal ativo
+            operacoes = reproduzir_journal(self.caminho_compactando, manager)
+            operacoes += reproduzir_journal(self.caminho_journal, manager)
+
+            diretorio = os.path.dirname(self.caminho_journal)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+
+            self._arquivo = open(self.caminho_journal, 'ab')
+            self._bytes_escritos = self._arquivo.tell()
+            self._ativo = True
+            self._fechando = False
+            self._thread_fsync = threading.Thread(target=self._laco_fsync, daemon=True)
+            self._thread_fsync.start()
+
+            if os.path.exists(self.caminho_compactando):
+                self._iniciar_compactacao()
+
+            manager.registrar_observador(self)
+
+            return (True, len(manager),
+                    f"✅ {len(manager)} colheita(s) restaurada(s) "
+                    f"({operacoes} operação(ões) do journal)")
+
+        except Exception as e:
+            return (False, 0, f"❌ Erro ao recuperar journal: {str(e)}")
+
+    # === ESCRITA (OBSERVADOR DO MANAGER) ===
+
+    def ao_adicionar(self, colheita):
+        """Registra inclusão"""
+        self._registrar({'op': 'put', 'c': colheita.to_dict()})
+
+    def ao_atualizar(self, colheita, anterior):
+        """Registra atualização (grava o registro completo)"""
+        self._registrar({'op': 'put', 'c': colheita.to_dict()})
+
+    def ao_remover(self, colheita):
+        """Registra remoção"""
+        self._registrar({'op': 'del', 'id': colheita.id})
+
+    def _registrar(self, operacao: dict):
+        """
+        Acrescenta operação ao journal - custo O(1), sem fsync imediato
+
+        Args:
+            operacao (dict): Operação a registrar
+        """
+        linha = (json.dumps(operacao, ensure_ascii=False) + '\n').encode('utf-8')
+
+        with self._lock:
+            if self._arquivo is None:
+                return
+
+            self._arquivo.write(linha)
+            self._bytes_escritos += len(linha)
+            self._pendentes += 1
+
+            if self._pendentes >= self.max_operacoes_pendentes:
+                self._sinal.notify()
+
+            if self._bytes_escritos >= self.limite_bytes and self._pode_compactar():
+                # Segmento de compactação anterior que falhou é refeito antes de rotacionar
+                if not os.path.exists(self.caminho_compactando):
+                    self._rotacionar()
+                self._iniciar_compactacao()
+
+    # === GROUP COMMIT ===
+
+    def _laco_fsync(self):
+        """Thread do group commit: um fsync cobre todas as operações pendentes"""
+        with self._lock:
+            while self._ativo:
+                self._sinal.wait(self.intervalo_fsync)
+                if self._pendentes and self._arquivo is not None:
+                    self._sincronizar_arquivo()
+
+    def _sincronizar_arquivo(self):
+        """Descarrega buffer e faz fsync (chamar com o lock adquirido)"""
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self._pendentes = 0
+
+    def sincronizar(self):
+        """Força fsync das operações pendentes"""
+        with self._lock:
+            if self._pendentes and self._arquivo is not None:
+                self._sincronizar_arquivo()
+
+    # === COMPACTAÇÃO ===
+
+    def _compactacao_em_andamento(self) -> bool:
+        """Verifica se a thread de compactação está rodando"""
+        return self._thread_compactacao is not None and self._thread_compactacao.is_alive()
+
+    def _pode_compactar(self) -> bool:
+        """
+        Verifica se uma nova compactação pode começar (chamar com o lock):
+        nenhuma rodando, journal não está fechando e, depois de falha, a
+        espera já passou (ultimo_erro_compactacao guarda o motivo)
+        """
+        return (not self._fechando and not self._compactacao_em_andamento() and
+                time.monotonic() >= self._proxima_compactacao)
+
+    def _registrar_falha_compactacao(self, mensagem: str):
+        """
+        Guarda o erro e adia a próxima tentativa (espera dobra a cada falha seguida)
+
+        Args:
+            mensagem (str): Motivo da falha
+        """
+        self.ultimo_erro_compactacao = mensagem
+        espera = CONFIG_PERSISTENCIA['espera_compactacao_falha'] * 2 ** min(self._falhas_compactacao, 6)
+        self._falhas_compactacao += 1
+        self._proxima_compactacao = time.monotonic() + espera
+
+    def _rotacionar(self):
+        """Fecha o journal ativo como segmento a compactar e abre um novo (com lock)"""
+        self._sincronizar_arquivo()
+        self._arquivo.close()
+        os.replace(self.caminho_journal, self.caminho_compactando)
+        self._arquivo = open(self.caminho_journal, 'ab')
+        self._bytes_escritos = 0
+
+    def _iniciar_compactacao(self):
+        """Dispara a compactação do segmento fechado em segundo plano"""
+        self._thread_compactacao = threading.Thread(target=self._compactar, daemon=True)
+        self._thread_compactacao.start()
+
+    def _compactar(self):
+        """
+        Incorpora o segmento fechado ao snapshot sem tocar no manager em uso:
+        snapshot anterior + segmento -> novo snapshot
+        """
+        try:
+            base = ColheitaManager()
+
+            if os.path.exists(self.caminho_snapshot):
+                sucesso, _, mensagem = base.carregar_snapshot(self.caminho_snapshot)
+                if not sucesso:
+                    self._registrar_falha_compactacao(mensagem)
+                    return
+
+            reproduzir_journal(self.caminho_compactando, base)
+
+            sucesso, _, mensagem = base.salvar_snapshot(self.caminho_snapshot)
+            if not sucesso:
+                self._registrar_falha_compactacao(mensagem)
+                return
+
+            os.remove(self.caminho_compactando)
+            self.ultimo_erro_compactacao = ""
+            self._falhas_compactacao = 0
+            self._proxima_compactacao = 0.0
+
+        except Exception as e:
+            self._registrar_falha_compactacao(f"❌ Erro na compactação: {str(e)}")
+
+    def tamanho_atual(self) -> int:
+        """
+        Retorna o tamanho do journal ativo em bytes
+
+        Returns:
+            int: Bytes escritos desde a última rotação
+        """
+        return self._bytes_escritos
+
+    # === ENCERRAMENTO ===
+
+    def fechar(self, manager: ColheitaManager = None) -> tuple:
+        """
+        Encerra o journal. Com manager, grava checkpoint (snapshot completo)
+        e descarta o journal já incorporado.
+
+        Args:
+            manager (ColheitaManager, optional): Gerenciador para o checkpoint
+
+        Returns:
+            tuple: (sucesso: bool, mensagem: str)
+        """
+        try:
+            # Trava do manager antes da do journal: mesma ordem de quem altera
+            # colheitas (observador chamado com a escrita em andamento)
+            with (manager.escrita() if manager is not None else nullcontext()), self._lock:
+                # Nenhuma escrita daqui em diante inicia compactação; a que já
+                # roda termina antes do checkpoint (ela não usa o lock)
+                self._fechando = True
+                if self._thread_compactacao is not None:
+                    self._thread_compactacao.join()
+
+                self._ativo = False
+                self._sinal.notify()
+
+                if self._arquivo is None:
+                    return (True, "")
+
+                self._sincronizar_arquivo()
+
+                if manager is not None:
+                    sucesso, _, mensagem = manager.salvar_snapshot(self.caminho_snapshot)
+                    if not sucesso:
+                        return (False, mensagem)
+                    self._arquivo.truncate(0)
+                    self._sincronizar_arquivo()
+                    if os.path.exists(self.caminho_compactando):
+                        os.remove(self.caminho_compactando)
+
+                self._arquivo.close()
+                self._arquivo = None
+
+            if self._thread_fsync is not None:
+                self._thread_fsync.join()
+
+            if manager is not None:
+                manager.remover_observador(self)
+                return (True, "✅ Checkpoint salvo!")
+
+            return (True, "✅ Journal encerrado!")
+
+        except Exception as e:
+            return (False, f"❌ Erro ao fechar journal: {str(e)}")
+
+
+def reproduzir_journal(caminho: str, manager: ColheitaManager) -> int:
+    """
+    Aplica as operações de um arquivo de journal ao manager
+
+    Args:
+        caminho (str): Arquivo do journal
+        manager (ColheitaManager): Gerenciador de destino
+
+    Returns:
+        int: Quantidade de operações aplicadas
+    """
+    if not os.path.exists(caminho):
+        return 0
+
+    aplicadas = 0
+
+    with open(caminho, 'rb') as arquivo:
+        for linha in arquivo:
+            try:
+                operacao = json.loads(linha)
+            except ValueError:
+                # Última linha incompleta (queda durante a escrita)
+                break
+
+            if operacao['op'] == 'put':
+                manager.restaurar_registro(operacao['c'])
+            elif operacao['op'] == 'del':
+                manager.remover_colheita(operacao['id'])
+
+            aplicadas += 1
+
+    return aplicadas
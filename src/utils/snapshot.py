@@ -0,0 +1,246 @@
+"""
+CanaOptimizer - Snapshot Binário
+Grava e lê o estado completo em um arquivo binário colunar compacto
+Demonstra: MANIPULAÇÃO DE ARQUIVOS BINÁRIOS
+
+Formato do arquivo:
+    MAGIC (8 bytes) | versão (uint32) | tamanho do cabeçalho (uint64)
+    cabeçalho JSON (colunas, arrays, metadados) | dados das colunas
+
+Tipos de coluna:
+    'int'       -> array('q')
+    'float'     -> array('d')
+    'categoria' -> códigos array('I') + lista de valores no cabeçalho
+    'texto'     -> offsets de caracteres array('Q') + texto UTF-8 concatenado
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate, islice
+from operator import attrgetter
+
+
+MAGIC_SNAPSHOT = b'CANASNAP'
+VERSAO_SNAPSHOT = 1
+_FORMATO_PREFIXO = '<8sIQ'
+_TAMANHO_PREFIXO = struct.calcsize(_FORMATO_PREFIXO)
+
+
+def _codificar_coluna(valores: list, tipo: str) -> tuple:
+    """
+    Converte uma coluna em bytes
+
+    Args:
+        valores (list): Valores da coluna
+        tipo (str): 'int', 'float', 'categoria' ou 'texto'
+
+    Returns:
+        tuple: (dados: bytes, extras: dict)
+    """
+    if tipo == 'int':
+        return (array('q', valores).tobytes(), {})
+
+    if tipo == 'float':
+        return (array('d', valores).tobytes(), {})
+
+    if tipo == 'categoria':
+        codigos_por_valor = {}
+        codigos = array('I', [codigos_por_valor.setdefault(v, len(codigos_por_valor))
+                              for v in valores])
+        return (codigos.tobytes(), {'valores': list(codigos_por_valor)})
+
+    if tipo == 'texto':
+        offsets = array('Q', [0])
+        offsets.extend(accumulate(len(v) for v in valores))
+        texto = ''.join(valores).encode('utf-8')
+        return (offsets.tobytes() + texto, {'bytes_offsets': len(offsets) * offsets.itemsize})
+
+    raise ValueError(f"Tipo de coluna desconhecido: {tipo}")
+
+
+def _array_de_bytes(typecode: str, dados, inverter: bool) -> array:
+    """
+    Cria array a partir de bytes com leitura em bloco
+
+    Args:
+        typecode (str): Typecode do array
+        dados: bytes ou memoryview
+        inverter (bool): Inverter ordem dos bytes (arquivo de outra plataforma)
+
+    Returns:
+        array: Array preenchido
+    """
+    resultado = array(typecode)
+    resultado.frombytes(dados)
+    if inverter:
+        resultado.byteswap()
+    return resultado
+
+
+def _decodificar_coluna(dados, info: dict, inverter: bool) -> list:
+    """
+    Converte bytes de uma coluna de volta em lista de valores
+
+    Args:
+        dados: memoryview com os bytes da coluna
+        info (dict): Descrição da coluna no cabeçalho
+        inverter (bool): Inverter ordem dos bytes
+
+    Returns:
+        list: Valores da coluna
+    """
+    tipo = info['tipo']
+
+    if tipo == 'int':
+        return _array_de_bytes('q', dados, inverter).tolist()
+
+    if tipo == 'float':
+        return _array_de_bytes('d', dados, inverter).tolist()
+
+    if tipo == 'categoria':
+        valores = info['valores']
+        return list(map(valores.__getitem__, _array_de_bytes('I', dados, inverter)))
+
+    if tipo == 'texto':
+        limite = info['bytes_offsets']
+        offsets = _array_de_bytes('Q', dados[:limite], inverter)
+        texto = str(dados[limite:], 'utf-8')
+        return [texto[inicio:fim] for inicio, fim in zip(offsets, islice(offsets, 1, None))]
+
+    raise ValueError(f"Tipo de coluna desconhecido: {tipo}")
+
+
+def gravar_arquivo_snapshot(caminho: str, registros: list, colunas: tuple,
+                            metadados: dict = None, arrays: dict = None) -> tuple:
+    """
+    Grava registros em arquivo binário colunar (escrita atômica)
+
+    Args:
+        caminho (str): Caminho do arquivo
+        registros (list): Registros com um atributo por coluna (ex: Colheita)
+        colunas (tuple): Tuplas (campo, tipo) a gravar
+        metadados (dict, optional): Dados extras serializáveis em JSON
+        arrays (dict, optional): Arrays nomeados (ex: índices) gravados como estão
+
+    Returns:
+        tuple: (sucesso: bool, caminho: str, mensagem: str)
+    """
+    try:
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+        blocos = []
+        descricao_colunas = []
+        descricao_arrays = []
+        offset = 0
+
+        for campo, tipo in colunas:
+            dados, extras = _codificar_coluna(list(map(attrgetter(campo), registros)), tipo)
+            descricao_colunas.append({'nome': campo, 'tipo': tipo, 'offset': offset,
+                                      'bytes': len(dados), **extras})
+            blocos.append(dados)
+            offset += len(dados)
+
+        for nome, valores in (arrays or {}).items():
+            dados = valores.tobytes()
+            descricao_arrays.append({'nome': nome, 'typecode': valores.typecode,
+                                     'offset': offset, 'bytes': len(dados)})
+            blocos.append(dados)
+            offset += len(dados)
+
+        cabecalho = json.dumps({
+            'total': len(registros),
+            'byteorder': sys.byteorder,
+            'metadados': metadados or {},
+            'colunas': descricao_colunas,
+            'arrays': descricao_arrays
+        }, ensure_ascii=False).encode('utf-8')
+
+        # Gravar em arquivo temporário e substituir (nunca deixa snapshot pela metade)
+        caminho_temporario = caminho + '.tmp'
+        with open(caminho_temporario, 'wb') as arquivo:
+            arquivo.write(struct.pack(_FORMATO_PREFIXO, MAGIC_SNAPSHOT,
+                                      VERSAO_SNAPSHOT, len(cabecalho)))
+            arquivo.write(cabecalho)
+            for bloco in blocos:
+                arquivo.write(bloco)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+        os.replace(caminho_temporario, caminho)
+
+        return (True, caminho, "✅ Snapshot salvo com sucesso!")
+
+    except Exception as e:
+        return (False, "", f"❌ Erro ao salvar snapshot: {str(e)}")
+
+
+def ler_arquivo_snapshot(caminho: str, usar_mmap: bool = False) -> tuple:
+    """
+    Lê arquivo de snapshot com leituras em bloco por coluna
+
+    Args:
+        caminho (str): Caminho do arquivo
+        usar_mmap (bool): Mapear o arquivo em memória em vez de lê-lo inteiro
+
+    Returns:
+        tuple: (sucesso: bool, dados: dict, mensagem: str)
+               dados = {'total', 'metadados', 'colunas': {campo: list},
+                        'arrays': {nome: array}}
+    """
+    try:
+        with open(caminho, 'rb') as arquivo:
+            if usar_mmap:
+                conteudo = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                conteudo = arquivo.read()
+
+        visao = memoryview(conteudo)
+
+        try:
+            magic, versao, tamanho_cabecalho = struct.unpack_from(_FORMATO_PREFIXO, visao)
+
+            if magic != MAGIC_SNAPSHOT:
+                return (False, {}, "❌ Arquivo não é um snapshot do CanaOptimizer!")
+            if versao != VERSAO_SNAPSHOT:
+                return (False, {}, f"❌ Versão de snapshot não suportada: {versao}")
+
+            inicio_cabecalho = _TAMANHO_PREFIXO
+            inicio_dados = inicio_cabecalho + tamanho_cabecalho
+            cabecalho = json.loads(str(visao[inicio_cabecalho:inicio_dados], 'utf-8'))
+            inverter = cabecalho['byteorder'] != sys.byteorder
+
+            colunas = {}
+            for info in cabecalho['colunas']:
+                inicio = inicio_dados + info['offset']
+                colunas[info['nome']] = _decodificar_coluna(
+                    visao[inicio:inicio + info['bytes']], info, inverter
+                )
+
+            arrays = {}
+            for info in cabecalho['arrays']:
+                inicio = inicio_dados + info['offset']
+                arrays[info['nome']] = _array_de_bytes(
+                    info['typecode'], visao[inicio:inicio + info['bytes']], inverter
+                )
+        finally:
+            visao.release()
+            if usar_mmap:
+                conteudo.close()
+
+        return (True, {
+            'total': cabecalho['total'],
+            'metadados': cabecalho['metadados'],
+            'colunas': colunas,
+            'arrays': arrays
+        }, "")
+
+    except FileNotFoundError:
+        return (False, {}, "❌ Arquivo de snapshot não encontrado!")
+    except Exception as e:
+        return (False, {}, f"❌ Erro ao ler snapshot: {str(e)}")